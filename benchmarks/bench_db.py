@@ -0,0 +1,241 @@
+"""
+Бенчмарк загрузки вакансий и запросов DBManager на синтетических данных.
+
+Для каждого размера из --sizes база данных benchmark пересоздаётся, в неё загружаются синтетические вакансии
+через DataBaseSQL.insert_data_to_db (измеряется скорость в строках в секунду), затем каждый запрос DBManager
+выполняется --repeat раз с отключённым кэшем отчётов (измеряются p50 и p99 времени выполнения).
+Результаты сравниваются с сохранённым базовым замером: если скорость загрузки упала или время запроса выросло
+больше чем на --tolerance, скрипт завершается с кодом 1.
+
+Запуск (параметры подключения берутся из database.ini):
+    python -m benchmarks.bench_db --sizes 10000 100000 --repeat 20
+    python -m benchmarks.bench_db --sizes 10000 100000 --save-baseline
+    python -m benchmarks.bench_db --sizes 100000 --workers 4
+    python -m benchmarks.bench_db --sizes 100000 --backend sqlite --baseline benchmarks/baseline_sqlite.json
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from typing import Any, Callable
+
+import psycopg2
+
+from benchmarks.generator import generate_vacancies
+from src.config import config
+from src.db_manager import DBManager
+from src.sql_database import DataBaseSQL
+from src.sqlite_database import SQLiteDataBase
+from src.sqlite_db_manager import SQLiteDBManager
+
+BENCHMARK_DATABASE = "benchmark"
+# Файл базы бенчмарка встроенного хранилища (--backend sqlite)
+BENCHMARK_SQLITE_PATH = os.path.join(os.path.dirname(__file__), "benchmark.sqlite3")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+KEYWORD = "Менеджер"
+
+# Измеряемые запросы: итераторы исчерпываются, чтобы учитывалось время передачи всех строк
+QUERIES: dict[str, Callable[[DBManager | SQLiteDBManager], Any]] = {
+    "get_companies_and_vacancies_count": lambda manager: manager.get_companies_and_vacancies_count(),
+    "get_all_vacancies": lambda manager: manager.get_all_vacancies(),
+    "iter_all_vacancies": lambda manager: sum(1 for _ in manager.iter_all_vacancies()),
+    "get_avg_salary": lambda manager: manager.get_avg_salary(),
+    "get_vacancies_with_higher_salary": lambda manager: manager.get_vacancies_with_higher_salary(),
+    "get_vacancies_with_keyword": lambda manager: manager.get_vacancies_with_keyword(KEYWORD),
+    "search_vacancies": lambda manager: manager.search_vacancies(KEYWORD),
+    "get_vacancies_page": lambda manager: manager.get_vacancies_page(limit=100),
+    "get_reports": lambda manager: manager.get_reports(
+        ["companies_and_vacancies_count", "avg_salary", "vacancies_with_higher_salary"]
+    ),
+}
+# Отдельные запросы тех же отчётов, что и в замере get_reports: пакетные отчёты не должны быть медленнее их суммы
+BATCH_REPORT_PARTS = ("get_companies_and_vacancies_count", "get_avg_salary", "get_vacancies_with_higher_salary")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Возвращает q-й процентиль (0–100) списка значений методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def reset_database(params: dict) -> None:
+    """Удаляет базу данных бенчмарка, чтобы каждый размер измерялся на пустой базе."""
+    conn = psycopg2.connect(
+        dbname="postgres",
+        user=params.get("user"),
+        password=params.get("password"),
+        host=params.get("host", "localhost"),
+        port=params.get("port", 5432),
+    )
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"DROP DATABASE IF EXISTS {BENCHMARK_DATABASE} WITH (FORCE)")
+    finally:
+        conn.close()
+
+
+def reset_sqlite_database() -> None:
+    """Удаляет файл базы SQLite бенчмарка вместе с журналом WAL."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(BENCHMARK_SQLITE_PATH + suffix):
+            os.remove(BENCHMARK_SQLITE_PATH + suffix)
+
+
+def run_size(
+    params: dict, size: int, repeat: int, batch_size: int, workers: int = 1, backend: str = "postgresql"
+) -> dict:
+    """Загружает size синтетических вакансий в пустую базу и измеряет загрузку и запросы."""
+    database: DataBaseSQL | SQLiteDataBase
+    manager: DBManager | SQLiteDBManager
+    if backend == "sqlite":
+        reset_sqlite_database()
+        database = SQLiteDataBase(BENCHMARK_SQLITE_PATH)
+        manager = SQLiteDBManager(BENCHMARK_SQLITE_PATH, cache_size=0)
+    else:
+        reset_database(params)
+        database = DataBaseSQL(BENCHMARK_DATABASE, **params)
+        manager = DBManager(BENCHMARK_DATABASE, cache_size=0, **params)
+
+    started = time.perf_counter()
+    database.insert_data_to_db(generate_vacancies(size), batch_size=batch_size, workers=workers)
+    insert_seconds = time.perf_counter() - started
+
+    queries = {}
+    with manager:
+        for name, query in QUERIES.items():
+            # Первый запуск прогревает пул соединений и кэш страниц и в замер не входит
+            query(manager)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                query(manager)
+                timings.append(time.perf_counter() - started)
+            queries[name] = {"p50": percentile(timings, 50), "p99": percentile(timings, 99)}
+
+    return {"insert_seconds": insert_seconds, "insert_rows_per_s": size / insert_seconds, "queries": queries}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Сравнивает результаты с базовым замером и возвращает список регрессий.
+    Регрессия — скорость загрузки ниже базовой или p50/p99 запроса выше базового больше чем на tolerance (доля).
+    Размер, которого нет в базовом замере, считается ошибкой: иначе проверка проходила бы без сравнения.
+    Запросы, которых нет в базовом замере (например, новые), не сравниваются.
+    """
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get(size)
+        if base is None:
+            regressions.append(f"{size}: размера нет в базовом замере, сохраните его с --save-baseline")
+            continue
+        if result["insert_rows_per_s"] < base["insert_rows_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{size}: загрузка {result['insert_rows_per_s']:.0f} строк/с "
+                f"против {base['insert_rows_per_s']:.0f} строк/с в базовом замере"
+            )
+        for name, timings in result["queries"].items():
+            base_timings = base["queries"].get(name)
+            if base_timings is None:
+                continue
+            for metric in ("p50", "p99"):
+                if timings[metric] > base_timings[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{size}: {name} {metric} {timings[metric] * 1000:.2f} мс "
+                        f"против {base_timings[metric] * 1000:.2f} мс в базовом замере"
+                    )
+    return regressions
+
+
+def check_baseline(results: dict, path: str, tolerance: float) -> list[str]:
+    """
+    Сравнивает результаты с базовым замером из файла path и возвращает список регрессий.
+    Отсутствие файла считается ошибкой, а не пропуском сравнения.
+    """
+    if not os.path.exists(path):
+        return [f"базовый замер {path} не найден, сохраните его с --save-baseline"]
+    with open(path, encoding="utf-8") as f:
+        return compare(results, json.load(f), tolerance)
+
+
+def check_batch_reports(results: dict, tolerance: float) -> list[str]:
+    """
+    Проверяет, что p50 get_reports не больше суммы p50 отдельных запросов тех же отчётов (BATCH_REPORT_PARTS)
+    больше чем на tolerance (доля). Возвращает список нарушений.
+    """
+    failures = []
+    for size, result in results.items():
+        queries = result["queries"]
+        separate = sum(queries[name]["p50"] for name in BATCH_REPORT_PARTS)
+        if queries["get_reports"]["p50"] > separate * (1 + tolerance):
+            failures.append(
+                f"{size}: get_reports p50 {queries['get_reports']['p50'] * 1000:.2f} мс "
+                f"против {separate * 1000:.2f} мс у отдельных запросов тех же отчётов"
+            )
+    return failures
+
+
+def print_results(results: dict) -> None:
+    """Выводит результаты замеров в виде таблицы."""
+    for size, result in results.items():
+        print(f"\nРазмер: {size} вакансий")
+        print(f"Загрузка: {result['insert_seconds']:.2f} с, {result['insert_rows_per_s']:.0f} строк/с")
+        print(f"{'Запрос':<36}{'p50, мс':>12}{'p99, мс':>12}")
+        for name, timings in result["queries"].items():
+            print(f"{name:<36}{timings['p50'] * 1000:>12.2f}{timings['p99'] * 1000:>12.2f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки вакансий и запросов DBManager")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000], help="количество вакансий в прогонах")
+    parser.add_argument("--repeat", type=int, default=20, help="сколько раз выполнять каждый запрос")
+    parser.add_argument("--batch-size", type=int, default=1000, help="размер пачки при загрузке")
+    parser.add_argument("--workers", type=int, default=1, help="количество процессов загрузки")
+    parser.add_argument("--backend", choices=["postgresql", "sqlite"], default="postgresql", help="хранилище вакансий")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="файл с базовым замером")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое ухудшение (доля)")
+    parser.add_argument("--save-baseline", action="store_true", help="сохранить результаты как базовый замер")
+    args = parser.parse_args(argv)
+
+    # Логи отдельных запросов не нужны в выводе и искажали бы замеры
+    logging.disable(logging.INFO)
+    params = config()
+    results = {
+        str(size): run_size(params, size, args.repeat, args.batch_size, args.workers, args.backend)
+        for size in args.sizes
+    }
+    if args.backend == "sqlite":
+        reset_sqlite_database()
+    else:
+        reset_database(params)
+    print_results(results)
+
+    regressions = check_batch_reports(results, args.tolerance)
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"\nБазовый замер сохранён в {args.baseline}")
+    else:
+        regressions.extend(check_baseline(results, args.baseline, args.tolerance))
+
+    if regressions:
+        print("\nПроверка производительности не пройдена:")
+        for regression in regressions:
+            print(f"- {regression}")
+        return 1
+    print("\nРегрессий производительности нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+# Шаблоны вакансий: синтетические вакансии повторяют структуру ответа API HeadHunter из data/data.json
+TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "data.json")
+
+# Идентификаторы синтетических вакансий и работодателей не пересекаются с настоящими из data/data.json
+VACANCY_ID_OFFSET = 1_000_000_000
+EMPLOYER_ID_OFFSET = 100_000_000
+
+
+def load_templates(path: str = TEMPLATES_PATH) -> list[dict]:
+    """Загружает вакансии-шаблоны из JSON-файла в формате ответа API HeadHunter."""
+    with open(path, encoding="utf-8") as f:
+        templates: list[dict] = json.load(f)
+    return templates
+
+
+def generate_vacancies(
+    count: int, employers: int = 1000, seed: int = 0, templates: list[dict] | None = None
+) -> Iterator[dict]:
+    """
+    Генерирует count синтетических вакансий в формате API HeadHunter.
+    Каждая вакансия строится на основе случайного шаблона из data/data.json с новыми идентификатором,
+    работодателем (один из employers синтетических работодателей), названием, зарплатой, городом
+    и датой публикации. Вакансии отдаются по одной, поэтому генерация миллионов строк не требует памяти.
+    При одинаковом seed генерируется одна и та же последовательность.
+    """
+    templates = templates if templates is not None else load_templates()
+    rng = random.Random(seed)
+    names = [template["name"] for template in templates]
+    addresses = [template["address"] for template in templates if template.get("address")]
+    employer_templates = [template["employer"] for template in templates]
+    now = datetime(2025, 1, 15, tzinfo=timezone(timedelta(hours=3)))
+
+    for number in range(count):
+        template = rng.choice(templates)
+        vacancy_id = str(VACANCY_ID_OFFSET + number)
+        employer_number = rng.randrange(employers)
+        employer_template = employer_templates[employer_number % len(employer_templates)]
+        employer_id = str(EMPLOYER_ID_OFFSET + employer_number)
+        salary_from = rng.randrange(20_000, 400_000, 500)
+
+        yield {
+            **template,
+            "id": vacancy_id,
+            "name": f"{rng.choice(names)} {rng.randrange(count // 10 + 1)}",
+            "salary": {"from": salary_from, "to": salary_from + rng.randrange(0, 100_000, 500), "currency": "RUR"},
+            "address": rng.choice(addresses),
+            "published_at": (now - timedelta(seconds=rng.randrange(30 * 24 * 3600))).strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+            "employer": {
+                **employer_template,
+                "id": employer_id,
+                "name": f"{employer_template['name']} {employer_number}",
+                "alternate_url": f"https://hh.ru/employer/{employer_id}",
+            },
+        }
@@ -1,92 +1,274 @@
-from src.config import config
-from src.db_manager import DBManager
-from src.hh_api import HeadHunterAPI
-from src.sql_database import DataBaseSQL
-
-
-def main() -> None:
-    hh = HeadHunterAPI()
-    params = config()
-    database = DataBaseSQL(**params)
-
-    # Вставка данных о вакансиях в базу данных
-    database.insert_data_to_db(hh.vacancies)
-
-    # Подключение к базе данных через DBManager
-    count = DBManager(**params)
-
-    print("Привет! Я помогу тебе с информацией о вакансиях.")
-
-    # Вывод всех вакансий
-    print("\nВсе вакансии:")
-    vacancies = count.get_all_vacancies()
-    if vacancies:
-        for vacancy in vacancies:
-            employer_name, vacancy_name, salary, vacancy_url = vacancy
-            print(f"Компания: {employer_name}")
-            print(f"Вакансия: {vacancy_name}")
-            print(f"Зарплата: {salary} руб.")
-            print(f"Подробнее: {vacancy_url}\n")
-    else:
-        print("Вакансии не найдены.")
+"""
+Командная строка проекта.
 
-    # Компании и количество вакансий
-    print("\nКомпании и количество вакансий:")
-    companies_vacancies = count.get_companies_and_vacancies_count()
-    if companies_vacancies:
-        for company, count_vacancies in companies_vacancies:
-            print(f"Компания: {company} - Вакансий: {count_vacancies}")
-    else:
-        print("Информация о компаниях не найдена.")
+    python main.py sync [--full] [--workers N] [--snapshot PATH | --replay PATH] [--enrich]
+    python main.py report {all,companies,avg_salary,higher_salary,vacancies} [--async]
+    python main.py search <ключевое слово> [--limit N]
 
-    # Средняя зарплата по вакансиям
-    print("\nСредняя зарплата по вакансиям:")
-    avg_salary = count.get_avg_salary()
-    if avg_salary:
-        for vacancy_name, avg in avg_salary:
-            print(f"Вакансия: {vacancy_name} - Средняя зарплата: {round(avg, 2)} руб.")
-    else:
-        print("Не удалось получить информацию о средней зарплате.")
-
-    # Вакансии с зарплатой выше средней
-    print("\nВакансии с зарплатой выше средней:")
-    high_salary_vacancies = count.get_vacancies_with_higher_salary()
-    if high_salary_vacancies:
-        for vacancy in high_salary_vacancies:
-            vacancy_id, vacancy_name, vacancy_url, city, salary, employer_id = vacancy
-            print(f"Вакансия: {vacancy_name}")
-            print(f"Ссылка на вакансию: {vacancy_url}")
-            print(f"Город: {city}")
-            print(f"Зарплата: {salary} руб.\n")
+Модули API, загрузки и базы данных импортируются только внутри команд: report и search не обращаются
+к API HeadHunter и не используют DataBaseSQL, поэтому запускаются без повторной загрузки вакансий.
+Хранилище (PostgreSQL или встроенная база SQLite) выбирается секцией [storage] в database.ini.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+FULL_SYNC_INTERVAL = timedelta(days=1)
+PAGE_SIZE = 100
+# Отчёты команды report: имя в командной строке — имя пакетного отчёта DBManager.get_reports
+REPORTS = {
+    "companies": "companies_and_vacancies_count",
+    "avg_salary": "avg_salary",
+    "higher_salary": "vacancies_with_higher_salary",
+}
+# Запросы дольше порога сохраняются в метриках вместе с планом запроса
+SLOW_QUERY_THRESHOLD = 1.0
+
+
+def sync(args: argparse.Namespace) -> None:
+    """Загружает вакансии из API HeadHunter (или из снимка) в базу данных."""
+    from src.config import config, storage_config
+    from src.storage import open_database
+
+    # Хранилище выбирается секцией [storage] в database.ini: PostgreSQL или встроенная база SQLite
+    storage = storage_config()
+    if args.enrich and storage["backend"] != "postgresql":
+        raise SystemExit("Загрузка описаний вакансий (--enrich) поддерживается только для PostgreSQL")
+    database = open_database(storage)
+
+    if args.replay:
+        from src.snapshot import SnapshotReader
+
+        # Воспроизведение снимка содержит полный набор вакансий, поэтому синхронизация всегда полная
+        with SnapshotReader(args.replay) as reader:
+            database.insert_data_to_db(reader.iter_vacancies(), workers=args.workers)
     else:
-        print("Вакансии с зарплатой выше средней не найдены.")
+        crawl(database, args)
+
+    if args.enrich:
+        from src.enrichment import VacancyEnricher
+
+        # Описания запрашиваются только для новых и изменившихся вакансий
+        VacancyEnricher(**config()).enrich()
 
-    # Поиск вакансий по ключевому слову
-    keyword_for_searching = input(
-        "\nВведите ключевое слово для поиска\nОставьте поле пустым, если хотите посмотреть все вакансии: "
+
+def crawl(database: Any, args: argparse.Namespace) -> None:
+    """Загружает вакансии из API HeadHunter в базу данных."""
+    from src.crawl_checkpoint import CrawlCheckpoint
+    from src.hh_api import HeadHunterAPI
+    from src.response_cache import ResponseCache
+    from src.snapshot import INGEST_FIELDS, SnapshotWriter
+
+    # Полная синхронизация раз в сутки закрывает исчезнувшие вакансии,
+    # в остальное время загружаются только вакансии, опубликованные или обновлённые после прошлого запуска
+    sync_state = database.get_sync_state()
+    last_sync_at, last_full_sync_at = sync_state["last_sync_at"], sync_state["last_full_sync_at"]
+    full_sync = (
+        args.full
+        or args.snapshot is not None
+        or last_full_sync_at is None
+        or datetime.now(timezone.utc) - last_full_sync_at > FULL_SYNC_INTERVAL
     )
-    if keyword_for_searching:
-        print(f"\nВакансии с ключевым словом '{keyword_for_searching}':")
-        search_results = count.get_vacancies_with_keyword(keyword_for_searching)
-        if search_results:
-            for vacancy in search_results:
-                emp_id, vacancy_id, employer_name, vacancy_name, salary, vacancy_url = vacancy
-                print(f"Вакансия: {employer_name}")
-                print(f"Ссылка на вакансию: {vacancy_name}")
-                print(f"Город: {salary}")
-                print(f"Зарплата: {vacancy_url} руб.\n")
-        else:
+    date_from = None if full_sync or last_sync_at is None else last_sync_at.isoformat(timespec="seconds")
+
+    snapshot = SnapshotWriter(args.snapshot, fields=INGEST_FIELDS) if args.snapshot else None
+    try:
+        # Прерванная загрузка продолжается с контрольной точки, а не с первой страницы.
+        # Запрос делится на шарды, чтобы не терять вакансии сверх 2000 результатов выдачи
+        hh = HeadHunterAPI(
+            cache=ResponseCache(),
+            checkpoint=CrawlCheckpoint(),
+            preload=False,
+            sharded=True,
+            date_from=date_from,
+            snapshot=snapshot,
+        )
+        # Потоковая вставка вакансий в базу данных по мере загрузки страниц из API: каждая вакансия
+        # один раз преобразуется в компактную запись VacancyRecord
+        database.insert_data_to_db(hh.iter_records(), full_sync=full_sync, workers=args.workers)
+    except BaseException:
+        if snapshot is not None:
+            snapshot.abort()
+        raise
+    if snapshot is not None:
+        snapshot.close()
+
+
+def print_vacancy(vacancy: Any) -> None:
+    """Выводит вакансию из отчётов vacancies_with_higher_salary и search_vacancies."""
+    vacancy_id, vacancy_name, vacancy_url, city, salary, employer_id = vacancy
+    print(f"Вакансия: {vacancy_name}")
+    print(f"Ссылка на вакансию: {vacancy_url}")
+    print(f"Город: {city}")
+    print(f"Зарплата: {salary} руб.\n")
+
+
+def print_report(name: str, rows: list) -> None:
+    """Выводит пакетный отчёт с именем name из REPORTS."""
+    if name == "companies":
+        print("\nКомпании и количество вакансий:")
+        if not rows:
+            print("Информация о компаниях не найдена.")
+        for company, count_vacancies in rows:
+            print(f"Компания: {company} - Вакансий: {count_vacancies}")
+    elif name == "avg_salary":
+        print("\nСредняя зарплата по вакансиям:")
+        if not rows:
+            print("Не удалось получить информацию о средней зарплате.")
+        for vacancy_name, avg in rows:
+            print(f"Вакансия: {vacancy_name} - Средняя зарплата: {round(avg, 2)} руб.")
+    elif name == "higher_salary":
+        print("\nВакансии с зарплатой выше средней:")
+        if not rows:
+            print("Вакансии с зарплатой выше средней не найдены.")
+        for vacancy in rows:
+            print_vacancy(vacancy)
+
+
+def print_vacancy_row(employer_name: str, vacancy_name: str, salary: Any, vacancy_url: str) -> None:
+    """Выводит вакансию из отчёта vacancies (формат get_all_vacancies)."""
+    print(f"Компания: {employer_name}")
+    print(f"Вакансия: {vacancy_name}")
+    print(f"Зарплата: {salary} руб.")
+    print(f"Подробнее: {vacancy_url}\n")
+
+
+async def collect_reports(names: list[str], params: dict) -> dict[str, list]:
+    """
+    Одновременно выполняет отчёты names из REPORTS через асинхронный пул соединений AsyncDBManager,
+    каждый отчёт на своём соединении, и возвращает словарь {имя отчёта: строки}.
+    """
+    from src.async_db_manager import AsyncDBManager
+
+    async with AsyncDBManager(**params) as manager:
+        rows = await asyncio.gather(*(getattr(manager, f"get_{REPORTS[name]}")() for name in names))
+    return dict(zip(names, rows))
+
+
+async def print_all_vacancies(params: dict) -> bool:
+    """Потоково выводит все вакансии через AsyncDBManager. Возвращает False, если вакансий нет."""
+    from src.async_db_manager import AsyncDBManager
+
+    found = False
+    async with AsyncDBManager(**params) as manager:
+        async for vacancy in manager.iter_all_vacancies():
+            found = True
+            print_vacancy_row(*vacancy)
+    return found
+
+
+def report_async(args: argparse.Namespace) -> None:
+    """Выводит отчёты через AsyncDBManager: независимые отчёты выполняются одновременно."""
+    from src.config import config, storage_config
+
+    if storage_config()["backend"] != "postgresql":
+        raise SystemExit("Асинхронные отчёты (--async) поддерживаются только для PostgreSQL")
+
+    if args.name == "vacancies":
+        print("\nВсе вакансии:")
+        if not asyncio.run(print_all_vacancies(config())):
+            print("Вакансии не найдены.")
+        return
+
+    names = list(REPORTS) if args.name == "all" else [args.name]
+    reports = asyncio.run(collect_reports(names, config()))
+    for name in names:
+        print_report(name, reports[name])
+
+
+def report(args: argparse.Namespace) -> None:
+    """Выводит отчёты по вакансиям, уже загруженным в базу данных."""
+    if args.use_async:
+        report_async(args)
+        return
+
+    from src.storage import open_manager
+
+    with open_manager(slow_query_threshold=SLOW_QUERY_THRESHOLD) as manager:
+        if args.name == "vacancies":
+            print("\nВсе вакансии:")
+            # Постраничный вывод: каждая страница запрашивается по курсору, полученному с предыдущей
+            after = None
+            found = False
+            while True:
+                vacancies, after = manager.get_vacancies_page(limit=PAGE_SIZE, after=after)
+                for vacancy in vacancies:
+                    found = True
+                    print_vacancy_row(*vacancy)
+                if after is None:
+                    break
+            if not found:
+                print("Вакансии не найдены.")
+            return
+
+        names = list(REPORTS) if args.name == "all" else [args.name]
+        # Отчёты читаются из одного снимка данных и согласованы между собой, агрегаты берутся из материализованных
+        # представлений, а повторный запрос до следующей загрузки отвечает из кэша
+        reports = manager.get_reports([REPORTS[name] for name in names])
+        for name in names:
+            print_report(name, reports[REPORTS[name]])
+
+
+def search(args: argparse.Namespace) -> None:
+    """Ищет вакансии в базе данных по ключевому слову."""
+    from src.storage import open_manager
+
+    with open_manager(slow_query_threshold=SLOW_QUERY_THRESHOLD) as manager:
+        print(f"\nВакансии с ключевым словом '{args.keyword}':")
+        found = False
+        # Полнотекстовый поиск: регистр не важен, результаты упорядочены по релевантности
+        for vacancy in manager.search_vacancies(args.keyword, limit=args.limit):
+            found = True
+            print_vacancy(vacancy)
+        if not found:
             print("Вакансий с таким ключевым словом не найдено.")
-    else:
-        print("\nВы выбрали показать все вакансии.")
-        vacancies = count.get_all_vacancies()
-        for vacancy in vacancies:
-            employer_name, vacancy_name, salary, vacancy_url = vacancy
-            print(f"Компания: {employer_name}")
-            print(f"Вакансия: {vacancy_name}")
-            print(f"Ссылка на вакансию: {vacancy_url}")
-            print(f"Зарплата: {salary} руб.\n")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Вакансии HeadHunter в базе данных PostgreSQL или SQLite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = subparsers.add_parser("sync", help="загрузить вакансии из API HeadHunter в базу данных")
+    sync_parser.add_argument("--full", action="store_true", help="выполнить полную синхронизацию")
+    sync_parser.add_argument("--workers", type=int, default=1, help="количество процессов загрузки")
+    source = sync_parser.add_mutually_exclusive_group()
+    source.add_argument("--snapshot", metavar="PATH", help="сохранить загруженные вакансии в снимок")
+    source.add_argument("--replay", metavar="PATH", help="загрузить вакансии из снимка вместо API")
+    sync_parser.add_argument("--enrich", action="store_true", help="загрузить подробные описания вакансий")
+    sync_parser.set_defaults(handler=sync)
+
+    report_parser = subparsers.add_parser("report", help="вывести отчёт по загруженным вакансиям")
+    report_parser.add_argument("name", choices=["all", *REPORTS, "vacancies"], help="имя отчёта")
+    report_parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="выполнить отчёты одновременно через асинхронный пул соединений (только PostgreSQL)",
+    )
+    report_parser.set_defaults(handler=report)
+
+    search_parser = subparsers.add_parser("search", help="найти вакансии по ключевому слову")
+    search_parser.add_argument("keyword", help="ключевое слово")
+    search_parser.add_argument("--limit", type=int, default=PAGE_SIZE, help="максимальное количество вакансий")
+    search_parser.set_defaults(handler=search)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+    from src.logger import LOGS_DIR
+    from src.metrics import metrics
+
+    # Метрики запуска в форматах Prometheus и JSON
+    metrics.dump(os.path.join(LOGS_DIR, "metrics.prom"), os.path.join(LOGS_DIR, "metrics.json"))
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,191 @@
+from typing import Any, Callable, Iterable, cast
+
+import numpy as np
+
+from src.db_manager import DBManager
+from src.logger import setup_logger
+from src.vacancy_record import VacancyRecord
+
+logger = setup_logger(__name__)
+
+
+def _tolist(array: np.ndarray) -> list:
+    """Преобразует одномерный массив в список значений Python."""
+    return cast(list, array.tolist())
+
+
+class VacancyAnalytics:
+    """
+    Колоночное хранилище вакансий в памяти для аналитики без обращения к базе данных.
+
+    Вакансии загружаются из базы данных (from_db) или из ответа API HeadHunter (from_vacancies)
+    в массивы NumPy: зарплата, идентификатор работодателя и коды работодателя, города и названия вакансии
+    в словарях уникальных значений. Отчёты DBManager (количество вакансий по компаниям, средняя зарплата
+    по названиям, вакансии с зарплатой выше средней), процентили и гистограммы зарплат вычисляются
+    векторными операциями. Каждый агрегат вычисляется один раз и переиспользуется повторными вызовами.
+    """
+
+    def __init__(self, records: Iterable[tuple]) -> None:
+        """
+        Строит колонки из кортежей (hh_id, vacancy_name, vacancy_url, city, salary, employer_id, employer_name).
+        Отсутствующая зарплата хранится как NaN и не учитывается в статистике зарплат.
+        """
+        names: dict[str, int] = {}
+        cities: dict[str | None, int] = {}
+        employers: dict[str, int] = {}
+        hh_ids, urls, salaries, employer_ids = [], [], [], []
+        name_codes, city_codes, employer_codes = [], [], []
+
+        for hh_id, vacancy_name, vacancy_url, city, salary, employer_id, employer_name in records:
+            hh_ids.append(hh_id)
+            urls.append(vacancy_url)
+            salaries.append(np.nan if salary is None else salary)
+            employer_ids.append(employer_id)
+            name_codes.append(names.setdefault(vacancy_name, len(names)))
+            city_codes.append(cities.setdefault(city, len(cities)))
+            employer_codes.append(employers.setdefault(employer_name, len(employers)))
+
+        self.hh_ids = np.array(hh_ids, dtype=np.int64)
+        self.urls = np.array(urls, dtype=object)
+        self.salaries = np.array(salaries, dtype=np.float64)
+        self.employer_ids = np.array(employer_ids, dtype=np.int64)
+        self.name_codes = np.array(name_codes, dtype=np.int32)
+        self.city_codes = np.array(city_codes, dtype=np.int32)
+        self.employer_codes = np.array(employer_codes, dtype=np.int32)
+        self.names = np.array(list(names), dtype=object)
+        self.cities = np.array(list(cities), dtype=object)
+        self.employer_names = np.array(list(employers), dtype=object)
+        self.__has_salary = ~np.isnan(self.salaries)
+        self.__aggregates: dict[str, Any] = {}
+        logger.info(
+            f"Загружено {len(self)} вакансий: {len(self.names)} названий, {len(self.cities)} городов, "
+            f"{len(self.employer_names)} работодателей."
+        )
+
+    @classmethod
+    def from_db(cls, manager: DBManager, chunk_size: int = 10000) -> "VacancyAnalytics":
+        """Загружает открытые вакансии из базы данных потоково, порциями по chunk_size строк."""
+        return cls(manager.iter_vacancy_records(chunk_size))
+
+    @classmethod
+    def from_vacancies(cls, vacancies: Iterable[dict | VacancyRecord]) -> "VacancyAnalytics":
+        """
+        Загружает вакансии в формате API HeadHunter (например, HeadHunterAPI.vacancies) или записи VacancyRecord
+        (HeadHunterAPI.iter_records). Зарплата и город берутся так же, как при загрузке в базу данных;
+        вакансии без работодателя пропускаются.
+        """
+        records = (
+            vacancy if isinstance(vacancy, VacancyRecord) else VacancyRecord.from_api(vacancy) for vacancy in vacancies
+        )
+        return cls(
+            (
+                record.hh_id,
+                record.name,
+                record.url,
+                record.city,
+                record.salary,
+                record.employer_id,
+                record.employer_name,
+            )
+            for record in records
+            if record.employer_id is not None
+        )
+
+    def __len__(self) -> int:
+        return len(self.hh_ids)
+
+    def _aggregate(self, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Возвращает агрегат name, вычисляя его при первом обращении.
+        Колонки не изменяются после загрузки, поэтому повторные вызовы отчётов не проходят по данным заново.
+        """
+        if name not in self.__aggregates:
+            self.__aggregates[name] = compute()
+        return self.__aggregates[name]
+
+    def _sorted_salaries(self) -> np.ndarray:
+        """Отсортированные зарплаты вакансий с указанной зарплатой."""
+        sorted_salaries: np.ndarray = self._aggregate(
+            "sorted_salaries", lambda: np.sort(self.salaries[self.__has_salary])
+        )
+        return sorted_salaries
+
+    def get_companies_and_vacancies_count(self) -> list[tuple[str, int]]:
+        """Количество вакансий для каждой компании, как DBManager.get_companies_and_vacancies_count."""
+
+        def compute() -> list[tuple[str, int]]:
+            counts = np.bincount(self.employer_codes, minlength=len(self.employer_names))
+            return list(zip(_tolist(self.employer_names), _tolist(counts)))
+
+        return list(self._aggregate("companies_and_vacancies_count", compute))
+
+    def get_avg_salary(self) -> list[tuple[str, float | None]]:
+        """
+        Средняя зарплата по названиям вакансий, как DBManager.get_avg_salary.
+        Для названий, у которых ни в одной вакансии нет зарплаты, возвращается None.
+        """
+
+        def compute() -> list[tuple[str, float | None]]:
+            salaries = np.where(self.__has_salary, self.salaries, 0.0)
+            sums = np.bincount(self.name_codes, weights=salaries, minlength=len(self.names))
+            counts = np.bincount(self.name_codes, weights=self.__has_salary, minlength=len(self.names))
+            averages = np.divide(sums, counts, out=np.zeros(len(sums)), where=counts > 0).astype(object)
+            averages[counts == 0] = None
+            return list(zip(_tolist(self.names), _tolist(averages)))
+
+        return list(self._aggregate("avg_salary", compute))
+
+    def get_mean_salary(self) -> float | None:
+        """Средняя зарплата по всем вакансиям с указанной зарплатой."""
+        salaries = self._sorted_salaries()
+        mean_salary: float | None = self._aggregate(
+            "mean_salary", lambda: float(salaries.mean()) if len(salaries) else None
+        )
+        return mean_salary
+
+    def get_vacancies_with_higher_salary(self) -> list[tuple]:
+        """
+        Вакансии с зарплатой выше средней в виде кортежей (hh_id, vacancy_name, vacancy_url, city, salary,
+        employer_id). В отличие от DBManager, первым полем возвращается идентификатор вакансии на HeadHunter.
+        """
+
+        def compute() -> list[tuple]:
+            mean_salary = self.get_mean_salary()
+            if mean_salary is None:
+                return []
+            mask = self.__has_salary & (self.salaries > mean_salary)
+            return list(
+                zip(
+                    _tolist(self.hh_ids[mask]),
+                    _tolist(self.names[self.name_codes[mask]]),
+                    _tolist(self.urls[mask]),
+                    _tolist(self.cities[self.city_codes[mask]]),
+                    _tolist(self.salaries[mask]),
+                    _tolist(self.employer_ids[mask]),
+                )
+            )
+
+        return list(self._aggregate("vacancies_with_higher_salary", compute))
+
+    def salary_percentiles(self, percentiles: Iterable[float] = (25, 50, 75, 90, 99)) -> dict[float, float]:
+        """
+        Процентили зарплаты по вакансиям с указанной зарплатой (с линейной интерполяцией, как numpy.percentile).
+        Вычисляются по заранее отсортированным зарплатам, поэтому не требуют прохода по данным.
+        """
+        percentiles = list(percentiles)
+        salaries = self._sorted_salaries()
+        if not len(salaries):
+            return {}
+        positions = np.asarray(percentiles, dtype=np.float64) / 100 * (len(salaries) - 1)
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.ceil(positions).astype(np.int64)
+        values = salaries[lower] + (salaries[upper] - salaries[lower]) * (positions - lower)
+        return dict(zip(percentiles, _tolist(values)))
+
+    def salary_histogram(self, bins: int | list[float] = 10) -> tuple[list[int], list[float]]:
+        """
+        Гистограмма зарплат: количество вакансий в каждом интервале и границы интервалов.
+        bins — количество интервалов одинаковой ширины или список границ.
+        """
+        counts, edges = np.histogram(self._sorted_salaries(), bins=bins)
+        return _tolist(counts), _tolist(edges)
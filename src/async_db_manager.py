@@ -0,0 +1,267 @@
+import time
+import uuid
+from typing import Any, AsyncIterator
+
+import psycopg
+from psycopg_pool import AsyncConnectionPool
+
+from src import db_manager
+from src.base_db import DBBase
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AsyncDBManager(DBBase):
+    """
+    Асинхронный аналог DBManager на основе psycopg 3 и asyncio.
+
+    Предоставляет те же запросы, что и DBManager, но в виде корутин, которые выполняются через
+    асинхронный пул соединений. Независимые отчёты можно запускать одновременно через asyncio.gather,
+    каждый из них получает своё соединение из пула.
+    Потоковые методы iter_* выполняют запрос через серверный курсор и отдают строки асинхронным итератором.
+    Пул открывается при первом запросе (или явно методом open) и закрывается методом close
+    либо при выходе из асинхронного контекстного менеджера.
+    """
+
+    def __init__(
+        self,
+        database_name: str = "headhunter",
+        pool_min: int = 1,
+        pool_max: int = 10,
+        pool_timeout: float = 30.0,
+        **params: dict,
+    ) -> None:
+        """
+        Инициализирует объект AsyncDBManager с параметрами для подключения к базе данных.
+        pool_min и pool_max задают минимальный и максимальный размер пула соединений,
+        pool_timeout — сколько секунд ждать свободное соединение.
+        """
+        super().__init__()
+        self.database_name = database_name
+        self.params = params
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+        self.pool_timeout = pool_timeout
+        self.__pool: AsyncConnectionPool | None = None
+        logger.info(f"Инициализация AsyncDBManager с базой данных: {self.database_name}")
+
+    async def open(self) -> AsyncConnectionPool:
+        """Открывает пул соединений, если он ещё не открыт, и возвращает его."""
+        if self.__pool is None:
+            required_params = ["host", "user", "password", "port"]
+            for param in required_params:
+                if param not in self.params:
+                    logger.error(f"Отсутствует обязательный параметр: {param}")
+                    raise ValueError(f"Отсутствует обязательный параметр: {param}")
+
+            pool = AsyncConnectionPool(
+                kwargs={
+                    "dbname": self.database_name,
+                    "user": self.params.get("user"),
+                    "password": self.params.get("password"),
+                    "host": self.params.get("host", "localhost"),
+                    "port": self.params.get("port", 5432),
+                },
+                min_size=self.pool_min,
+                max_size=self.pool_max,
+                timeout=self.pool_timeout,
+                open=False,
+            )
+            try:
+                await pool.open(wait=True, timeout=self.pool_timeout)
+            except Exception as e:
+                logger.error(f"Ошибка при создании пула соединений с базой данных {self.database_name}: {e}")
+                await pool.close()
+                raise
+            self.__pool = pool
+        return self.__pool
+
+    async def close(self) -> None:
+        """Закрывает пул соединений."""
+        if self.__pool is not None:
+            await self.__pool.close()
+            self.__pool = None
+
+    async def __aenter__(self) -> "AsyncDBManager":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _fetchall(
+        self, name: str, query: str, params: Any = None, description: str = "", setup: str | None = None
+    ) -> list[tuple]:
+        """
+        Выполняет запрос на соединении из пула и возвращает все строки результата.
+        Время выполнения и количество строк записываются в метрики с меткой name.
+        """
+        return (await self._fetch_queries([(name, query, params)], description, setup=setup))[name]
+
+    async def _fetch_queries(
+        self,
+        queries: list[tuple[str, str, Any]],
+        description: str = "",
+        snapshot: bool = False,
+        setup: str | None = None,
+    ) -> dict[str, list[tuple]]:
+        """
+        Выполняет запросы (имя, запрос, параметры) подряд на одном соединении из пула, как
+        DBManager._fetch_queries. При snapshot=True запросы читают один снимок данных (REPEATABLE READ READ ONLY),
+        команда setup выполняется в той же транзакции перед запросами.
+        """
+        pool = await self.open()
+        result: dict[str, list[tuple]] = {}
+        try:
+            async with pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    logger.info(f"Запуск запроса для получения {description}.")
+                    if snapshot:
+                        await cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+                    if setup is not None:
+                        await cur.execute(setup)
+                    for name, query, params in queries:
+                        started = time.perf_counter()
+                        await cur.execute(query, params)
+                        result[name] = await cur.fetchall()
+                        self._record_query(name, time.perf_counter() - started, len(result[name]))
+                    logger.info(f"Запрос для получения {description} успешно выполнен.")
+                    return result
+        except psycopg.Error as e:
+            logger.error(f"Ошибка при получении {description}: {e}")
+            raise
+
+    async def _iter_query(
+        self, name: str, query: str, params: tuple = (), chunk_size: int = 1000
+    ) -> AsyncIterator[tuple]:
+        """
+        Выполняет запрос через именованный (серверный) курсор и отдаёт строки по одной, как DBManager._iter_query.
+        Строки передаются с сервера порциями по chunk_size штук, соединение занято до исчерпания итератора.
+        """
+        pool = await self.open()
+        started = time.perf_counter()
+        count = 0
+        async with pool.connection() as conn:
+            async with conn.cursor(name=f"adbm_{uuid.uuid4().hex}") as cur:
+                cur.itersize = chunk_size
+                await cur.execute(query, params)
+                while rows := await cur.fetchmany(chunk_size):
+                    count += len(rows)
+                    for row in rows:
+                        yield row
+        self._record_query(name, time.perf_counter() - started, count)
+
+    async def get_companies_and_vacancies_count(self) -> list[tuple]:
+        """Получает количество вакансий для каждой компании."""
+        return await self._fetchall(
+            "companies_and_vacancies_count",
+            db_manager.COMPANIES_AND_VACANCIES_COUNT_QUERY,
+            description="количества вакансий по компаниям",
+        )
+
+    async def get_all_vacancies(self) -> list[tuple]:
+        """Получает все вакансии с информацией о работодателе, названии вакансии, зарплате и URL вакансии"""
+        return await self._fetchall("all_vacancies", db_manager.ALL_VACANCIES_QUERY, description="всех вакансий")
+
+    async def get_avg_salary(self) -> list[tuple]:
+        """Получает среднюю зарплату по вакансиям."""
+        return await self._fetchall("avg_salary", db_manager.AVG_SALARY_QUERY, description="средней зарплаты")
+
+    async def get_vacancies_with_higher_salary(self) -> list[tuple]:
+        """Получает вакансии с зарплатой выше средней."""
+        return await self._fetchall(
+            "vacancies_with_higher_salary",
+            db_manager.HIGHER_SALARY_QUERY,
+            description="вакансий с зарплатой выше средней",
+        )
+
+    async def get_vacancies_with_keyword(self, keyword: str) -> list[tuple]:
+        """Получает вакансии, содержащие указанное ключевое слово."""
+        return await self._fetchall(
+            "vacancies_with_keyword",
+            db_manager.KEYWORD_QUERY,
+            (f"%{keyword}%",),
+            description=f"вакансий с ключевым словом '{keyword}'",
+        )
+
+    async def search_vacancies(self, text: str, limit: int = 100) -> list[tuple]:
+        """
+        Ищет вакансии по словам из text, упорядочивая их по релевантности, как DBManager.search_vacancies:
+        полнотекстовый поиск, а если он ничего не нашёл — нечёткий поиск по триграммам.
+        """
+        tsquery = db_manager.build_tsquery(text)
+        if not tsquery:
+            return []
+        result = await self._fetchall(
+            "search_vacancies",
+            db_manager.SEARCH_QUERY,
+            {"tsquery": tsquery, "limit": limit},
+            description=f"вакансий по запросу '{text}'",
+        )
+        if result:
+            return result
+        return await self._fetchall(
+            "fuzzy_search_vacancies",
+            db_manager.FUZZY_SEARCH_QUERY,
+            {"text": text, "tsquery": tsquery, "limit": limit},
+            description=f"вакансий по нечёткому запросу '{text}'",
+            setup=db_manager.FUZZY_SEARCH_SETUP,
+        )
+
+    async def get_reports(self, reports: list[str], keyword: str | None = None) -> dict[str, list[tuple]]:
+        """Вычисляет несколько отчётов в одном снимке данных, как DBManager.get_reports."""
+        return await self._fetch_queries(
+            db_manager.build_report_queries(reports, keyword),
+            description=f"отчётов {', '.join(reports)}",
+            snapshot=True,
+        )
+
+    async def iter_all_vacancies(self, chunk_size: int = 1000) -> AsyncIterator[tuple]:
+        """Потоково отдаёт все вакансии в формате get_all_vacancies."""
+        async for row in self._iter_query("iter_all_vacancies", db_manager.ALL_VACANCIES_QUERY, chunk_size=chunk_size):
+            yield row
+
+    async def iter_vacancies_with_higher_salary(self, chunk_size: int = 1000) -> AsyncIterator[tuple]:
+        """Потоково отдаёт вакансии с зарплатой выше средней в формате get_vacancies_with_higher_salary."""
+        async for row in self._iter_query(
+            "iter_vacancies_with_higher_salary", db_manager.HIGHER_SALARY_QUERY, chunk_size=chunk_size
+        ):
+            yield row
+
+    async def iter_vacancies_with_keyword(self, keyword: str, chunk_size: int = 1000) -> AsyncIterator[tuple]:
+        """Потоково отдаёт вакансии с ключевым словом в формате get_vacancies_with_keyword."""
+        async for row in self._iter_query(
+            "iter_vacancies_with_keyword", db_manager.KEYWORD_QUERY, (f"%{keyword}%",), chunk_size=chunk_size
+        ):
+            yield row
+
+    async def iter_vacancy_records(self, chunk_size: int = 10000) -> AsyncIterator[tuple]:
+        """
+        Потоково отдаёт открытые вакансии вместе с работодателем в виде кортежей
+        (hh_id, vacancy_name, vacancy_url, city, salary, employer_id, employer_name).
+        """
+        async for row in self._iter_query(
+            "iter_vacancy_records", db_manager.VACANCY_RECORDS_QUERY, chunk_size=chunk_size
+        ):
+            yield row
+
+    async def get_vacancies_page(
+        self, limit: int = 100, after: int | None = None, keyword: str | None = None
+    ) -> tuple[list[tuple], int | None]:
+        """
+        Получает страницу вакансий в формате get_all_vacancies, упорядоченных по vacancy_id.
+        Возвращает строки страницы и курсор следующей страницы (None, если страница последняя).
+        """
+        rows = await self._fetchall(
+            "vacancies_page",
+            db_manager.VACANCIES_PAGE_QUERY,
+            {
+                "after": after if after is not None else 0,
+                "keyword": f"%{keyword}%" if keyword else None,
+                "limit": limit,
+            },
+            description="страницы вакансий",
+        )
+        next_after = rows[-1][0] if len(rows) == limit else None
+        return [row[1:] for row in rows], next_after
@@ -1,6 +1,77 @@
+import functools
 from abc import ABC
+from typing import Any, Callable
+
+from src.logger import setup_logger
+from src.metrics import metrics
+from src.query_cache import QueryCache
+
+logger = setup_logger(__name__)
+
+# Общие для менеджеров баз данных части отчётов, кэша и метрик запросов: модуль не импортирует драйверы баз данных
+
+# Имена пакетных отчётов get_reports, запросы каждого хранилища описаны в его REPORT_QUERIES
+REPORT_NAMES = (
+    "companies_and_vacancies_count",
+    "all_vacancies",
+    "avg_salary",
+    "vacancies_with_higher_salary",
+    "vacancies_with_keyword",
+)
+
+
+def check_reports(reports: list[str] | tuple[str, ...], keyword: str | None = None) -> None:
+    """Проверяет имена пакетных отчётов и наличие ключевого слова для vacancies_with_keyword."""
+    unknown = [report for report in reports if report not in REPORT_NAMES]
+    if unknown:
+        raise ValueError(f"Неизвестные отчёты: {', '.join(unknown)}")
+    if "vacancies_with_keyword" in reports and not keyword:
+        raise ValueError("Для отчёта vacancies_with_keyword нужно ключевое слово")
+
+
+def cached_report(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Кэширует результат метода отчёта в кэше запросов менеджера (метод _cached).
+    Ключ кэша — имя метода и его аргументы, запись действительна, пока не сменилось поколение данных.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        key = (method.__name__, *args, *sorted(kwargs.items()))
+        return self._cached(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
 
 
 class DBBase(ABC):
+    # Кэш результатов отчётов; None — кэш выключен
+    cache: QueryCache | None = None
+
     def _init(self) -> None:
         pass
+
+    def get_data_generation(self) -> int:
+        """Возвращает текущее поколение данных, которое увеличивается после каждой загрузки."""
+        raise NotImplementedError
+
+    def _cached(self, key: tuple, load: Callable[[], Any]) -> Any:
+        """Возвращает результат из кэша, если он получен при текущем поколении данных, иначе выполняет load."""
+        if self.cache is None:
+            return load()
+
+        generation = self.get_data_generation()
+        hit, value = self.cache.get(key, generation)
+        if hit:
+            logger.info(f"Результат {key[0]} взят из кэша (поколение данных {generation}).")
+            return list(value)
+
+        value = load()
+        self.cache.set(key, generation, value)
+        return list(value)
+
+    @staticmethod
+    def _record_query(name: str, duration: float, rows: int) -> None:
+        """Записывает в метрики выполнение запроса name: длительность и количество строк."""
+        metrics.inc("db_queries_total", query=name)
+        metrics.inc("db_query_rows_total", rows, query=name)
+        metrics.observe("db_query_seconds", duration, query=name)
@@ -1,4 +1,54 @@
 from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from src.vacancy_record import VacancyRecord
+
+# Общие для хранилищ PostgreSQL и SQLite части загрузки: модуль не импортирует драйверы баз данных
+
+# Сколько отклонённых записей выводить в лог поимённо, остальные учитываются только в итоговом количестве
+REJECTS_LOG_LIMIT = 10
+
+
+def batched(iterable: Iterable[Any], batch_size: int) -> Iterator[list[Any]]:
+    """Разбивает поток вакансий на списки длиной не больше batch_size."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def prepare_batch(
+    batch: list[dict | VacancyRecord], rejects: list[tuple[str, str]]
+) -> tuple[list[tuple[str, tuple]], list[tuple[str, tuple]], list[int]]:
+    """
+    Готовит строки для вставки из пачки вакансий.
+    Вакансии в формате API HeadHunter преобразуются в VacancyRecord, готовые записи используются как есть.
+    Возвращает уникальных работодателей, уникальные по идентификатору HH строки вакансий (каждая строка
+    снабжена ключом для отчёта об ошибках) и идентификаторы всех вакансий пачки, включая отклонённые.
+    Вакансии без работодателя или с некорректными данными попадают в rejects.
+    """
+    employers: dict[int, tuple[str, tuple]] = {}
+    rows: dict[int, tuple[str, tuple]] = {}
+    seen: list[int] = []
+    for vacancy in batch:
+        if isinstance(vacancy, VacancyRecord):
+            record = vacancy
+        else:
+            try:
+                record = VacancyRecord.from_api(vacancy)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                rejects.append((f"вакансия {vacancy.get('id')}", f"некорректные данные: {e!r}"))
+                continue
+
+        key = f"вакансия {record.hh_id}"
+        seen.append(record.hh_id)
+        if record.employer_id is None:
+            rejects.append((key, "отсутствуют данные о работодателе"))
+            continue
+        if record.employer_id not in employers:
+            employers[record.employer_id] = (f"работодатель {record.employer_id}", record.employer_row())
+        rows[record.hh_id] = (key, record.vacancy_row())
+    return list(employers.values()), list(rows.values()), seen
 
 
 class Base_SQL(ABC):
@@ -14,5 +64,5 @@ class Base_SQL(ABC):
         pass
 
     @abstractmethod
-    def insert_data_to_db(self, vacancies: list[dict]) -> None:
+    def insert_data_to_db(self, vacancies: Iterable[dict | VacancyRecord]) -> list[tuple[str, str]]:
         pass
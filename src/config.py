@@ -3,6 +3,10 @@ from configparser import ConfigParser
 from os.path import dirname
 
 database_name = os.path.join(dirname(__file__), "../database.ini")
+# Файл встроенной базы SQLite по умолчанию
+sqlite_path = os.path.join(dirname(__file__), "../data/headhunter.sqlite3")
+# Хранилища, которые можно выбрать в секции [storage]
+STORAGE_BACKENDS = ("postgresql", "sqlite")
 
 employer_id = [
     "1942330",
@@ -36,3 +40,20 @@ def config(filename: str = database_name, section: str = "postgresql") -> dict:
     else:
         raise Exception("Section {0} is not found in the {1} file.".format(section, filename))
     return db
+
+
+def storage_config(filename: str = database_name) -> dict:
+    """
+    Читает необязательную секцию [storage] с выбором хранилища: backend — postgresql (по умолчанию)
+    или sqlite, path — файл базы SQLite (по умолчанию data/headhunter.sqlite3).
+    """
+    parser = ConfigParser()
+    parser.read(filename)
+    storage = dict(parser.items("storage")) if parser.has_section("storage") else {}
+    storage.setdefault("backend", "postgresql")
+    storage.setdefault("path", sqlite_path)
+    if storage["backend"] not in STORAGE_BACKENDS:
+        raise ValueError(
+            f"Неизвестное хранилище {storage['backend']}, допустимые значения: {', '.join(STORAGE_BACKENDS)}"
+        )
+    return storage
@@ -0,0 +1,121 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Папка для контрольных точек загрузки в корне проекта
+CHECKPOINT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "checkpoints"))
+
+
+class CrawlCheckpoint:
+    """
+    Контрольная точка постраничной загрузки вакансий на диске.
+    Каждая загруженная страница сохраняется в отдельный JSON-файл, а в state.json записываются запрос
+    и номера уже загруженных страниц. Если загрузка прервалась, следующая загрузка
+    того же запроса берёт сохранённые страницы с диска и запрашивает у API только недостающие.
+    При загрузке шардами в state.json сохраняется и план шардов, чтобы продолжение загрузки
+    не планировало запрос заново. Контрольная точка другого запроса или старше ttl секунд сбрасывается.
+    После успешной загрузки всех страниц контрольная точка удаляется методом clear.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_DIR, ttl: float = 24 * 3600) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        self.__state: dict[str, Any] = {}
+
+    @staticmethod
+    def _key(url: str, params: dict) -> str:
+        """Вычисляет ключ запроса по URL и параметрам без номера страницы."""
+        raw = json.dumps([url, {k: v for k, v in params.items() if k != "page"}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _page_path(self, page: int) -> str:
+        return os.path.join(self.path, f"page_{page}.json")
+
+    def start(self, url: str, params: dict) -> None:
+        """
+        Открывает контрольную точку запроса. Сохранённое состояние того же запроса продолжается,
+        иначе контрольная точка сбрасывается.
+        """
+        key = self._key(url, params)
+        state = self._read(os.path.join(self.path, "state.json"))
+        if state and state.get("query") == key and time.time() - state.get("started_at", 0) < self.ttl:
+            self.__state = state
+            if state["completed"]:
+                logger.info(
+                    f"Загрузка продолжается с контрольной точки: сохранено {len(state['completed'])} страниц, "
+                    f"следующая страница {self.cursor}"
+                )
+            return
+
+        self.clear()
+        os.makedirs(self.path, exist_ok=True)
+        self.__state = {"query": key, "started_at": time.time(), "completed": []}
+        self._write(os.path.join(self.path, "state.json"), self.__state)
+
+    @property
+    def cursor(self) -> int:
+        """Номер первой страницы, которая ещё не сохранена."""
+        completed = set(self.__state.get("completed", []))
+        page = 0
+        while page in completed:
+            page += 1
+        return page
+
+    @property
+    def plan(self) -> list[dict] | None:
+        """Сохранённый план шардов (параметры каждого шарда) или None, если план ещё не сохранён."""
+        plan: list[dict] | None = self.__state.get("plan")
+        return plan
+
+    def save_plan(self, shards: list[dict]) -> None:
+        """Сохраняет план шардов загрузки."""
+        with self.__lock:
+            self.__state["plan"] = shards
+            self._write(os.path.join(self.path, "state.json"), self.__state)
+
+    def get(self, page: int) -> dict | None:
+        """Возвращает сохранённый ответ API для страницы или None, если страница ещё не загружена."""
+        if page not in self.__state.get("completed", []):
+            return None
+        data: dict | None = self._read(self._page_path(page))
+        return data
+
+    def save(self, page: int, data: dict) -> None:
+        """Сохраняет ответ API для страницы."""
+        with self.__lock:
+            self._write(self._page_path(page), data)
+            if page not in self.__state["completed"]:
+                self.__state["completed"].append(page)
+            self._write(os.path.join(self.path, "state.json"), self.__state)
+
+    def clear(self) -> None:
+        """Удаляет файлы контрольной точки."""
+        self.__state = {}
+        for path in [os.path.join(self.path, "state.json"), *glob.glob(os.path.join(self.path, "page_*.json"))]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _read(path: str) -> Any:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write(path: str, data: Any) -> None:
+        # Запись через временный файл, чтобы прерванная запись не оставила повреждённый файл
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# API HeadHunter отдаёт не более 2000 результатов на запрос, остальные найденные вакансии недоступны
+MAX_RESULTS = 2000
+# Поиск API HeadHunter охватывает вакансии за последние 30 дней
+SEARCH_PERIOD = timedelta(days=30)
+# Окно публикации, которое уже не делится: более мелкие окна не уменьшают выдачу
+MIN_WINDOW = timedelta(minutes=1)
+
+
+class CrawlPlanner:
+    """
+    Планировщик загрузки, который обходит ограничение API HeadHunter в 2000 результатов на запрос.
+    Для каждого запроса (шарда) запрашивается первая страница и проверяется поле found. Если найдено больше
+    max_results вакансий, запрос делится пополам: сначала по списку работодателей (employer_id),
+    а для одного работодателя — по окну даты публикации (date_from/date_to). Деление повторяется,
+    пока каждый шард не помещается в выдачу. Шарды одного уровня проверяются параллельно.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[dict], dict],
+        max_results: int = MAX_RESULTS,
+        min_window: timedelta = MIN_WINDOW,
+        max_workers: int = 5,
+    ) -> None:
+        """
+        fetch получает параметры шарда и возвращает первую страницу его выдачи (ответ API с полем found).
+        """
+        self.fetch = fetch
+        self.max_results = max_results
+        self.min_window = min_window
+        self.max_workers = max_workers
+
+    def plan(self, params: dict) -> list[tuple[dict, dict]]:
+        """
+        Делит запрос params на шарды, каждый из которых возвращает не больше max_results вакансий.
+        Возвращает пары (параметры шарда, первая страница его выдачи): первая страница уже загружена
+        при планировании и повторно не запрашивается.
+        """
+        plan: list[tuple[dict, dict]] = []
+        frontier = [params]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while frontier:
+                next_frontier = []
+                for shard, data in zip(frontier, executor.map(self.fetch, frontier)):
+                    found = data.get("found") or 0
+                    parts = self._split(shard) if found > self.max_results else []
+                    if parts:
+                        next_frontier.extend(parts)
+                        continue
+                    if found > self.max_results:
+                        logger.warning(
+                            f"Шард {self._describe(shard)} нельзя разделить дальше: "
+                            f"из {found} вакансий будут загружены только {self.max_results}"
+                        )
+                    plan.append((shard, data))
+                frontier = next_frontier
+
+        found = sum(data.get("found") or 0 for _, data in plan)
+        logger.info(f"Запрос разделён на {len(plan)} шардов, найдено {found} вакансий")
+        return plan
+
+    def _split(self, shard: dict) -> list[dict]:
+        """Делит шард пополам по работодателям или по окну публикации. Возвращает [], если делить нечего."""
+        employers = shard.get("employer_id")
+        if isinstance(employers, list) and len(employers) > 1:
+            middle = len(employers) // 2
+            return [{**shard, "employer_id": employers[:middle]}, {**shard, "employer_id": employers[middle:]}]
+
+        # Граница окна округляется вверх до часа, чтобы разбиение повторялось между запусками в течение часа
+        # и ответы шардов можно было брать из кэша; прерванная загрузка берёт план из контрольной точки
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        date_from = self._parse_date(shard.get("date_from")) or now - SEARCH_PERIOD
+        date_to = self._parse_date(shard.get("date_to")) or now
+        if date_to - date_from <= self.min_window:
+            return []
+        middle_date = date_from + (date_to - date_from) / 2
+        return [
+            {**shard, "date_from": self._format_date(date_from), "date_to": self._format_date(middle_date)},
+            {**shard, "date_from": self._format_date(middle_date), "date_to": self._format_date(date_to)},
+        ]
+
+    @staticmethod
+    def _parse_date(value: str | None) -> datetime | None:
+        """Разбирает дату в формате ISO 8601; дата без часового пояса считается датой в UTC."""
+        if not value:
+            return None
+        date = datetime.fromisoformat(value)
+        return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+    @staticmethod
+    def _format_date(value: datetime) -> str:
+        """Форматирует дату в ISO 8601 с точностью до секунды."""
+        return value.isoformat(timespec="seconds")
+
+    @staticmethod
+    def _describe(shard: dict) -> str:
+        """Краткое описание шарда для лога."""
+        return ", ".join(f"{key}={shard.get(key)}" for key in ("employer_id", "date_from", "date_to"))
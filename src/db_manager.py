@@ -1,13 +1,130 @@
-from typing import Any
+import re
+import threading
+import time
+import uuid
+from typing import Any, Iterator
 
 import psycopg2
 
-from src.base_db import DBBase
+from src.base_db import DBBase, cached_report, check_reports
+from src.db_pool import ConnectionPool
 from src.logger import setup_logger
+from src.metrics import metrics
+from src.query_cache import QueryCache
 
 # Настроим логгер для этого модуля
 logger = setup_logger(__name__)
 
+# Агрегаты читаются из материализованных представлений, которые DataBaseSQL обновляет после каждой загрузки
+COMPANIES_AND_VACANCIES_COUNT_QUERY = """
+    SELECT employer_name, vacancy_count FROM employer_vacancy_counts
+"""
+
+ALL_VACANCIES_QUERY = """
+    SELECT employer.employer_name, vacancies.vacancy_name, vacancies.salary, vacancies.vacancy_url
+    FROM vacancies
+    JOIN employer ON employer.employer_id = vacancies.employer_id
+    WHERE NOT vacancies.is_closed
+"""
+
+AVG_SALARY_QUERY = """
+    SELECT vacancy_name, avg_salary FROM vacancy_avg_salaries
+"""
+
+HIGHER_SALARY_QUERY = """
+    SELECT vacancy_id, vacancy_name, vacancy_url, city, salary, employer_id FROM vacancies
+    WHERE NOT is_closed AND salary > (SELECT avg_salary FROM salary_stats)
+"""
+
+KEYWORD_QUERY = """
+    SELECT vacancy_id, vacancy_name, vacancy_url, city, salary, employer_id FROM vacancies
+    WHERE NOT is_closed AND vacancy_name LIKE %s
+"""
+
+# Полнотекстовый поиск: результаты упорядочены по релевантности (ts_rank), запрос строится функцией
+# build_tsquery, поэтому слова ищутся с учётом словоформ и как префиксы
+SEARCH_QUERY = """
+    SELECT vacancy_id, vacancy_name, vacancy_url, city, salary, employer_id
+    FROM vacancies, to_tsquery('russian', %(tsquery)s) AS query
+    WHERE NOT is_closed AND search_vector @@ query
+    ORDER BY ts_rank(search_vector, query) DESC, vacancy_id
+    LIMIT %(limit)s
+"""
+
+# Нечёткий поиск по триграммам для запросов с опечатками: находит названия, в которых есть слово,
+# похожее на запрос, и использует триграммный индекс vacancies_name_trgm_idx.
+# Порог сходства по умолчанию (0.6) отсекает слова с одной ошибкой, поэтому FUZZY_SEARCH_SETUP снижает его
+# на время транзакции. Это отдельная команда: EXPLAIN медленного запроса принимает только один оператор.
+# Запрос из одних стоп-слов («и», «по») после нормализации пуст (numnode = 0): для него нечёткий поиск
+# не выполняется, иначе короткое слово совпало бы с произвольными названиями
+FUZZY_SEARCH_SETUP = "SET LOCAL pg_trgm.word_similarity_threshold = 0.5"
+
+FUZZY_SEARCH_QUERY = """
+    SELECT vacancy_id, vacancy_name, vacancy_url, city, salary, employer_id
+    FROM vacancies
+    WHERE numnode(to_tsquery('russian', %(tsquery)s)) > 0 AND NOT is_closed AND %(text)s <%% vacancy_name
+    ORDER BY word_similarity(%(text)s, vacancy_name) DESC, vacancy_id
+    LIMIT %(limit)s
+"""
+
+# Открытые вакансии с данными работодателя для загрузки в колоночное хранилище VacancyAnalytics
+VACANCY_RECORDS_QUERY = """
+    SELECT vacancies.hh_id, vacancies.vacancy_name, vacancies.vacancy_url, vacancies.city, vacancies.salary,
+        vacancies.employer_id, employer.employer_name
+    FROM vacancies
+    JOIN employer ON employer.employer_id = vacancies.employer_id
+    WHERE NOT vacancies.is_closed
+"""
+
+# Постраничная выборка по ключу: следующая страница начинается после последнего vacancy_id предыдущей,
+# поэтому каждая страница читается по первичному ключу за одинаковое время, независимо от её номера
+VACANCIES_PAGE_QUERY = """
+    SELECT vacancies.vacancy_id, employer.employer_name, vacancies.vacancy_name, vacancies.salary,
+        vacancies.vacancy_url
+    FROM vacancies
+    JOIN employer ON employer.employer_id = vacancies.employer_id
+    WHERE NOT vacancies.is_closed AND vacancies.vacancy_id > %(after)s
+        AND (%(keyword)s::text IS NULL OR vacancies.vacancy_name LIKE %(keyword)s)
+    ORDER BY vacancies.vacancy_id
+    LIMIT %(limit)s
+"""
+
+
+# Пакетные отчёты: запросы get_* методов выполняются подряд в одной транзакции REPEATABLE READ READ ONLY,
+# поэтому все отчёты читаются из одного снимка данных. Количество вакансий по компаниям, средние зарплаты
+# и средняя для сравнения читаются из материализованных агрегатов, таблицу vacancies читают только
+# построчные отчёты
+REPORT_QUERIES = {
+    "companies_and_vacancies_count": COMPANIES_AND_VACANCIES_COUNT_QUERY,
+    "all_vacancies": ALL_VACANCIES_QUERY,
+    "avg_salary": AVG_SALARY_QUERY,
+    "vacancies_with_higher_salary": HIGHER_SALARY_QUERY,
+    "vacancies_with_keyword": KEYWORD_QUERY,
+}
+
+
+def build_report_queries(
+    reports: list[str] | tuple[str, ...], keyword: str | None = None
+) -> list[tuple[str, str, Any]]:
+    """
+    Возвращает запросы пакетных отчётов в виде троек (имя отчёта, запрос, параметры)
+    без повторов и в порядке reports.
+    """
+    check_reports(reports, keyword)
+    return [
+        (report, REPORT_QUERIES[report], (f"%{keyword}%",) if report == "vacancies_with_keyword" else None)
+        for report in dict.fromkeys(reports)
+    ]
+
+
+def build_tsquery(text: str) -> str:
+    """
+    Строит текст запроса to_tsquery из пользовательской строки: каждое слово ищется как префикс
+    (слово:*), все слова должны присутствовать в названии. Знаки препинания и операторы tsquery
+    отбрасываются. Для строки без слов возвращается пустая строка.
+    """
+    return " & ".join(f"{word}:*" for word in re.findall(r"\w+", text.lower()))
+
 
 class DBManager(DBBase):
     """
@@ -19,24 +136,91 @@ class DBManager(DBBase):
     - Получение средней зарплаты по вакансиям.
     - Получение вакансий с зарплатой выше средней.
     - Получение вакансий, содержащих указанное ключевое слово.
+
+    Запросы выполняются через пул соединений, который создаётся при первом запросе.
+    Объект можно использовать как контекстный менеджер: при выходе пул закрывается.
+    Результаты get_* методов кэшируются в памяти до следующей загрузки данных (смены data_generation).
     """
 
-    def __init__(self, database_name: str = "headhunter", **params: dict) -> None:
-        """Инициализирует объект DBManager с параметрами для подключения к базе данных."""
+    def __init__(
+        self,
+        database_name: str = "headhunter",
+        pool_min: int = 1,
+        pool_max: int = 10,
+        pool_timeout: float = 30.0,
+        cache_size: int = 128,
+        cache_ttl: float = 300.0,
+        slow_query_threshold: float | None = None,
+        **params: dict,
+    ) -> None:
+        """
+        Инициализирует объект DBManager с параметрами для подключения к базе данных.
+        pool_min и pool_max задают минимальный и максимальный размер пула соединений,
+        pool_timeout — сколько секунд ждать свободное соединение.
+        cache_size и cache_ttl задают размер и время жизни записей кэша отчётов, cache_size=0 отключает кэш.
+        Если задан slow_query_threshold (в секундах), для запросов, выполнявшихся дольше, сохраняется
+        план EXPLAIN (ANALYZE, BUFFERS). План получается повторным выполнением запроса, поэтому режим
+        предназначен для поиска узких мест, а не для постоянной работы.
+        """
         super().__init__()
         self.database_name = database_name
         self.params = params
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+        self.pool_timeout = pool_timeout
+        self.__pool: ConnectionPool | None = None
+        self.__pool_lock = threading.Lock()
+        self.cache = QueryCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.slow_query_threshold = slow_query_threshold
         logger.info(f"Инициализация DBManager с базой данных: {self.database_name}")
 
-    def connect(self) -> Any:
-        """Устанавливает соединение с базой данных."""
-        # Проверяем, что все необходимые параметры присутствуют
+    def _check_params(self) -> None:
+        """Проверяет, что все необходимые параметры подключения присутствуют."""
         required_params = ["host", "user", "password", "port"]
         for param in required_params:
             if param not in self.params:
                 logger.error(f"Отсутствует обязательный параметр: {param}")
                 raise ValueError(f"Отсутствует обязательный параметр: {param}")
 
+    @property
+    def pool(self) -> ConnectionPool:
+        """Возвращает пул соединений, создавая его при первом обращении."""
+        with self.__pool_lock:
+            if self.__pool is None or self.__pool.closed:
+                self._check_params()
+                try:
+                    self.__pool = ConnectionPool(
+                        self.pool_min,
+                        self.pool_max,
+                        timeout=self.pool_timeout,
+                        dbname=self.database_name,
+                        user=self.params.get("user"),
+                        password=self.params.get("password"),
+                        host=self.params.get("host", "localhost"),
+                        port=self.params.get("port", 5432),
+                    )
+                except psycopg2.Error as e:
+                    logger.error(f"Ошибка при создании пула соединений с базой данных {self.database_name}: {e}")
+                    raise
+            return self.__pool
+
+    def close(self) -> None:
+        """Закрывает пул соединений."""
+        with self.__pool_lock:
+            if self.__pool is not None:
+                self.__pool.close()
+                self.__pool = None
+
+    def __enter__(self) -> "DBManager":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def connect(self) -> Any:
+        """Устанавливает отдельное соединение с базой данных в обход пула."""
+        self._check_params()
+
         try:
             conn = psycopg2.connect(
                 dbname=self.database_name,
@@ -51,100 +235,225 @@ class DBManager(DBBase):
             logger.error(f"Ошибка при подключении к базе данных {self.database_name}: {e}")
             raise
 
-    def get_companies_and_vacancies_count(self) -> Any:
-        """Получает количество вакансий для каждой компании."""
+    def get_data_generation(self) -> int:
+        """Возвращает текущее поколение данных, которое увеличивается после каждой загрузки."""
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT COALESCE((SELECT data_generation FROM sync_state), 0)")
+                generation: int = cur.fetchone()[0]
+        return generation
+
+    def _fetchall(
+        self, name: str, query: str, params: Any = None, description: str = "", setup: str | None = None
+    ) -> list[tuple]:
+        """
+        Выполняет запрос на соединении из пула и возвращает все строки результата.
+        Время выполнения и количество строк записываются в метрики с меткой name.
+        """
+        return self._fetch_queries([(name, query, params)], description, setup=setup)[name]
+
+    def _fetch_queries(
+        self,
+        queries: list[tuple[str, str, Any]],
+        description: str = "",
+        snapshot: bool = False,
+        setup: str | None = None,
+    ) -> dict[str, list[tuple]]:
+        """
+        Выполняет запросы (имя, запрос, параметры) подряд на одном соединении из пула и возвращает
+        словарь {имя: строки результата}. При snapshot=True запросы выполняются в одной транзакции
+        REPEATABLE READ READ ONLY и читают один снимок данных. Команда setup (например, SET LOCAL)
+        выполняется в той же транзакции перед запросами.
+        Время выполнения и количество строк каждого запроса записываются в метрики с меткой его имени.
+        """
+        result: dict[str, list[tuple]] = {}
         try:
-            with self.connect() as conn:
+            with self.pool.connection() as conn:
                 with conn.cursor() as cur:
-                    logger.info("Запуск запроса для получения количества вакансий по компаниям.")
-                    cur.execute(
-                        """
-                        SELECT employer.employer_name, COUNT(vacancy_id) FROM vacancies
-                        JOIN employer ON employer.employer_id = vacancies.employer_id
-                        GROUP BY employer_name
-                        """
-                    )
-                    result = cur.fetchall()
-                    logger.info("Запрос для получения количества вакансий по компаниям успешно выполнен.")
+                    logger.info(f"Запуск запроса для получения {description}.")
+                    if snapshot:
+                        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+                    if setup is not None:
+                        cur.execute(setup)
+                    for name, query, params in queries:
+                        started = time.perf_counter()
+                        cur.execute(query, params)
+                        result[name] = cur.fetchall()
+                        duration = time.perf_counter() - started
+                        self._record_query(name, duration, len(result[name]))
+                        if self.slow_query_threshold is not None and duration > self.slow_query_threshold:
+                            self._explain(cur, name, duration, query, params)
+                    logger.info(f"Запрос для получения {description} успешно выполнен.")
                     return result
         except Exception as e:
-            logger.error(f"Ошибка при получении количества вакансий по компаниям: {e}")
+            logger.error(f"Ошибка при получении {description}: {e}")
             raise
 
+    @staticmethod
+    def _explain(cur: Any, name: str, duration: float, query: str, params: Any) -> None:
+        """
+        Получает план EXPLAIN (ANALYZE, BUFFERS) медленного запроса и сохраняет его в метриках.
+        EXPLAIN выполняется под точкой сохранения, чтобы его ошибка не прерывала транзакцию остальных запросов.
+        """
+        cur.execute("SAVEPOINT explain")
+        try:
+            cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}", params)
+            plan = "\n".join(row[0] for row in cur.fetchall())
+            cur.execute("RELEASE SAVEPOINT explain")
+        except psycopg2.Error as e:
+            cur.execute("ROLLBACK TO SAVEPOINT explain")
+            logger.error(f"Не удалось получить план медленного запроса {name}: {e}")
+            return
+        metrics.add_slow_query(name, duration, plan)
+        logger.warning(f"Медленный запрос {name}: {duration:.3f} с\n{plan}")
+
+    @cached_report
+    def get_companies_and_vacancies_count(self) -> Any:
+        """Получает количество вакансий для каждой компании."""
+        return self._fetchall(
+            "companies_and_vacancies_count",
+            COMPANIES_AND_VACANCIES_COUNT_QUERY,
+            description="количества вакансий по компаниям",
+        )
+
+    @cached_report
     def get_all_vacancies(self) -> Any:
         """Получает все вакансии с информацией о работодателе, названии вакансии, зарплате и URL вакансии"""
-        try:
-            with self.connect() as conn:
-                with conn.cursor() as cur:
-                    logger.info("Запуск запроса для получения всех вакансий.")
-                    cur.execute(
-                        """
-                        SELECT employer.employer_name, vacancies.vacancy_name, vacancies.salary, vacancies.vacancy_url
-                        FROM vacancies
-                        JOIN employer ON employer.employer_id = vacancies.employer_id
-                        """
-                    )
-                    result = cur.fetchall()
-                    logger.info("Запрос для получения всех вакансий успешно выполнен.")
-                    return result
-        except Exception as e:
-            logger.error(f"Ошибка при получении всех вакансий: {e}")
-            raise
+        return self._fetchall("all_vacancies", ALL_VACANCIES_QUERY, description="всех вакансий")
 
+    @cached_report
     def get_avg_salary(self) -> Any:
         """Получает среднюю зарплату по вакансиям."""
-        try:
-            with self.connect() as conn:
-                with conn.cursor() as cur:
-                    logger.info("Запуск запроса для получения средней зарплаты.")
-                    cur.execute(
-                        """
-                        SELECT vacancies.vacancy_name, AVG(vacancies.salary) FROM vacancies
-                        GROUP BY vacancies.vacancy_name
-                        """
-                    )
-                    result = cur.fetchall()
-                    logger.info("Запрос для получения средней зарплаты успешно выполнен.")
-                    return result
-        except Exception as e:
-            logger.error(f"Ошибка при получении средней зарплаты: {e}")
-            raise
+        return self._fetchall("avg_salary", AVG_SALARY_QUERY, description="средней зарплаты")
 
+    @cached_report
     def get_vacancies_with_higher_salary(self) -> Any:
         """Получает вакансии с зарплатой выше средней."""
-        try:
-            with self.connect() as conn:
-                with conn.cursor() as cur:
-                    logger.info("Запуск запроса для получения вакансий с зарплатой выше средней.")
-                    cur.execute(
-                        """
-                        SELECT * FROM vacancies
-                        WHERE salary > (SELECT AVG(salary) FROM vacancies)
-                        """
-                    )
-                    result = cur.fetchall()
-                    logger.info("Запрос для получения вакансий с зарплатой выше средней успешно выполнен.")
-                    return result
-        except Exception as e:
-            logger.error(f"Ошибка при получении вакансий с зарплатой выше средней: {e}")
-            raise
+        return self._fetchall(
+            "vacancies_with_higher_salary", HIGHER_SALARY_QUERY, description="вакансий с зарплатой выше средней"
+        )
 
+    @cached_report
     def get_vacancies_with_keyword(self, keyword: str) -> Any:
         """Получает вакансии, содержащие указанное ключевое слово."""
-        try:
-            with self.connect() as conn:
-                with conn.cursor() as cur:
-                    logger.info(f"Запуск запроса для получения вакансий с ключевым словом: {keyword}.")
-                    cur.execute(
-                        """
-                        SELECT * FROM vacancies
-                        WHERE vacancy_name LIKE %s
-                        """,
-                        (f"%{keyword}%",),  # Параметр передается как кортеж
-                    )
-                    result = cur.fetchall()
-                    logger.info(f"Запрос для получения вакансий с ключевым словом '{keyword}' успешно выполнен.")
-                    return result
-        except Exception as e:
-            logger.error(f"Ошибка при получении вакансий с ключевым словом {keyword}: {e}")
-            raise
+        return self._fetchall(
+            "vacancies_with_keyword",
+            KEYWORD_QUERY,
+            (f"%{keyword}%",),
+            description=f"вакансий с ключевым словом '{keyword}'",
+        )
+
+    @cached_report
+    def search_vacancies(self, text: str, limit: int = 100) -> Any:
+        """
+        Ищет вакансии по словам из text в формате get_vacancies_with_keyword, упорядочивая их по релевантности.
+        Поиск полнотекстовый: регистр не важен, слова находятся в любой форме и по началу слова,
+        при нескольких словах в названии должны быть все. Если ничего не найдено, выполняется нечёткий
+        поиск по триграммам, который находит названия с опечатками в запросе. Запрос из одних
+        стоп-слов ничего не находит.
+        """
+        tsquery = build_tsquery(text)
+        if not tsquery:
+            return []
+        result = self._fetchall(
+            "search_vacancies",
+            SEARCH_QUERY,
+            {"tsquery": tsquery, "limit": limit},
+            description=f"вакансий по запросу '{text}'",
+        )
+        if result:
+            return result
+        return self._fetchall(
+            "fuzzy_search_vacancies",
+            FUZZY_SEARCH_QUERY,
+            {"text": text, "tsquery": tsquery, "limit": limit},
+            description=f"вакансий по нечёткому запросу '{text}'",
+            setup=FUZZY_SEARCH_SETUP,
+        )
+
+    def get_reports(self, reports: list[str], keyword: str | None = None) -> dict[str, list[tuple]]:
+        """
+        Вычисляет несколько отчётов и возвращает словарь {имя отчёта: строки}.
+        Доступные отчёты: companies_and_vacancies_count, all_vacancies, avg_salary,
+        vacancies_with_higher_salary и vacancies_with_keyword (требует keyword); строки каждого отчёта
+        имеют тот же формат, что и у соответствующего get_* метода.
+        Запросы отчётов выполняются на одном соединении в одном снимке данных (REPEATABLE READ),
+        поэтому отчёты согласованы между собой даже во время загрузки. Агрегаты читаются
+        из материализованных представлений, результат кэшируется до следующей загрузки данных.
+        """
+        check_reports(reports, keyword)
+        return {report: list(rows) for report, rows in self._get_reports(tuple(dict.fromkeys(reports)), keyword)}
+
+    @cached_report
+    def _get_reports(self, reports: tuple[str, ...], keyword: str | None) -> list[tuple[str, list[tuple]]]:
+        """Выполняет запросы пакетных отчётов и возвращает пары (имя отчёта, строки)."""
+        rows = self._fetch_queries(
+            build_report_queries(reports, keyword), description=f"отчётов {', '.join(reports)}", snapshot=True
+        )
+        return list(rows.items())
+
+    def _iter_query(self, name: str, query: str, params: tuple = (), chunk_size: int = 1000) -> Iterator[tuple]:
+        """
+        Выполняет запрос через именованный (серверный) курсор и отдаёт строки по одной.
+        Строки передаются с сервера порциями по chunk_size штук, поэтому в памяти клиента
+        одновременно находится не больше одной порции. Соединение занято до исчерпания генератора.
+        В метрики записывается время от запуска запроса до исчерпания генератора, включая обработку строк
+        потребителем.
+        """
+        started = time.perf_counter()
+        count = 0
+        with self.pool.connection() as conn:
+            with conn.cursor(name=f"dbm_{uuid.uuid4().hex}") as cur:
+                cur.itersize = chunk_size
+                cur.execute(query, params)
+                while rows := cur.fetchmany(chunk_size):
+                    count += len(rows)
+                    yield from rows
+        self._record_query(name, time.perf_counter() - started, count)
+
+    def iter_all_vacancies(self, chunk_size: int = 1000) -> Iterator[tuple]:
+        """Потоково отдаёт все вакансии в формате get_all_vacancies."""
+        logger.info("Запуск потокового запроса для получения всех вакансий.")
+        yield from self._iter_query("iter_all_vacancies", ALL_VACANCIES_QUERY, chunk_size=chunk_size)
+
+    def iter_vacancies_with_higher_salary(self, chunk_size: int = 1000) -> Iterator[tuple]:
+        """Потоково отдаёт вакансии с зарплатой выше средней в формате get_vacancies_with_higher_salary."""
+        logger.info("Запуск потокового запроса для получения вакансий с зарплатой выше средней.")
+        yield from self._iter_query("iter_vacancies_with_higher_salary", HIGHER_SALARY_QUERY, chunk_size=chunk_size)
+
+    def iter_vacancies_with_keyword(self, keyword: str, chunk_size: int = 1000) -> Iterator[tuple]:
+        """Потоково отдаёт вакансии с ключевым словом в формате get_vacancies_with_keyword."""
+        logger.info(f"Запуск потокового запроса для получения вакансий с ключевым словом: {keyword}.")
+        yield from self._iter_query(
+            "iter_vacancies_with_keyword", KEYWORD_QUERY, (f"%{keyword}%",), chunk_size=chunk_size
+        )
+
+    def iter_vacancy_records(self, chunk_size: int = 10000) -> Iterator[tuple]:
+        """
+        Потоково отдаёт открытые вакансии вместе с работодателем в виде кортежей
+        (hh_id, vacancy_name, vacancy_url, city, salary, employer_id, employer_name).
+        """
+        logger.info("Запуск потокового запроса для выгрузки вакансий.")
+        yield from self._iter_query("iter_vacancy_records", VACANCY_RECORDS_QUERY, chunk_size=chunk_size)
+
+    def get_vacancies_page(
+        self, limit: int = 100, after: int | None = None, keyword: str | None = None
+    ) -> tuple[list[tuple], int | None]:
+        """
+        Получает страницу вакансий в формате get_all_vacancies, упорядоченных по vacancy_id.
+        after — курсор, полученный с предыдущей страницей (None для первой страницы),
+        keyword — необязательный фильтр по подстроке в названии вакансии.
+        Возвращает строки страницы и курсор следующей страницы (None, если страница последняя).
+        """
+        rows = self._fetchall(
+            "vacancies_page",
+            VACANCIES_PAGE_QUERY,
+            {
+                "after": after if after is not None else 0,
+                "keyword": f"%{keyword}%" if keyword else None,
+                "limit": limit,
+            },
+            description=f"страницы вакансий (limit={limit}, after={after})",
+        )
+        next_after = rows[-1][0] if len(rows) == limit else None
+        return [row[1:] for row in rows], next_after
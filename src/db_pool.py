@@ -0,0 +1,137 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import psycopg2
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ConnectionPool:
+    """
+    Потокобезопасный пул соединений с PostgreSQL.
+
+    Обёртка над psycopg2.pool.ThreadedConnectionPool, которая:
+    - ограничивает количество выданных соединений maxconn и ждёт освобождения соединения до timeout секунд,
+      вместо того чтобы сразу падать с PoolError;
+    - проверяет соединение перед выдачей: закрытые соединения отбрасываются, а соединения, простаивавшие
+      дольше health_check_interval секунд, проверяются запросом SELECT 1;
+    - поддерживает протокол контекстного менеджера и закрывает все соединения при выходе.
+    """
+
+    def __init__(
+        self,
+        minconn: int = 1,
+        maxconn: int = 10,
+        timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+        **connect_kwargs: Any,
+    ) -> None:
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Некорректный размер пула: minconn={minconn}, maxconn={maxconn}")
+
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.__pool = ThreadedConnectionPool(minconn, maxconn, **connect_kwargs)
+        self.__slots = threading.BoundedSemaphore(maxconn)
+        self.__last_used: dict[int, float] = {}
+        self.__lock = threading.Lock()
+        logger.info(f"Создан пул соединений: minconn={minconn}, maxconn={maxconn}")
+
+    @property
+    def closed(self) -> bool:
+        """Возвращает True, если пул закрыт."""
+        return bool(self.__pool.closed)
+
+    def getconn(self) -> Any:
+        """
+        Выдаёт проверенное соединение из пула.
+        Если все соединения заняты, ждёт освобождения не дольше timeout секунд.
+        """
+        if self.closed:
+            raise PoolError("Пул соединений закрыт")
+        if not self.__slots.acquire(timeout=self.timeout):
+            raise PoolError(f"Не удалось получить соединение из пула за {self.timeout} с")
+
+        try:
+            while True:
+                conn = self.__pool.getconn()
+                if self._is_healthy(conn):
+                    return conn
+                logger.warning("Соединение из пула неработоспособно, открываем новое")
+                self.__forget(conn)
+                self.__pool.putconn(conn, close=True)
+        except Exception:
+            self.__slots.release()
+            raise
+
+    def putconn(self, conn: Any, close: bool = False) -> None:
+        """Возвращает соединение в пул. При close=True или для закрытого соединения оно закрывается."""
+        close = close or bool(conn.closed)
+        with self.__lock:
+            if close:
+                self.__last_used.pop(id(conn), None)
+            else:
+                self.__last_used[id(conn)] = time.monotonic()
+        try:
+            if not self.closed:
+                self.__pool.putconn(conn, close=close)
+        finally:
+            self.__slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Контекстный менеджер для работы с соединением из пула.
+        При успешном выходе транзакция фиксируется, при исключении откатывается,
+        после чего соединение возвращается в пул.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    def close(self) -> None:
+        """Закрывает все соединения пула."""
+        if not self.closed:
+            self.__pool.closeall()
+            logger.info("Пул соединений закрыт")
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _is_healthy(self, conn: Any) -> bool:
+        """Проверяет соединение: закрытое отбрасывается, долго простаивавшее проверяется запросом SELECT 1."""
+        if conn.closed:
+            return False
+
+        with self.__lock:
+            last_used = self.__last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Проверка соединения не прошла: {e}")
+            return False
+
+    def __forget(self, conn: Any) -> None:
+        with self.__lock:
+            self.__last_used.pop(id(conn), None)
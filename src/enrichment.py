@@ -0,0 +1,193 @@
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any
+
+import psycopg2
+import requests
+from psycopg2.extras import execute_values
+
+from src.hh_api import HeadHunterAPI
+from src.logger import setup_logger
+from src.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# Через сколько после последней проверки описание запрашивается снова, даже если вакансия не изменилась
+RECHECK_AFTER = timedelta(days=7)
+
+# Открытые вакансии без описания, изменившиеся после загрузки описания или проверенные дольше recheck_after назад.
+# updated_at меняется только при изменении полей выдачи (название, зарплата, работодатель), а правка одного
+# текста описания его не сдвигает, поэтому такие правки находит только периодическая проверка.
+# При recheck_after = NULL периодическая проверка отключена
+STALE_QUERY = """
+    SELECT vacancies.hh_id, vacancies.updated_at, vacancy_details.content_hash
+    FROM vacancies
+    LEFT JOIN vacancy_details ON vacancy_details.hh_id = vacancies.hh_id
+    WHERE NOT vacancies.is_closed
+        AND (vacancy_details.hh_id IS NULL
+            OR vacancy_details.source_updated_at < vacancies.updated_at
+            OR vacancy_details.fetched_at < now() - %(recheck_after)s::interval)
+    ORDER BY vacancies.hh_id
+"""
+
+DETAILS_UPSERT = """
+    INSERT INTO vacancy_details (hh_id, description, key_skills, experience, content_hash, source_updated_at)
+    VALUES %s
+    ON CONFLICT (hh_id) DO UPDATE
+    SET description = EXCLUDED.description,
+        key_skills = EXCLUDED.key_skills,
+        experience = EXCLUDED.experience,
+        content_hash = EXCLUDED.content_hash,
+        source_updated_at = EXCLUDED.source_updated_at,
+        fetched_at = now()
+"""
+
+# Описание не изменилось: отмечаются только проверенная версия вакансии и время проверки, текст не переписывается
+DETAILS_TOUCH = """
+    UPDATE vacancy_details SET source_updated_at = data.source_updated_at, fetched_at = now()
+    FROM (VALUES %s) AS data (hh_id, source_updated_at)
+    WHERE vacancy_details.hh_id = data.hh_id
+"""
+
+# Вакансия недоступна (404, 403): записывается пустое описание, чтобы она не запрашивалась при каждом запуске,
+# а у ранее загруженного описания отмечается только время проверки — текст сохраняется
+DETAILS_MISSING = """
+    INSERT INTO vacancy_details (hh_id, content_hash, source_updated_at)
+    VALUES %s
+    ON CONFLICT (hh_id) DO UPDATE
+    SET source_updated_at = EXCLUDED.source_updated_at, fetched_at = now()
+"""
+
+
+def content_hash(description: str | None, key_skills: list[str], experience: str | None) -> str:
+    """Хэш содержимого описания вакансии, по которому определяется, нужно ли переписывать описание."""
+    raw = json.dumps([description, key_skills, experience], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# Хэш пустого описания, которым отмечаются недоступные вакансии
+MISSING_HASH = content_hash(None, [], None)
+
+
+class VacancyEnricher:
+    """
+    Дополняет загруженные вакансии подробными описаниями из API HeadHunter (/vacancies/{id}):
+    текстом описания, ключевыми навыками и требуемым опытом. Описания хранятся в таблице vacancy_details.
+
+    Описание запрашивается только для вакансий, у которых его ещё нет или которые изменились после его загрузки
+    (по vacancies.updated_at), поэтому повторный запуск без изменений не обращается к API.
+    updated_at не меняется, если работодатель правит только текст описания, поэтому описания, проверенные
+    дольше recheck_after назад, запрашиваются снова (None отключает периодическую проверку).
+    Если загруженное описание совпадает с сохранённым по хэшу содержимого, оно не переписывается.
+    Недоступные (удалённые или скрытые) вакансии отмечаются проверенными и запрашиваются снова так же,
+    как неизменившиеся: после изменения updated_at или через recheck_after.
+    Описания загружаются параллельно, не более max_workers запросов одновременно, и записываются пачками
+    по batch_size вакансий.
+    """
+
+    def __init__(
+        self,
+        database_name: str = "headhunter",
+        api: HeadHunterAPI | None = None,
+        max_workers: int = 10,
+        batch_size: int = 500,
+        recheck_after: timedelta | None = RECHECK_AFTER,
+        **params: Any,
+    ) -> None:
+        self.database_name = database_name
+        self.params = params
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.recheck_after = recheck_after
+        self.api = api or HeadHunterAPI(max_workers=max_workers, preload=False)
+
+    def _connect(self) -> Any:
+        return psycopg2.connect(
+            dbname=self.database_name,
+            user=self.params.get("user"),
+            password=self.params.get("password"),
+            host=self.params.get("host", "localhost"),
+            port=self.params.get("port", 5432),
+        )
+
+    def enrich(self) -> dict[str, int]:
+        """
+        Загружает описания новых и изменившихся вакансий, а также описания, проверенные дольше recheck_after назад.
+        Возвращает количество проверенных вакансий (checked), записанных описаний (updated),
+        описаний без изменений (unchanged), недоступных вакансий (missing) и ошибок загрузки (errors).
+        Вакансии, описание которых не удалось загрузить из-за ошибки, проверяются снова при следующем запуске.
+        """
+        started = time.perf_counter()
+        stats = {"checked": 0, "updated": 0, "unchanged": 0, "missing": 0, "errors": 0}
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(STALE_QUERY, {"recheck_after": self.recheck_after})
+                stale = cur.fetchall()
+            conn.commit()
+            logger.info(f"Описания нужно проверить у {len(stale)} вакансий")
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for start in range(0, len(stale), self.batch_size):
+                    end = start + self.batch_size
+                    batch = stale[start:end]
+                    details = executor.map(self._fetch, [hh_id for hh_id, _, _ in batch])
+                    self._save_batch(conn, batch, details, stats)
+        finally:
+            conn.close()
+
+        for name, value in stats.items():
+            metrics.inc("enrichment_vacancies_total", value, result=name)
+        metrics.observe("enrichment_seconds", time.perf_counter() - started)
+        logger.info(
+            f"Описания вакансий обновлены: проверено {stats['checked']}, записано {stats['updated']}, "
+            f"без изменений {stats['unchanged']}, недоступно {stats['missing']}, ошибок {stats['errors']}."
+        )
+        return stats
+
+    def _fetch(self, hh_id: int) -> tuple[bool, dict | None]:
+        """Загружает описание вакансии. Возвращает (False, None), если загрузка завершилась ошибкой."""
+        try:
+            return True, self.api.get_vacancy(hh_id)
+        except requests.RequestException as e:
+            logger.error(f"Не удалось загрузить описание вакансии {hh_id}: {e}")
+            return False, None
+
+    @staticmethod
+    def _save_batch(conn: Any, batch: list[tuple], details: Any, stats: dict[str, int]) -> None:
+        """
+        Записывает изменившиеся описания пачки и отмечает проверенными неизменные и недоступные вакансии
+        в одной транзакции.
+        """
+        changed, unchanged, missing = [], [], []
+        for (hh_id, updated_at, stored_hash), (loaded, data) in zip(batch, details):
+            stats["checked"] += 1
+            if not loaded:
+                stats["errors"] += 1
+                continue
+            if data is None:
+                missing.append((hh_id, MISSING_HASH, updated_at))
+                continue
+            description = data.get("description")
+            key_skills = [skill["name"] for skill in data.get("key_skills") or []]
+            experience = (data.get("experience") or {}).get("name")
+            new_hash = content_hash(description, key_skills, experience)
+            if new_hash == stored_hash:
+                unchanged.append((hh_id, updated_at))
+            else:
+                changed.append((hh_id, description, key_skills, experience, new_hash, updated_at))
+
+        with conn.cursor() as cur:
+            if changed:
+                execute_values(cur, DETAILS_UPSERT, changed, page_size=len(changed))
+            if unchanged:
+                execute_values(cur, DETAILS_TOUCH, unchanged, page_size=len(unchanged))
+            if missing:
+                execute_values(cur, DETAILS_MISSING, missing, page_size=len(missing))
+        conn.commit()
+        stats["updated"] += len(changed)
+        stats["unchanged"] += len(unchanged)
+        stats["missing"] += len(missing)
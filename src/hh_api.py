@@ -1,11 +1,34 @@
+import random
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from typing import Iterator
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from src.base_api import BaseAPI
 from src.config import employer_id
+from src.crawl_checkpoint import CrawlCheckpoint
+from src.crawl_planner import CrawlPlanner
 from src.logger import setup_logger
+from src.metrics import metrics
+from src.response_cache import ResponseCache
+from src.snapshot import SnapshotWriter
+from src.vacancy_record import VacancyRecord
 
 logger = setup_logger(__name__)
 
+# API HeadHunter отдаёт не более 2000 результатов на запрос: 20 страниц по 100 вакансий
+MAX_PAGES = 20
+# Временные ошибки, после которых запрос страницы повторяется
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Максимальная пауза перед повтором запроса, в секундах
+MAX_RETRY_DELAY = 60.0
+
 
 class HeadHunterAPI(BaseAPI):
     """
@@ -15,11 +38,35 @@ class HeadHunterAPI(BaseAPI):
     Наследует от класса BaseAPI, который реализует основные функции для работы с API.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_workers: int = 5,
+        cache: ResponseCache | None = None,
+        preload: bool = True,
+        date_from: str | None = None,
+        snapshot: SnapshotWriter | None = None,
+        checkpoint: CrawlCheckpoint | None = None,
+        retries: int = 3,
+        backoff: float = 1.0,
+        sharded: bool = False,
+    ) -> None:
         """
         Инициализирует объект для работы с API HeadHunter.
         Устанавливает базовый URL для запросов, заголовки, параметры поиска вакансий и выполняет
         загрузку вакансий и их валидацию.
+        max_workers задаёт максимальное количество одновременных запросов к API.
+        Если передан cache, ответы API сохраняются на диск и повторно используются до истечения TTL.
+        При preload=False вакансии не загружаются сразу, а отдаются постранично через iter_vacancies.
+        Если передан date_from (дата в формате ISO 8601), загружаются только вакансии, опубликованные
+        или обновлённые начиная с этой даты.
+        Если передан snapshot, каждая загруженная страница записывается в снимок для последующего воспроизведения.
+        Если передан checkpoint, загруженные страницы сохраняются на диск, и прерванная загрузка продолжается
+        со следующей несохранённой страницы без повторных запросов к API.
+        При временных ошибках (429, 5xx, ошибки соединения) запрос страницы повторяется до retries раз
+        с экспоненциально растущей паузой от backoff секунд; для 429 и 503 учитывается заголовок Retry-After.
+        При sharded=True запрос, по которому найдено больше 2000 вакансий, делится CrawlPlanner на шарды
+        по работодателям и окнам даты публикации, шарды загружаются параллельно, а повторяющиеся
+        в разных шардах вакансии отбрасываются по идентификатору.
         """
         logger.info("Инициализация API HeadHunter")
 
@@ -30,11 +77,25 @@ class HeadHunterAPI(BaseAPI):
             "page": 0,
             "per_page": 100,
             "employer_id": employer_id,
+            "date_from": date_from,
         }
+        self.__max_workers = max_workers
+        self.__cache = cache
+        self.__snapshot = snapshot
+        self.__checkpoint = checkpoint
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__sharded = sharded
+        # Одна сессия с пулом keep-alive соединений на все запросы вместо нового соединения на каждую страницу
+        self.__session = requests.Session()
+        self.__session.headers.update(self.__headers)
+        self.__session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self.__pages = MAX_PAGES
         self.__vacancies: list = []
-        self._load_vacancies()
-        self._validate_vacancy()
-        logger.info(f"Загружено {len(self.__vacancies)} вакансий")
+        if preload:
+            self._load_vacancies()
+            self._validate_vacancy()
+            logger.info(f"Загружено {len(self.__vacancies)} вакансий")
 
     @property
     def vacancies(self) -> list:
@@ -43,39 +104,335 @@ class HeadHunterAPI(BaseAPI):
         """
         return self.__vacancies
 
+    def _fetch_page(self, page: int, shard: dict | None = None) -> dict:
+        """
+        Загружает одну страницу выдачи API HeadHunter.
+        Свежий ответ из кэша возвращается без обращения к сети. Для устаревшего ответа отправляются
+        заголовки If-None-Match/If-Modified-Since, и при статусе 304 используется сохранённое тело.
+        Если API возвращает ошибку, возбуждается исключение.
+        Время загрузки и размер ответа записываются в метрики с меткой источника страницы.
+        Если передан shard, его параметры заменяют параметры основного запроса.
+        """
+        started = time.perf_counter()
+        params = {**self.__params, **(shard or {}), "page": page}
+        cached = self.__cache.get(self.__url, params) if self.__cache else None
+        if self.__cache and cached and self.__cache.is_fresh(cached):
+            logger.info(f"Страница {page} взята из кэша")
+            self._record_page("cache", started)
+            return dict(cached["body"])
+
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._get(f"страницы {page}", self.__url, headers, params)
+        metrics.inc("hh_api_response_bytes_total", len(response.content))
+        if self.__cache and cached and response.status_code == 304:
+            logger.info(f"Страница {page} не изменилась, используем кэш")
+            self.__cache.touch(self.__url, params, cached)
+            self._record_page("not_modified", started)
+            return dict(cached["body"])
+
+        if response.status_code != 200:
+            metrics.inc("hh_api_errors_total", status=response.status_code)
+            logger.error(f"Ошибка при запросе к API: статус {response.status_code}")
+
+            raise requests.HTTPError(f"Ошибка при запросе к API: статус {response.status_code}")
+
+        data: dict = response.json()
+        logger.info(f"Получено {len(data.get('items', []))} вакансий со страницы {page}")
+        if self.__cache:
+            self.__cache.set(
+                self.__url,
+                params,
+                data,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        self._record_page("network", started)
+        return data
+
+    def _get(self, target: str, url: str, headers: dict, params: dict) -> requests.Response:
+        """
+        Выполняет GET-запрос к url, повторяя запрос при временных ошибках не более retries раз.
+        Пауза перед повтором растёт экспоненциально со случайным разбросом, чтобы параллельные запросы
+        не повторялись одновременно; если ответ содержит Retry-After, выдерживается указанная в нём пауза.
+        После исчерпания попыток возвращается последний ответ или возбуждается последняя ошибка соединения.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.__session.get(url, headers=headers, params=params)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.__retries:
+                    metrics.inc("hh_api_errors_total", status="connection")
+                    raise
+                reason, delay = type(e).__name__, self._backoff_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.__retries:
+                    return response
+                reason = str(response.status_code)
+                retry_after = self._retry_after(response)
+                delay = self._backoff_delay(attempt) if retry_after is None else retry_after
+
+            metrics.inc("hh_api_retries_total", reason=reason)
+            logger.warning(
+                f"Временная ошибка при запросе {target} ({reason}), повтор через {delay:.1f} с "
+                f"(попытка {attempt + 1} из {self.__retries})"
+            )
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Пауза перед повтором номер attempt: backoff * 2^attempt с разбросом от половины до полного значения."""
+        delay = min(self.__backoff * 2.0**attempt, MAX_RETRY_DELAY)
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float | None:
+        """Пауза из заголовка Retry-After (в секундах или в виде даты) или None, если заголовка нет."""
+        value = response.headers.get("Retry-After")
+        if not isinstance(value, str):
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), MAX_RETRY_DELAY)
+
+    def _load_page(self, number: int, page: int, shard: dict | None = None) -> dict:
+        """
+        Берёт страницу из контрольной точки, если она там сохранена, иначе загружает и сохраняет её.
+        number — порядковый номер страницы в загрузке, под которым она хранится в контрольной точке;
+        без шардов он совпадает с номером страницы page.
+        """
+        if self.__checkpoint is not None:
+            started = time.perf_counter()
+            data = self.__checkpoint.get(number)
+            if data is not None:
+                logger.info(f"Страница {number} взята из контрольной точки")
+                self._record_page("checkpoint", started)
+                return data
+
+        data = self._fetch_page(page, shard)
+        if self.__checkpoint is not None:
+            self.__checkpoint.save(number, data)
+        return data
+
+    def get_vacancy(self, vacancy_id: int | str) -> dict | None:
+        """
+        Загружает полное описание вакансии (/vacancies/{id}): описание, ключевые навыки, требуемый опыт и т. д.
+        Возвращает None, если вакансия удалена или скрыта (404, 403). При временных ошибках запрос
+        повторяется так же, как запрос страниц выдачи, при остальных ошибках возбуждается исключение.
+        """
+        started = time.perf_counter()
+        response = self._get(f"вакансии {vacancy_id}", f"{self.__url}/{vacancy_id}", {}, {})
+        metrics.inc("hh_api_response_bytes_total", len(response.content))
+        metrics.observe("hh_api_vacancy_fetch_seconds", time.perf_counter() - started)
+        if response.status_code in (403, 404):
+            logger.info(f"Вакансия {vacancy_id} недоступна: статус {response.status_code}")
+            return None
+        if response.status_code != 200:
+            metrics.inc("hh_api_errors_total", status=response.status_code)
+            logger.error(f"Ошибка при запросе вакансии {vacancy_id}: статус {response.status_code}")
+            raise requests.HTTPError(f"Ошибка при запросе вакансии {vacancy_id}: статус {response.status_code}")
+        data: dict = response.json()
+        return data
+
+    @staticmethod
+    def _record_page(source: str, started: float) -> None:
+        """Записывает в метрики загрузку страницы из источника source, начатую в момент started."""
+        metrics.inc("hh_api_pages_total", source=source)
+        metrics.observe("hh_api_page_fetch_seconds", time.perf_counter() - started, source=source)
+
+    @staticmethod
+    def _page_count(data: dict) -> int:
+        """
+        Количество страниц выдачи по полю pages первой страницы, не больше MAX_PAGES.
+        Пустая выдача возвращает pages = 0, и остальные страницы не запрашиваются;
+        MAX_PAGES используется, только если поля pages в ответе нет.
+        """
+        pages = data.get("pages")
+        if pages is None:
+            pages = MAX_PAGES
+        return min(pages, MAX_PAGES)
+
+    def _iter_pages(self) -> Iterator[dict]:
+        """
+        Постранично отдаёт ответы API HeadHunter, начиная с текущей страницы.
+        Первая страница запрашивается отдельно: из её поля pages берётся реальное количество страниц
+        (не больше 20). Остальные страницы загружаются параллельно, но одновременно выполняется
+        не более max_workers запросов: следующая страница запрашивается только после того, как
+        потребитель забрал очередную. Страницы отдаются в порядке их номеров.
+        Если задана контрольная точка, сохранённые в ней страницы не запрашиваются повторно,
+        а после отдачи всех страниц контрольная точка удаляется.
+        """
+        first_page = self.__params["page"]
+        if not isinstance(first_page, int) or first_page >= self.__pages:
+            logger.info("Все страницы уже загружены")
+            return
+
+        if self.__sharded:
+            yield from self._iter_shard_pages()
+        else:
+            if self.__checkpoint is not None:
+                self.__checkpoint.start(self.__url, self.__params)
+            data = self._load_page(first_page, first_page)
+            self.__pages = self._page_count(data)
+            self._record_snapshot(data)
+            yield data
+            yield from self._iter_tasks([(page, page, None) for page in range(first_page + 1, self.__pages)])
+
+        self.__params["page"] = self.__pages
+        if self.__checkpoint is not None:
+            self.__checkpoint.clear()
+
+    def _iter_shard_pages(self) -> Iterator[dict]:
+        """
+        Делит запрос на шарды и отдаёт страницы всех шардов по порядку.
+        Первые страницы шардов загружаются при планировании и повторно не запрашиваются,
+        остальные страницы всех шардов загружаются параллельно.
+        Если задана контрольная точка, план шардов и их первые страницы сохраняются в ней,
+        и продолжение прерванной загрузки берёт план с диска вместо повторного планирования.
+        """
+        params = {key: value for key, value in self.__params.items() if key != "page"}
+        stored = None
+        if self.__checkpoint is not None:
+            # Ключ контрольной точки — исходный запрос, а не разбиение на шарды: окна дат при повторном
+            # планировании округляются от текущего времени и могут не совпасть с сохранёнными
+            self.__checkpoint.start(self.__url, params)
+            stored = self.__checkpoint.plan
+
+        plan: list[tuple[dict, dict | None]]
+        if stored is None:
+            planner = CrawlPlanner(lambda shard: self._fetch_page(0, shard), max_workers=self.__max_workers)
+            plan = list(planner.plan(params))
+            if self.__checkpoint is not None:
+                self.__checkpoint.save_plan([shard for shard, _ in plan])
+        else:
+            logger.info(f"План из {len(stored)} шардов взят из контрольной точки")
+            plan = [(shard, None) for shard in stored]
+
+        tasks: list[tuple[int, int, dict | None]] = []
+        first_pages = {}
+        for shard, data in plan:
+            start = len(tasks)
+            if data is None:
+                data = self._load_page(start, 0, shard)
+            elif self.__checkpoint is not None:
+                self.__checkpoint.save(start, data)
+            first_pages[start] = data
+            # Пустой шард (pages = 0) состоит из одной уже загруженной первой страницы
+            pages = self._page_count(data)
+            tasks.extend((start + page, page, shard) for page in range(max(pages, 1)))
+        yield from self._iter_tasks(tasks, first_pages)
+
+    def _iter_tasks(self, tasks: list[tuple[int, int, dict | None]], loaded: dict | None = None) -> Iterator[dict]:
+        """
+        Загружает страницы (порядковый номер, номер страницы, шард) параллельно и отдаёт их по порядку.
+        Одновременно выполняется не более max_workers запросов: следующая страница запрашивается только после
+        того, как потребитель забрал очередную. Страницы из loaded (по порядковому номеру) не запрашиваются.
+        """
+        loaded = loaded or {}
+        pending_tasks = iter(tasks)
+
+        def load(task: tuple[int, int, dict | None]) -> dict:
+            number, page, shard = task
+            return loaded[number] if number in loaded else self._load_page(number, page, shard)
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            pending: deque[Future] = deque(
+                executor.submit(load, task) for task in islice(pending_tasks, self.__max_workers)
+            )
+            while pending:
+                data = pending.popleft().result()
+                for task in islice(pending_tasks, 1):
+                    pending.append(executor.submit(load, task))
+                self._record_snapshot(data)
+                yield data
+
+    def _iter_items(self) -> Iterator[dict]:
+        """
+        Отдаёт вакансии со всех страниц. При загрузке шардами вакансия, попавшая в несколько шардов
+        (например, на границе окон публикации), отдаётся один раз.
+        """
+        seen: set[str] | None = set() if self.__sharded else None
+        duplicates = 0
+        for data in self._iter_pages():
+            for vacancy in data.get("items", []):
+                if seen is not None:
+                    if vacancy["id"] in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(vacancy["id"])
+                yield vacancy
+        if duplicates:
+            metrics.inc("hh_api_duplicates_total", duplicates)
+            logger.info(f"Отброшено {duplicates} повторяющихся вакансий")
+
+    def _record_snapshot(self, data: dict) -> None:
+        """Записывает вакансии страницы в снимок, если он задан."""
+        if self.__snapshot is not None:
+            self.__snapshot.write_page(data.get("items", []))
+
     def _load_vacancies(self) -> None:
         """
         Загружает вакансии с API HeadHunter.
-        Делаются запросы на страницы с вакансиями, начиная с первой страницы и до 20-й,
-        с целью получения всех вакансий.
+        Страницы загружаются параллельно и добавляются в список в порядке номеров страниц.
         Если API возвращает ошибку, возбуждается исключение.
         """
         logger.info("Начинаем загрузку вакансий")
 
-        while self.__params["page"] != 20:
-            response = requests.get(self.__url, headers=self.__headers, params=self.__params)
-            if response.status_code != 200:
-                logger.error(f"Ошибка при запросе к API: статус {response.status_code}")
+        self.__vacancies.extend(self._iter_items())
 
-                raise requests.HTTPError(f"Ошибка при запросе к API: статус {response.status_code}")
+        logger.info("Загрузка вакансий завершена")
 
-            vacancies = response.json().get("items", [])
-            logger.info(f"Получено {len(vacancies)} вакансий со страницы {self.__params['page']}")
+    def iter_vacancies(self) -> Iterator[dict]:
+        """
+        Отдаёт провалидированные вакансии по мере загрузки страниц.
+        Сначала отдаются уже загруженные вакансии, затем оставшиеся страницы запрашиваются у API.
+        Загруженные таким образом вакансии не сохраняются в объекте, поэтому в памяти одновременно
+        находятся только страницы, которые ещё не забрал потребитель.
+        """
+        yield from self.__vacancies
 
-            self.__vacancies.extend(vacancies)
+        count = 0
+        for vacancy in self._iter_items():
+            if self._is_valid(vacancy):
+                count += 1
+                yield vacancy
+        logger.info(f"Передано {count} вакансий из API")
 
-            # Обеспечиваем, что self.params["page"] всегда целое число
-            current_page = self.__params["page"]
-            if isinstance(current_page, int):  # Проверка на тип
-                self.__params["page"] = current_page + 1
-        logger.info("Загрузка вакансий завершена")
+    def iter_records(self) -> Iterator[VacancyRecord]:
+        """
+        Отдаёт провалидированные вакансии компактными записями VacancyRecord вместо ответов API.
+        Каждая вакансия разбирается один раз, дальше по конвейеру передаются только сохраняемые поля.
+        Вакансии с некорректными данными пропускаются и учитываются в метрике hh_api_malformed_total.
+        """
+        malformed = 0
+        for vacancy in self.iter_vacancies():
+            try:
+                yield VacancyRecord.from_api(vacancy)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                malformed += 1
+                logger.warning(f"Вакансия {vacancy.get('id')} пропущена: некорректные данные: {e!r}")
+        if malformed:
+            metrics.inc("hh_api_malformed_total", malformed)
+
+    @staticmethod
+    def _is_valid(vacancy: dict) -> bool:
+        """Проверяет, что у вакансии указаны зарплата и адрес."""
+        return vacancy["salary"] is not None and vacancy["address"] is not None
 
     def _validate_vacancy(self) -> None:
         """
         Валидирует вакансии, удаляя те, у которых отсутствуют обязательные данные (зарплата или адрес).
-        Удаляет вакансии, если зарплата или адрес не указаны.
+        Список отфильтровывается за один проход, без поиска и удаления каждой вакансии по отдельности.
         """
-
-        for vacancy in self.__vacancies.copy():
-            if vacancy["salary"] is None or vacancy["address"] is None:
-                self.__vacancies.remove(vacancy)
+        self.__vacancies[:] = [vacancy for vacancy in self.__vacancies if self._is_valid(vacancy)]
@@ -1,5 +1,10 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+from configparser import ConfigParser
+from logging.handlers import QueueHandler, QueueListener
 
 # Получаем путь к корню проекта
 ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -8,33 +13,111 @@ ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
 LOGS_DIR = os.path.join(ROOT_DIR, "..", "logs")
 LOGS_DIR = os.path.abspath(LOGS_DIR)  # Преобразуем в абсолютный путь
 
+# Необязательная секция [logging] в database.ini задаёт уровни логирования:
+# level — уровень записи в файлы, console_level — уровень вывода в консоль,
+# остальные ключи — уровни отдельных модулей, например src.sql_database = WARNING
+CONFIG_PATH = os.path.join(ROOT_DIR, "..", "database.ini")
+DEFAULT_LEVELS = {"level": "DEBUG", "console_level": "INFO"}
+
+FORMATTER = logging.Formatter("%(asctime)s %(name)s %(levelname)s: %(message)s")
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler = QueueHandler(_queue)
+_listener: QueueListener | None = None
+_listener_lock = threading.Lock()
+
+
+def load_levels(filename: str = CONFIG_PATH, section: str = "logging") -> dict[str, str]:
+    """Читает уровни логирования из секции section конфигурационного файла, дополняя их значениями по умолчанию."""
+    parser = ConfigParser()
+    parser.read(filename)
+    levels = dict(DEFAULT_LEVELS)
+    if parser.has_section(section):
+        levels.update({key: value.upper() for key, value in parser.items(section)})
+    return levels
+
+
+class ModuleFileHandler(logging.Handler):
+    """
+    Обработчик, который записывает каждую запись в файл logs/<имя модуля>.log.
+    Файлы открываются при первой записи соответствующего модуля.
+    """
+
+    def __init__(self, logs_dir: str = LOGS_DIR, level: int | str = logging.NOTSET) -> None:
+        super().__init__(level)
+        self.logs_dir = logs_dir
+        self.__handlers: dict[str, logging.FileHandler] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        handler = self.__handlers.get(record.name)
+        if handler is None:
+            os.makedirs(self.logs_dir, exist_ok=True)
+            handler = logging.FileHandler(
+                os.path.join(self.logs_dir, f"{record.name}.log"), mode="w", encoding="utf-8", delay=True
+            )
+            handler.setFormatter(self.formatter)
+            self.__handlers[record.name] = handler
+        handler.emit(record)
+
+    def close(self) -> None:
+        for handler in self.__handlers.values():
+            handler.close()
+        self.__handlers.clear()
+        super().close()
+
+
+def _start_listener(levels: dict[str, str]) -> None:
+    """Запускает фоновый поток, который забирает записи из очереди и пишет их в файлы и в консоль."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+
+        file_handler = ModuleFileHandler(level=levels["level"])
+        file_handler.setFormatter(FORMATTER)
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(levels["console_level"])
+        console_handler.setFormatter(FORMATTER)
+
+        _listener = QueueListener(_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Останавливает фоновый поток логирования, дописав все записи из очереди, и закрывает файлы логов.
+    Вызывается автоматически при завершении процесса. Следующий вызов setup_logger запустит поток снова.
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
 
 def setup_logger(name_module: str) -> logging.Logger:
-    # Определяем путь к файлу логов относительно текущего файла
-    log_file_path = os.path.join(LOGS_DIR, f"{name_module}.log")
-    os.makedirs(LOGS_DIR, exist_ok=True)
+    """
+    Возвращает логгер модуля, записи которого попадают в logs/<имя модуля>.log и в консоль.
+    Логгер только помещает записи в очередь, а запись в файлы и вывод в консоль выполняет фоновый поток,
+    поэтому логирование не задерживает загрузку и запросы.
+    """
+    levels = load_levels()
+    _start_listener(levels)
 
     # Создаем логгер
     logger = logging.getLogger(name_module)
-    logger.setLevel(logging.DEBUG)
+    # Уровень модуля задаётся в конфигурации, по умолчанию пропускаются записи, нужные хотя бы одному обработчику
+    default_level = min(logging.getLevelName(levels["level"]), logging.getLevelName(levels["console_level"]))
+    logger.setLevel(levels.get(name_module.lower(), default_level))
 
     # Проверяем, есть ли уже обработчики у логгера
     if not logger.handlers:
-        # Создаем обработчик для записи в файл
-        file_handler = logging.FileHandler(log_file_path, mode="w", encoding="utf-8")
-        file_handler.setLevel(logging.DEBUG)
-
-        # Форматирование логов
-        formatter = logging.Formatter("%(asctime)s %(name)s %(levelname)s: %(message)s")
-        file_handler.setFormatter(formatter)
-
-        # Добавляем обработчик к логгеру
-        logger.addHandler(file_handler)
-
-        # Создаем обработчик для вывода в консоль
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.DEBUG)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        logger.addHandler(_queue_handler)
 
     return logger
@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Границы корзин гистограмм по умолчанию, в секундах
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelsKey = tuple[tuple[str, str], ...]
+
+
+def _labels_key(labels: dict[str, Any]) -> LabelsKey:
+    """Приводит метки к хешируемому ключу с упорядоченными именами."""
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelsKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    """Форматирует метки в синтаксисе Prometheus: {name="value",...}."""
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = ((name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for name, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metrics:
+    """
+    Потокобезопасный реестр метрик: счётчики, текущие значения (gauge) и гистограммы с метками.
+
+    Метрики выгружаются в текстовом формате Prometheus (to_prometheus) и в JSON (to_json).
+    Дополнительно хранит планы EXPLAIN (ANALYZE, BUFFERS) последних медленных запросов.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, slow_queries_limit: int = 50) -> None:
+        self.buckets = buckets
+        self.__lock = threading.Lock()
+        self.__counters: dict[str, dict[LabelsKey, float]] = {}
+        self.__gauges: dict[str, dict[LabelsKey, float]] = {}
+        self.__histograms: dict[str, dict[LabelsKey, list]] = {}
+        self.__slow_queries: deque[dict] = deque(maxlen=slow_queries_limit)
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Увеличивает счётчик name с указанными метками на value."""
+        key = _labels_key(labels)
+        with self.__lock:
+            series = self.__counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """Устанавливает текущее значение name с указанными метками."""
+        key = _labels_key(labels)
+        with self.__lock:
+            self.__gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Добавляет наблюдение value в гистограмму name с указанными метками."""
+        key = _labels_key(labels)
+        with self.__lock:
+            series = self.__histograms.setdefault(name, {})
+            # Счётчики по корзинам, сумма и количество наблюдений
+            histogram = series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Измеряет время выполнения блока и добавляет его в гистограмму name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def add_slow_query(self, name: str, duration: float, plan: str) -> None:
+        """Сохраняет план медленного запроса, вытесняя самые старые планы сверх лимита."""
+        with self.__lock:
+            self.__slow_queries.append({"query": name, "duration": duration, "plan": plan})
+
+    def reset(self) -> None:
+        """Удаляет все накопленные метрики."""
+        with self.__lock:
+            self.__counters.clear()
+            self.__gauges.clear()
+            self.__histograms.clear()
+            self.__slow_queries.clear()
+
+    def to_prometheus(self) -> str:
+        """Возвращает метрики в текстовом формате экспозиции Prometheus."""
+        lines = []
+        with self.__lock:
+            for kind, registry in (("counter", self.__counters), ("gauge", self.__gauges)):
+                for name, series in sorted(registry.items()):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(series.items()):
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+
+            for name, histograms in sorted(self.__histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, (bucket_counts, total, count) in sorted(histograms.items()):
+                    for bound, bucket_count in zip(self.buckets, bucket_counts):
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', str(bound)),))} {bucket_count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {total}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        """Возвращает метрики и планы медленных запросов в виде словаря."""
+        with self.__lock:
+            return {
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self.__counters.items()
+                },
+                "gauges": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self.__gauges.items()
+                },
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(key),
+                            "buckets": dict(zip(map(str, self.buckets), bucket_counts)),
+                            "sum": total,
+                            "count": count,
+                        }
+                        for key, (bucket_counts, total, count) in series.items()
+                    ]
+                    for name, series in self.__histograms.items()
+                },
+                "slow_queries": list(self.__slow_queries),
+            }
+
+    def to_json(self) -> str:
+        """Возвращает метрики и планы медленных запросов в формате JSON."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+    def dump(self, prometheus_path: str | None = None, json_path: str | None = None) -> None:
+        """Записывает метрики в файлы в формате Prometheus и/или JSON."""
+        if prometheus_path:
+            with open(prometheus_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+        if json_path:
+            with open(json_path, "w", encoding="utf-8") as f:
+                f.write(self.to_json())
+        logger.info(f"Метрики записаны: {', '.join(path for path in (prometheus_path, json_path) if path)}")
+
+
+# Общий реестр метрик процесса, в который пишут HeadHunterAPI, DataBaseSQL и DBManager
+metrics = Metrics()
@@ -0,0 +1,230 @@
+from typing import Any
+
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Ключ advisory-блокировки, чтобы миграции не применялись одновременно из нескольких процессов
+MIGRATIONS_LOCK_KEY = 20250114
+
+# Список миграций схемы: (версия, описание, SQL-запросы).
+# Применённые миграции не изменяются, любое изменение схемы оформляется новой миграцией в конце списка.
+MIGRATIONS: list[tuple[int, str, list[str]]] = [
+    (
+        1,
+        "Таблицы employer, vacancies и sync_state",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS employer (
+                id SERIAL PRIMARY KEY,
+                employer_id int UNIQUE,
+                employer_name VARCHAR(100),
+                employer_url VARCHAR(100)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS vacancies (
+                vacancy_id SERIAL PRIMARY KEY,
+                vacancy_name VARCHAR(100),
+                vacancy_url VARCHAR(100),
+                city VARCHAR(50),
+                salary INT,
+                employer_id INT,
+                FOREIGN KEY (employer_id) REFERENCES employer(employer_id)
+            )
+            """,
+            # IF NOT EXISTS позволяет применить миграцию к базе, созданной до появления миграций
+            """
+            ALTER TABLE vacancies
+                ADD COLUMN IF NOT EXISTS hh_id BIGINT,
+                ADD COLUMN IF NOT EXISTS published_at TIMESTAMPTZ,
+                ADD COLUMN IF NOT EXISTS is_closed BOOLEAN NOT NULL DEFAULT FALSE,
+                ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS vacancies_hh_id_key ON vacancies (hh_id)",
+            """
+            CREATE TABLE IF NOT EXISTS sync_state (
+                id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+                last_sync_at TIMESTAMPTZ,
+                last_full_sync_at TIMESTAMPTZ
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        "Текстовые колонки без ограничения длины",
+        [
+            """
+            ALTER TABLE employer
+                ALTER COLUMN employer_name TYPE TEXT,
+                ALTER COLUMN employer_url TYPE TEXT
+            """,
+            """
+            ALTER TABLE vacancies
+                ALTER COLUMN vacancy_name TYPE TEXT,
+                ALTER COLUMN vacancy_url TYPE TEXT,
+                ALTER COLUMN city TYPE TEXT
+            """,
+        ],
+    ),
+    (
+        3,
+        "Индексы под запросы DBManager",
+        [
+            # JOIN vacancies с employer в get_all_vacancies и get_companies_and_vacancies_count
+            "CREATE INDEX IF NOT EXISTS vacancies_employer_id_idx ON vacancies (employer_id)",
+            # Сравнение зарплаты со средней в get_vacancies_with_higher_salary
+            "CREATE INDEX IF NOT EXISTS vacancies_salary_idx ON vacancies (salary) WHERE NOT is_closed",
+            # Группировка по названию в get_avg_salary
+            "CREATE INDEX IF NOT EXISTS vacancies_name_idx ON vacancies (vacancy_name) WHERE NOT is_closed",
+            # Поиск подстроки LIKE '%...%' в get_vacancies_with_keyword
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            """
+            CREATE INDEX IF NOT EXISTS vacancies_name_trgm_idx ON vacancies
+            USING gin (vacancy_name gin_trgm_ops) WHERE NOT is_closed
+            """,
+        ],
+    ),
+    (
+        4,
+        "Материализованные агрегаты для отчётов DBManager",
+        [
+            """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS employer_vacancy_counts AS
+            SELECT employer.employer_name, COUNT(vacancies.vacancy_id) AS vacancy_count
+            FROM vacancies
+            JOIN employer ON employer.employer_id = vacancies.employer_id
+            WHERE NOT vacancies.is_closed
+            GROUP BY employer.employer_name
+            """,
+            """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS vacancy_avg_salaries AS
+            SELECT vacancy_name, AVG(salary) AS avg_salary
+            FROM vacancies
+            WHERE NOT is_closed
+            GROUP BY vacancy_name
+            """,
+            """
+            CREATE MATERIALIZED VIEW IF NOT EXISTS salary_stats AS
+            SELECT 1 AS id, AVG(salary) AS avg_salary, COUNT(*) AS vacancy_count
+            FROM vacancies
+            WHERE NOT is_closed
+            """,
+            # Уникальные индексы нужны для REFRESH MATERIALIZED VIEW CONCURRENTLY
+            "CREATE UNIQUE INDEX IF NOT EXISTS employer_vacancy_counts_key ON employer_vacancy_counts (employer_name)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS vacancy_avg_salaries_key ON vacancy_avg_salaries (vacancy_name)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS salary_stats_key ON salary_stats (id)",
+        ],
+    ),
+    (
+        5,
+        "Поколение данных для инвалидации кэша отчётов",
+        ["ALTER TABLE sync_state ADD COLUMN IF NOT EXISTS data_generation BIGINT NOT NULL DEFAULT 0"],
+    ),
+    (
+        6,
+        "Полнотекстовый поиск по названию вакансии",
+        [
+            # Колонка вычисляется самой базой при вставке и обновлении названия, русская конфигурация
+            # приводит слова к основе, поэтому поиск находит разные формы слова
+            """
+            ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (to_tsvector('russian', COALESCE(vacancy_name, ''))) STORED
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS vacancies_search_vector_idx ON vacancies
+            USING gin (search_vector) WHERE NOT is_closed
+            """,
+        ],
+    ),
+    (
+        7,
+        "Подробные описания вакансий",
+        [
+            # source_updated_at — значение vacancies.updated_at, для которого загружено описание:
+            # описание загружается заново, только если вакансия изменилась после этого
+            """
+            CREATE TABLE IF NOT EXISTS vacancy_details (
+                hh_id BIGINT PRIMARY KEY REFERENCES vacancies (hh_id) ON DELETE CASCADE,
+                description TEXT,
+                key_skills TEXT[] NOT NULL DEFAULT '{}',
+                experience TEXT,
+                content_hash TEXT NOT NULL,
+                source_updated_at TIMESTAMPTZ NOT NULL,
+                fetched_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """,
+        ],
+    ),
+]
+
+# Материализованные представления, которые обновляются после каждой загрузки данных
+AGGREGATE_VIEWS = ["employer_vacancy_counts", "vacancy_avg_salaries", "salary_stats"]
+
+
+def get_schema_version(conn: Any) -> int:
+    """Возвращает номер последней применённой миграции (0, если миграции не применялись)."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations')")
+        if cur.fetchone()[0] is None:
+            return 0
+        cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+        version: int = cur.fetchone()[0]
+    conn.rollback()
+    return version
+
+
+def apply_migrations(conn: Any, migrations: list[tuple[int, str, list[str]]] = MIGRATIONS) -> list[int]:
+    """
+    Применяет к базе данных ещё не применённые миграции.
+    Каждая миграция выполняется в отдельной транзакции вместе с записью в таблицу schema_migrations,
+    поэтому упавшая миграция откатывается целиком и будет повторена при следующем запуске.
+    Возвращает список версий применённых миграций.
+    """
+    conn.autocommit = False
+    applied: list[int] = []
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+        conn.commit()
+
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_KEY,))
+        try:
+            cur.execute("SELECT version FROM schema_migrations")
+            done = {row[0] for row in cur.fetchall()}
+            conn.commit()
+
+            for version, description, statements in migrations:
+                if version in done:
+                    continue
+                logger.info(f"Применяем миграцию {version}: {description}")
+                try:
+                    for statement in statements:
+                        cur.execute(statement)
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                        (version, description),
+                    )
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    logger.error(f"Ошибка при применении миграции {version}: {e}")
+                    raise
+                applied.append(version)
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_KEY,))
+            conn.commit()
+
+    if applied:
+        logger.info(f"Применены миграции: {applied}")
+    else:
+        logger.info("Схема базы данных актуальна, новых миграций нет")
+    return applied
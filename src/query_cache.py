@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class QueryCache:
+    """
+    Потокобезопасный кэш результатов запросов в памяти процесса.
+
+    Каждая запись помечается поколением данных (data_generation), при котором она была получена.
+    Запись считается действительной, только если её поколение совпадает с текущим и она моложе ttl секунд.
+    При превышении maxsize вытесняется давно не использованная запись (LRU).
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__entries: OrderedDict[Hashable, tuple[int, float, Any]] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, generation: int) -> tuple[bool, Any]:
+        """Возвращает пару (найдено ли значение, значение) для ключа и текущего поколения данных."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                entry_generation, stored_at, value = entry
+                if entry_generation == generation and time.monotonic() - stored_at < self.ttl:
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.__entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, generation: int, value: Any) -> None:
+        """Сохраняет значение для ключа и поколения данных, вытесняя давно не использованные записи."""
+        with self.__lock:
+            self.__entries[key] = (generation, time.monotonic(), value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша."""
+        with self.__lock:
+            self.__entries.clear()
+        logger.info("Кэш результатов запросов очищен")
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Папка для кэша ответов API в корне проекта
+CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "cache"))
+
+
+class ResponseCache:
+    """
+    Дисковый кэш ответов API.
+    Каждый ответ хранится в отдельном JSON-файле, имя которого вычисляется из URL и параметров запроса.
+    Вместе с телом ответа сохраняются время записи и заголовки ETag/Last-Modified для повторной валидации.
+    Записи старше ttl секунд считаются устаревшими, при превышении max_entries удаляются
+    давно не использованные записи (LRU по времени последнего обращения к файлу).
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, ttl: float = 3600, max_entries: int = 500) -> None:
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.__lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _key(url: str, params: dict) -> str:
+        """Вычисляет ключ кэша по URL и параметрам запроса."""
+        raw = json.dumps([url, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, url: str, params: dict) -> str:
+        return os.path.join(self.cache_dir, f"{self._key(url, params)}.json")
+
+    def get(self, url: str, params: dict) -> dict[str, Any] | None:
+        """
+        Возвращает запись кэша для запроса или None, если записи нет.
+        Обращение к записи обновляет время доступа к файлу, которое используется для вытеснения LRU.
+        """
+        path = self._path(url, params)
+        with self.__lock:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entry: dict[str, Any] = json.load(f)
+            except (OSError, ValueError):
+                return None
+            os.utime(path)
+        return entry
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        """Проверяет, что запись кэша ещё не устарела."""
+        return bool(time.time() - entry.get("stored_at", 0) < self.ttl)
+
+    def set(
+        self, url: str, params: dict, body: Any, etag: str | None = None, last_modified: str | None = None
+    ) -> None:
+        """Сохраняет ответ в кэш и при необходимости вытесняет старые записи."""
+        entry = {"stored_at": time.time(), "etag": etag, "last_modified": last_modified, "body": body}
+        self._write(self._path(url, params), entry)
+
+    def touch(self, url: str, params: dict, entry: dict[str, Any]) -> None:
+        """Продлевает срок жизни записи после ответа 304 Not Modified."""
+        entry["stored_at"] = time.time()
+        self._write(self._path(url, params), entry)
+
+    def _write(self, path: str, entry: dict[str, Any]) -> None:
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self.__lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Удаляет давно не использованные записи, если их больше max_entries."""
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[: len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError as e:
+                logger.warning(f"Не удалось удалить запись кэша {entry.path}: {e}")
+        logger.info(f"Из кэша удалено {len(entries) - self.max_entries} устаревших записей")
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша."""
+        with self.__lock:
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".json"):
+                    os.remove(entry.path)
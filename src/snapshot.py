@@ -0,0 +1,160 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Формат снимка:
+#   MAGIC
+#   кадры: заголовок FRAME_HEADER (длина сжатых данных, количество вакансий) и сжатый zlib JSON-массив вакансий
+#   индекс: по записи INDEX_ENTRY (смещение кадра, длина сжатых данных, количество вакансий) на каждый кадр
+#   концевик TRAILER: смещение индекса, количество кадров, количество вакансий, MAGIC
+# Индекс в конце файла позволяет читать любой кадр без разбора предыдущих.
+MAGIC = b"HHSNAP01"
+FRAME_HEADER = struct.Struct("<II")
+INDEX_ENTRY = struct.Struct("<QII")
+TRAILER = struct.Struct("<QIQ8s")
+
+# Поля вакансии, которые использует DataBaseSQL.insert_data_to_db. Снимок только с этими полями
+# в несколько раз меньше полного ответа API и быстрее воспроизводится
+INGEST_FIELDS = ("id", "name", "alternate_url", "salary", "address", "employer", "published_at")
+
+
+class SnapshotWriter:
+    """
+    Записывает вакансии в сжатый снимок постранично: каждая страница сохраняется отдельным кадром.
+    Снимок пишется во временный файл и переименовывается в path только при успешном закрытии,
+    поэтому прерванная запись не оставляет повреждённый снимок.
+    Если передан fields, у вакансий сохраняются только перечисленные поля (например, INGEST_FIELDS).
+    Используется как контекстный менеджер.
+    """
+
+    def __init__(self, path: str, compression_level: int = 6, fields: Iterable[str] | None = None) -> None:
+        self.path = path
+        self.compression_level = compression_level
+        self.fields = tuple(fields) if fields is not None else None
+        self.__tmp_path = f"{path}.tmp"
+        self.__file = open(self.__tmp_path, "wb")
+        self.__file.write(MAGIC)
+        self.__index: list[tuple[int, int, int]] = []
+        self.count = 0
+
+    def write_page(self, vacancies: list[dict]) -> None:
+        """Записывает страницу вакансий одним кадром."""
+        if self.fields is not None:
+            vacancies = [{field: vacancy[field] for field in self.fields if field in vacancy} for vacancy in vacancies]
+        data = zlib.compress(json.dumps(vacancies, ensure_ascii=False).encode("utf-8"), self.compression_level)
+        offset = self.__file.tell()
+        self.__file.write(FRAME_HEADER.pack(len(data), len(vacancies)))
+        self.__file.write(data)
+        self.__index.append((offset, len(data), len(vacancies)))
+        self.count += len(vacancies)
+
+    def write_vacancies(self, vacancies: Iterable[dict], page_size: int = 100) -> None:
+        """Записывает поток вакансий кадрами по page_size штук."""
+        iterator = iter(vacancies)
+        while page := list(islice(iterator, page_size)):
+            self.write_page(page)
+
+    def close(self) -> None:
+        """Дописывает индекс и концевик и публикует снимок под именем path."""
+        if self.__file.closed:
+            return
+        index_offset = self.__file.tell()
+        for entry in self.__index:
+            self.__file.write(INDEX_ENTRY.pack(*entry))
+        self.__file.write(TRAILER.pack(index_offset, len(self.__index), self.count, MAGIC))
+        self.__file.close()
+        os.replace(self.__tmp_path, self.path)
+        logger.info(f"Снимок {self.path} записан: {len(self.__index)} страниц, {self.count} вакансий.")
+
+    def abort(self) -> None:
+        """Прерывает запись и удаляет временный файл."""
+        if not self.__file.closed:
+            self.__file.close()
+        if os.path.exists(self.__tmp_path):
+            os.remove(self.__tmp_path)
+        logger.warning(f"Запись снимка {self.path} прервана.")
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class SnapshotReader:
+    """
+    Читает снимок, записанный SnapshotWriter, через отображение файла в память (mmap).
+    Страницы распаковываются по одной при обращении, поэтому потребление памяти ограничено размером
+    одной страницы независимо от размера снимка. Используется как контекстный менеджер.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.__file = open(path, "rb")
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.__file.close()
+            raise ValueError(f"Файл {path} не является снимком")
+
+        if len(self.__map) < len(MAGIC) + TRAILER.size or self.__map[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Файл {path} не является снимком")
+        index_offset, pages, self.count, magic = TRAILER.unpack_from(self.__map, len(self.__map) - TRAILER.size)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Снимок {path} не дописан: отсутствует индекс")
+        self.__index = [INDEX_ENTRY.unpack_from(self.__map, index_offset + i * INDEX_ENTRY.size) for i in range(pages)]
+
+    def __len__(self) -> int:
+        """Количество страниц в снимке."""
+        return len(self.__index)
+
+    def read_page(self, number: int) -> list[dict]:
+        """Распаковывает и возвращает страницу с номером number."""
+        offset, size, _ = self.__index[number]
+        start = offset + FRAME_HEADER.size
+        end = start + size
+        page: list[dict] = json.loads(zlib.decompress(self.__map[start:end]))
+        return page
+
+    def iter_pages(self) -> Iterator[list[dict]]:
+        """Отдаёт страницы снимка по порядку."""
+        for number in range(len(self.__index)):
+            yield self.read_page(number)
+
+    def iter_vacancies(self, valid_only: bool = True) -> Iterator[dict]:
+        """
+        Отдаёт вакансии снимка по одной, например для DataBaseSQL.insert_data_to_db.
+        При valid_only=True, как и HeadHunterAPI.iter_vacancies, пропускаются вакансии без зарплаты или адреса.
+        """
+        count = 0
+        for page in self.iter_pages():
+            for vacancy in page:
+                if not valid_only or (vacancy.get("salary") is not None and vacancy.get("address") is not None):
+                    count += 1
+                    yield vacancy
+        logger.info(f"Из снимка {self.path} передано {count} вакансий.")
+
+    def close(self) -> None:
+        """Закрывает отображение и файл снимка."""
+        if not self.__map.closed:
+            self.__map.close()
+        self.__file.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
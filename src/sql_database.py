@@ -1,13 +1,143 @@
-from typing import Any
+import io
+import multiprocessing
+import queue
+import re
+import time
+from datetime import datetime
+from typing import Any, Iterable
 
 import psycopg2
+from psycopg2.extras import execute_values
 
-from src.base_sql import Base_SQL
+from src.base_sql import REJECTS_LOG_LIMIT, Base_SQL, batched, prepare_batch
 from src.logger import setup_logger
+from src.metrics import metrics
+from src.migrations import AGGREGATE_VIEWS, apply_migrations
+from src.vacancy_record import VacancyRecord
 
 logger = setup_logger(__name__)
 
 
+EMPLOYER_INSERT = """
+    INSERT INTO employer (employer_id, employer_name, employer_url)
+    VALUES %s
+    ON CONFLICT (employer_id) DO UPDATE
+    SET employer_name = EXCLUDED.employer_name, employer_url = EXCLUDED.employer_url
+    WHERE (employer.employer_name, employer.employer_url)
+        IS DISTINCT FROM (EXCLUDED.employer_name, EXCLUDED.employer_url)
+"""
+
+# Изменившиеся и ранее закрытые вакансии обновляются, неизменные строки не переписываются
+VACANCY_INSERT = """
+    INSERT INTO vacancies (hh_id, vacancy_name, vacancy_url, city, salary, employer_id, published_at)
+    VALUES %s
+    ON CONFLICT (hh_id) DO UPDATE
+    SET vacancy_name = EXCLUDED.vacancy_name,
+        vacancy_url = EXCLUDED.vacancy_url,
+        city = EXCLUDED.city,
+        salary = EXCLUDED.salary,
+        employer_id = EXCLUDED.employer_id,
+        published_at = EXCLUDED.published_at,
+        is_closed = FALSE,
+        updated_at = now()
+    WHERE vacancies.is_closed
+        OR (vacancies.vacancy_name, vacancies.vacancy_url, vacancies.city, vacancies.salary,
+            vacancies.employer_id, vacancies.published_at)
+        IS DISTINCT FROM (EXCLUDED.vacancy_name, EXCLUDED.vacancy_url, EXCLUDED.city, EXCLUDED.salary,
+            EXCLUDED.employer_id, EXCLUDED.published_at)
+"""
+
+# Временные таблицы для загрузки пачек через COPY: строки пачки передаются одной командой COPY и переносятся
+# в основную таблицу одним INSERT ... SELECT ... ON CONFLICT (запрос *_INSERT, в котором VALUES заменено чтением
+# из таблицы). Это быстрее многострочного INSERT: строки не форматируются в текст SQL и не разбираются сервером.
+# Строки удаляются при фиксации транзакции пачки
+STAGING_TABLES = {
+    "employer_staging": "employer_id INTEGER, employer_name TEXT, employer_url TEXT",
+    "vacancy_staging": (
+        "hh_id BIGINT, vacancy_name TEXT, vacancy_url TEXT, city TEXT, salary INTEGER, employer_id INTEGER, "
+        "published_at TIMESTAMPTZ"
+    ),
+}
+
+# Экранирование значений для текстового формата COPY: строки без специальных символов передаются как есть
+COPY_SPECIAL = re.compile(r"[\\\t\n\r]")
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_escape(value: str) -> str:
+    """Экранирует обратную косую черту, табуляцию и переводы строк в значении для текстового формата COPY."""
+    if COPY_SPECIAL.search(value) is None:
+        return value
+    return value.translate(COPY_ESCAPES)
+
+
+def _copy_text(rows: Iterable[tuple]) -> io.StringIO:
+    """Формирует данные COPY ... FROM STDIN в текстовом формате: поля через табуляцию, NULL записывается как \\N."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(
+            "\t".join(
+                [
+                    "\\N" if value is None else _copy_escape(value) if isinstance(value, str) else str(value)
+                    for value in row
+                ]
+            )
+        )
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def _create_staging_tables(cur: Any) -> None:
+    """Создаёт на соединении временные таблицы STAGING_TABLES для загрузки пачек через COPY."""
+    for table, columns in STAGING_TABLES.items():
+        cur.execute(f"CREATE TEMP TABLE {table} ({columns}) ON COMMIT DELETE ROWS")
+
+
+def _put(tasks: Any, item: Any, process: Any) -> None:
+    """Передаёт задание процессу загрузки, не зависая, если процесс аварийно завершился."""
+    while True:
+        try:
+            tasks.put(item, timeout=1)
+            return
+        except queue.Full:
+            if process.exitcode is not None:
+                raise RuntimeError(f"Процесс загрузки {process.name} аварийно завершился с кодом {process.exitcode}")
+
+
+def _load_partition(connect_params: dict, tasks: Any, results: Any) -> None:
+    """
+    Процесс параллельной загрузки: вставляет вакансии своей доли работодателей на собственном соединении.
+    Получает из tasks списки строк вакансий (None — конец загрузки), каждый список вставляется отдельной
+    транзакцией. По окончании отправляет в results количество вставленных или обновлённых строк,
+    отклонённые записи, длительности транзакций и текст ошибки (None, если ошибок не было).
+    Процесс не пишет в лог: итоги записывает основной процесс.
+    """
+    upserted = 0
+    rejects: list[tuple[str, str]] = []
+    durations: list[float] = []
+    error = None
+    conn = None
+    try:
+        conn = psycopg2.connect(**connect_params)
+        with conn.cursor() as cur:
+            _create_staging_tables(cur)
+            while (rows := tasks.get()) is not None:
+                started = time.perf_counter()
+                upserted += DataBaseSQL._copy_rows(cur, "vacancy_staging", VACANCY_INSERT, rows, rejects)
+                conn.commit()
+                durations.append(time.perf_counter() - started)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        # Оставшиеся задания вычитываются, чтобы основной процесс не ждал освобождения очереди
+        while tasks.get() is not None:
+            pass
+    finally:
+        if conn is not None:
+            conn.close()
+    results.put((upserted, rejects, durations, error))
+
+
 class DataBaseSQL(Base_SQL):
     """
     Класс для работы с базой данных SQL.
@@ -20,13 +150,7 @@ class DataBaseSQL(Base_SQL):
         self.params = params
         try:
             logger.info("Подключаемся к базе данных PostgreSQL для создания базы.")
-            self.conn = psycopg2.connect(
-                dbname="postgres",
-                user=self.params.get("user"),
-                password=self.params.get("password"),
-                host=self.params.get("host", "localhost"),  # Значение по умолчанию
-                port=self.params.get("port", 5432),  # Значение по умолчанию
-            )
+            self.conn = self._connect("postgres")
             self.conn.autocommit = True
             logger.info(f"Подключение к базе данных {self.database_name} успешно установлено.")
         except psycopg2.Error as e:
@@ -36,15 +160,35 @@ class DataBaseSQL(Base_SQL):
         self.create_database()
         self.create_tables()
 
+    def _connect_params(self, dbname: str | None = None) -> dict[str, Any]:
+        """Параметры подключения к указанной базе данных (по умолчанию — к базе проекта)."""
+        return {
+            "dbname": dbname or self.database_name,
+            "user": self.params.get("user"),
+            "password": self.params.get("password"),
+            "host": self.params.get("host", "localhost"),  # Значение по умолчанию
+            "port": self.params.get("port", 5432),  # Значение по умолчанию
+        }
+
+    def _connect(self, dbname: str | None = None) -> Any:
+        """Открывает соединение с указанной базой данных (по умолчанию — с базой проекта)."""
+        return psycopg2.connect(**self._connect_params(dbname))
+
     def create_database(self) -> None:
-        """Создаем базу данных, если её нет"""
+        """
+        Создаем базу данных, если её нет.
+        Существующая база не пересоздаётся: данные обновляются инкрементально при синхронизации.
+        """
         try:
             logger.info(f"Создаём базу данных {self.database_name} (если её нет).")
 
             with self.conn.cursor() as cur:
-                cur.execute(f"DROP DATABASE IF EXISTS {self.database_name}")
-                cur.execute(f"CREATE DATABASE {self.database_name}")
-                logger.info(f"База данных {self.database_name} успешно создана.")
+                cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (self.database_name,))
+                if cur.fetchone():
+                    logger.info(f"База данных {self.database_name} уже существует.")
+                else:
+                    cur.execute(f"CREATE DATABASE {self.database_name}")
+                    logger.info(f"База данных {self.database_name} успешно создана.")
 
         except psycopg2.Error as e:
             logger.error(f"Ошибка при создании базы данных: {e}")
@@ -54,45 +198,16 @@ class DataBaseSQL(Base_SQL):
             self.conn.close()
 
     def create_tables(self) -> None:
-        """Создаем таблицы в базе данных"""
+        """
+        Создаем таблицы в базе данных.
+        Схема описана версионированными миграциями (src/migrations.py): применяются только те миграции,
+        которых ещё нет в базе, поэтому существующая схема обновляется без потери данных.
+        """
         try:
             logger.info(f"Создаём таблицы в базе данных {self.database_name}.")
 
-            self.conn = psycopg2.connect(
-                dbname=self.database_name,
-                user=self.params.get("user"),
-                password=self.params.get("password"),
-                host=self.params.get("host", "localhost"),  # Значение по умолчанию
-                port=self.params.get("port", 5432),  # Значение по умолчанию
-            )  # Подключение к новой базе
-            self.conn.autocommit = True
-
-            # Создаем таблицы
-            with self.conn.cursor() as cur:
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS employer (
-                        id SERIAL PRIMARY KEY,
-                        employer_id int UNIQUE,
-                        employer_name VARCHAR(100),
-                        employer_url VARCHAR(100)
-                    )
-                """
-                )
-
-                cur.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS vacancies (
-                        vacancy_id SERIAL PRIMARY KEY,
-                        vacancy_name VARCHAR(100),
-                        vacancy_url VARCHAR(100),
-                        city VARCHAR(50),
-                        salary INT,
-                        employer_id INT,
-                        FOREIGN KEY (employer_id) REFERENCES employer(employer_id)
-                    )
-                """
-                )
+            self.conn = self._connect()  # Подключение к новой базе
+            apply_migrations(self.conn)
             logger.info("Таблицы успешно созданы.")
         except psycopg2.Error as e:
             logger.error(f"Ошибка при создании таблиц: {e}")
@@ -101,86 +216,311 @@ class DataBaseSQL(Base_SQL):
             self.conn.commit()
             self.conn.close()
 
-    def insert_data_to_db(self, vacancies: list[dict]) -> None:
-        """Вставляем данные в таблицы базы данных"""
+    def refresh_aggregates(self, conn: Any = None) -> None:
+        """
+        Пересчитывает материализованные агрегаты, из которых DBManager читает отчёты.
+        Обновление выполняется с CONCURRENTLY, поэтому читатели видят прежние данные до его окончания,
+        а не ждут снятия блокировки. Пустое представление (первая загрузка) пересчитывается без CONCURRENTLY:
+        прежних данных у него нет, а сравнение со старым содержимым в несколько раз медленнее простого пересчёта.
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = self._connect()
         try:
-            logger.info(f"Начинаем вставку данных в базу данных {self.database_name}.")
+            conn.autocommit = True
+            with conn.cursor() as cur, metrics.timer("db_sync_stage_seconds", stage="refresh_aggregates"):
+                for view in AGGREGATE_VIEWS:
+                    cur.execute(f"SELECT EXISTS (SELECT 1 FROM {view})")
+                    concurrently = "CONCURRENTLY " if cur.fetchone()[0] else ""
+                    cur.execute(f"REFRESH MATERIALIZED VIEW {concurrently}{view}")
+            logger.info("Материализованные агрегаты обновлены.")
+        except psycopg2.Error as e:
+            logger.error(f"Ошибка при обновлении материализованных агрегатов: {e}")
+            raise
+        finally:
+            conn.autocommit = False
+            if own_conn:
+                conn.close()
 
-            self.conn = psycopg2.connect(
-                dbname=self.database_name,
-                user=self.params.get("user"),
-                password=self.params.get("password"),
-                host=self.params.get("host", "localhost"),  # Значение по умолчанию
-                port=self.params.get("port", 5432),  # Значение по умолчанию
+    @staticmethod
+    def _save_sync_state(conn: Any, sync_started_at: datetime, full_sync: bool) -> None:
+        """
+        Запоминает время синхронизации и увеличивает поколение данных (data_generation).
+        По смене поколения DBManager понимает, что закэшированные результаты отчётов устарели.
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO sync_state (last_sync_at, last_full_sync_at, data_generation)
+                VALUES (%(at)s, %(full_at)s, 1)
+                ON CONFLICT (id) DO UPDATE
+                SET last_sync_at = EXCLUDED.last_sync_at,
+                    last_full_sync_at = COALESCE(EXCLUDED.last_full_sync_at, sync_state.last_full_sync_at),
+                    data_generation = sync_state.data_generation + 1
+                """,
+                {"at": sync_started_at, "full_at": sync_started_at if full_sync else None},
             )
-            self.conn.autocommit = True
+        conn.commit()
+
+    def get_sync_state(self) -> dict[str, datetime | None]:
+        """
+        Возвращает время последней синхронизации (last_sync_at) и последней полной синхронизации
+        (last_full_sync_at). Для базы, которая ещё не синхронизировалась, оба значения равны None.
+        """
+        conn = self._connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT last_sync_at, last_full_sync_at FROM sync_state")
+                row = cur.fetchone()
+        finally:
+            conn.close()
+        last_sync_at, last_full_sync_at = row if row else (None, None)
+        return {"last_sync_at": last_sync_at, "last_full_sync_at": last_full_sync_at}
+
+    def insert_data_to_db(
+        self,
+        vacancies: Iterable[dict | VacancyRecord],
+        batch_size: int = 1000,
+        full_sync: bool = True,
+        workers: int = 1,
+    ) -> list[tuple[str, str]]:
+        """
+        Синхронизирует вакансии с базой данных.
+        Вакансии передаются в формате API HeadHunter или записями VacancyRecord (например,
+        HeadHunterAPI.iter_records), как списком, так и генератором:
+        они читаются пачками по batch_size штук, и каждая пачка вставляется в отдельной транзакции.
+        Внутри пачки работодатели сначала дедуплицируются, затем работодатели и вакансии копируются командой COPY
+        во временные таблицы и переносятся одним INSERT ... SELECT ... ON CONFLICT по идентификатору HH:
+        новые вакансии добавляются, изменившиеся обновляются, неизменные не переписываются.
+        При full_sync=True переданные вакансии считаются полным списком, и вакансии, которых в нём нет,
+        помечаются закрытыми. При full_sync=False (загрузка только новых и обновлённых вакансий) закрытие
+        не выполняется. После успешной загрузки запоминается время начала синхронизации.
+        При workers > 1 вакансии загружаются параллельно workers процессами, каждый на своём соединении.
+        Вакансии распределяются между процессами по employer_id, работодатели каждой пачки вставляются
+        основным процессом до передачи вакансий процессам, поэтому внешний ключ на employer не нарушается.
+        Закрытие исчезнувших вакансий, пересчёт агрегатов и запись времени синхронизации выполняются
+        после завершения всех процессов, отклонённые записи всех процессов объединяются.
+        Возвращает список отклонённых записей в виде пар (идентификатор, причина).
+        Количество строк, отклонённых записей, время транзакций и скорость загрузки записываются в метрики.
+        """
+        rejects: list[tuple[str, str]] = []
+        upserted = 0
+        received = 0
+        started = time.perf_counter()
+        processes: list[Any] = []
+        task_queues: list[Any] = []
+        try:
+            logger.info(f"Начинаем вставку данных в базу данных {self.database_name}.")
+
+            self.conn = self._connect()
             with self.conn.cursor() as cur:
-                for vacancy in vacancies:
-                    try:
-                        employer = vacancy.get("employer")
-                        if employer:
-                            employer_id = employer.get("id")
-                            employer_name = employer.get("name")
-                            employer_url = employer.get("alternate_url")
-
-                            cur.execute(
-                                """
-                                INSERT INTO employer (employer_id, employer_name, employer_url)
-                                VALUES (%s, %s, %s)
-                                ON CONFLICT (employer_id) DO NOTHING
-                                RETURNING employer_id
-                                """,
-                                (employer_id, employer_name, employer_url),
-                            )
-
-                            result = cur.fetchone()
-                            if result:
-                                employer_id = result[0]
-                            else:
-                                logger.warning(f"Работодатель {employer_id} уже существует, пропускаем вставку.")
-                        else:
-                            logger.warning(f"Данные о работодателе отсутствуют для вакансии {vacancy.get('id')}")
-                            continue
-
-                        salary_from = vacancy.get("salary", {}).get("from")
-                        salary_to = vacancy.get("salary", {}).get("to")
-                        salary = salary_from if salary_from is not None else salary_to
-
-                        address = vacancy.get("address")
-                        city = address.get("city") if address else None
-
-                        cur.execute(
-                            """
-                            INSERT INTO vacancies (vacancy_name, vacancy_url, city, salary, employer_id)
-                            VALUES (%s, %s, %s, %s, %s)
-                            """,
-                            (
-                                vacancy.get("name"),
-                                vacancy.get("alternate_url"),
-                                city,
-                                salary,
-                                employer_id,
-                            ),
+                cur.execute("SELECT now()")
+                sync_started_at = cur.fetchone()[0]
+                # Идентификаторы полученных вакансий копируются без проверки повторов: закрытию это не мешает
+                cur.execute("CREATE TEMP TABLE seen_vacancies (hh_id BIGINT) ON COMMIT PRESERVE ROWS")
+                _create_staging_tables(cur)
+
+                if workers > 1:
+                    results = self._start_workers(workers, processes, task_queues)
+
+                for batch in batched(vacancies, batch_size):
+                    batch_rejects: list[tuple[str, str]] = []
+                    employers, rows, seen = prepare_batch(batch, batch_rejects)
+                    with metrics.timer("db_insert_transaction_seconds"):
+                        self._copy_rows(cur, "employer_staging", EMPLOYER_INSERT, employers, batch_rejects)
+                        # В параллельном режиме вакансии вставляют процессы загрузки после фиксации работодателей
+                        batch_upserted = (
+                            self._copy_rows(cur, "vacancy_staging", VACANCY_INSERT, rows, batch_rejects)
+                            if not processes
+                            else 0
                         )
-                        logger.info(f"Вакансия {vacancy.get('id')} успешно вставлена.")
-
-                    except psycopg2.Error as e:
-                        logger.error(f"Ошибка при обработке вакансии {vacancy.get('id')}: {e}")
-                        continue
-                    except KeyError as e:
-                        logger.warning(f"KeyError: отсутствует ключ {e} в вакансии {vacancy.get('id')}")
-                        continue
-                    except TypeError as e:
-                        logger.warning(f"TypeError: неверный тип данных в вакансии {vacancy.get('id')}: {e}")
-                        continue
-                    except Exception as e:
-                        logger.error(f"Неизвестная ошибка при обработке вакансии {vacancy.get('id')}: {e}")
-                        continue
-
-            logger.info("Все вакансии успешно вставлены.")
+                        cur.copy_expert("COPY seen_vacancies FROM STDIN", _copy_text((hh_id,) for hh_id in seen))
+                        self.conn.commit()
+                    if processes:
+                        for number, partition in enumerate(self._partition(rows, len(processes))):
+                            if partition:
+                                _put(task_queues[number], partition, processes[number])
+
+                    received += len(batch)
+                    upserted += batch_upserted
+                    rejects.extend(batch_rejects)
+                    metrics.inc("db_insert_rows_total", len(batch))
+                    metrics.inc("db_insert_upserted_total", batch_upserted)
+                    metrics.inc("db_insert_rejects_total", len(batch_rejects))
+                    logger.info(
+                        f"Пачка обработана: {len(batch)} вакансий, {len(employers)} уникальных работодателей, "
+                        f"добавлено или обновлено {batch_upserted}, отклонено {len(batch_rejects)}."
+                    )
+
+                if processes:
+                    workers_upserted, workers_rejects = self._finish_workers(processes, task_queues, results)
+                    upserted += workers_upserted
+                    rejects.extend(workers_rejects)
+
+                # Время этапа включает ожидание пачек от источника, например загрузку страниц из API
+                metrics.observe("db_sync_stage_seconds", time.perf_counter() - started, stage="insert")
+                if full_sync:
+                    cur.execute(
+                        """
+                        UPDATE vacancies SET is_closed = TRUE, updated_at = now()
+                        WHERE NOT is_closed
+                            AND NOT EXISTS (SELECT 1 FROM seen_vacancies WHERE seen_vacancies.hh_id = vacancies.hh_id)
+                        """
+                    )
+                    logger.info(f"Помечено закрытыми {cur.rowcount} вакансий.")
+
+                self.conn.commit()
+
+            # Агрегаты пересчитываются до смены поколения данных, чтобы кэш отчётов не сохранил их старые значения
+            self.refresh_aggregates(self.conn)
+            self._save_sync_state(self.conn, sync_started_at, full_sync)
+            elapsed = time.perf_counter() - started
+            metrics.observe("db_sync_stage_seconds", elapsed, stage="total")
+            metrics.set("db_insert_rows_per_second", received / elapsed if elapsed else 0)
+
+            for key, reason in rejects[:REJECTS_LOG_LIMIT]:
+                logger.warning(f"Запись {key} отклонена: {reason}")
+            if len(rejects) > REJECTS_LOG_LIMIT:
+                logger.warning(f"Отклонено ещё {len(rejects) - REJECTS_LOG_LIMIT} записей, полный список возвращён.")
+            logger.info(
+                f"Синхронизация завершена: получено {received} вакансий, добавлено или обновлено {upserted}, "
+                f"отклонено {len(rejects)} записей."
+            )
+            return rejects
         except psycopg2.Error as e:
             logger.error(f"Ошибка при подключении к базе данных для вставки данных: {e}")
             raise
         finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
             self.conn.commit()
             self.conn.close()
+
+    def _start_workers(self, workers: int, processes: list[Any], task_queues: list[Any]) -> Any:
+        """
+        Запускает workers процессов загрузки и добавляет их и их очереди заданий в processes и task_queues.
+        Процессы запускаются методом spawn, чтобы не наследовать открытые соединения основного процесса.
+        Очереди ограничены по размеру, поэтому чтение источника приостанавливается, если процессы не успевают.
+        Возвращает общую очередь результатов.
+        """
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        for number in range(workers):
+            tasks = context.Queue(maxsize=4)
+            process = context.Process(
+                target=_load_partition,
+                args=(self._connect_params(), tasks, results),
+                name=f"vacancy-loader-{number}",
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+            task_queues.append(tasks)
+        logger.info(f"Запущено {workers} процессов загрузки.")
+        return results
+
+    @staticmethod
+    def _partition(rows: list[tuple[str, tuple]], parts: int) -> list[list[tuple[str, tuple]]]:
+        """Распределяет строки вакансий по parts частям по employer_id: вакансии работодателя попадают в одну часть."""
+        partitions: list[list[tuple[str, tuple]]] = [[] for _ in range(parts)]
+        for row in rows:
+            partitions[row[1][5] % parts].append(row)
+        return partitions
+
+    @staticmethod
+    def _finish_workers(
+        processes: list[Any], task_queues: list[Any], results: Any
+    ) -> tuple[int, list[tuple[str, str]]]:
+        """
+        Сообщает процессам загрузки об окончании данных, дожидается их итогов и объединяет их.
+        Возвращает общее количество вставленных или обновлённых строк и отклонённые записи всех процессов.
+        Если хотя бы один процесс завершился с ошибкой, возбуждается RuntimeError.
+        """
+        for tasks, process in zip(task_queues, processes):
+            _put(tasks, None, process)
+
+        upserted = 0
+        rejects: list[tuple[str, str]] = []
+        errors = []
+        for _ in processes:
+            while True:
+                try:
+                    process_upserted, process_rejects, durations, error = results.get(timeout=1)
+                    break
+                except queue.Empty:
+                    crashed = [process for process in processes if process.exitcode not in (None, 0)]
+                    if crashed:
+                        raise RuntimeError(
+                            f"Процесс загрузки {crashed[0].name} аварийно завершился с кодом {crashed[0].exitcode}"
+                        )
+            upserted += process_upserted
+            rejects.extend(process_rejects)
+            for duration in durations:
+                metrics.observe("db_insert_transaction_seconds", duration, stage="worker")
+            if error:
+                errors.append(error)
+        metrics.inc("db_insert_upserted_total", upserted)
+        metrics.inc("db_insert_rejects_total", len(rejects))
+
+        if errors:
+            logger.error(f"Ошибки процессов загрузки: {'; '.join(errors)}")
+            raise RuntimeError(f"Ошибки процессов загрузки: {'; '.join(errors)}")
+        logger.info(
+            f"Процессы загрузки завершены: добавлено или обновлено {upserted}, отклонено {len(rejects)} записей."
+        )
+        return upserted, rejects
+
+    @staticmethod
+    def _copy_rows(
+        cur: Any, staging: str, query: str, rows: list[tuple[str, tuple]], rejects: list[tuple[str, str]]
+    ) -> int:
+        """
+        Вставляет строки через временную таблицу staging: строки передаются одной командой COPY, затем переносятся
+        запросом query (многострочный INSERT с VALUES %s), в котором VALUES заменено чтением из staging.
+        Возвращает количество вставленных или обновлённых строк. Если COPY или вставка падает, откат выполняется
+        до точки сохранения, и строки вставляет _insert_rows, который находит ошибочные строки делением пополам.
+        """
+        if not rows:
+            return 0
+
+        cur.execute("SAVEPOINT bulk_copy")
+        try:
+            cur.copy_expert(f"COPY {staging} FROM STDIN", _copy_text(row for _, row in rows))
+            cur.execute(query.replace("VALUES %s", f"SELECT * FROM {staging}"))
+            count: int = cur.rowcount
+        except psycopg2.Error:
+            cur.execute("ROLLBACK TO SAVEPOINT bulk_copy")
+            cur.execute("RELEASE SAVEPOINT bulk_copy")
+            return DataBaseSQL._insert_rows(cur, query, rows, rejects)
+        cur.execute("RELEASE SAVEPOINT bulk_copy")
+        return count
+
+    @staticmethod
+    def _insert_rows(cur: Any, query: str, rows: list[tuple[str, tuple]], rejects: list[tuple[str, str]]) -> int:
+        """
+        Вставляет строки одним многострочным запросом и возвращает количество вставленных или обновлённых строк.
+        Если запрос падает, набор строк делится пополам и каждая половина вставляется отдельно
+        (откат выполняется до точки сохранения), пока не останутся только ошибочные строки.
+        Так ошибка в одной строке не приводит к построчной вставке всей пачки.
+        """
+        if not rows:
+            return 0
+
+        cur.execute("SAVEPOINT bulk_insert")
+        try:
+            execute_values(cur, query, [row for _, row in rows], page_size=len(rows))
+            count: int = cur.rowcount
+        except psycopg2.Error as e:
+            cur.execute("ROLLBACK TO SAVEPOINT bulk_insert")
+            cur.execute("RELEASE SAVEPOINT bulk_insert")
+            if len(rows) == 1:
+                rejects.append((rows[0][0], str(e).strip()))
+                return 0
+            middle = len(rows) // 2
+            return DataBaseSQL._insert_rows(cur, query, rows[:middle], rejects) + DataBaseSQL._insert_rows(
+                cur, query, rows[middle:], rejects
+            )
+        cur.execute("RELEASE SAVEPOINT bulk_insert")
+        return count
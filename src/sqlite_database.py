@@ -0,0 +1,323 @@
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from src.base_sql import REJECTS_LOG_LIMIT, Base_SQL, batched, prepare_batch
+from src.config import sqlite_path
+from src.logger import setup_logger
+from src.metrics import metrics
+from src.vacancy_record import VacancyRecord
+
+logger = setup_logger(__name__)
+
+# Схема встроенной базы: (версия, описание, SQL-запросы), применённая версия хранится в PRAGMA user_version.
+# Как и MIGRATIONS для PostgreSQL, применённые версии не изменяются, изменения схемы добавляются в конец списка.
+# Материализованных агрегатов нет: отчёты считаются запросами GROUP BY по частичным индексам открытых вакансий,
+# поэтому после загрузки не нужно ничего пересчитывать
+SQLITE_MIGRATIONS: list[tuple[int, str, list[str]]] = [
+    (
+        1,
+        "Таблицы employer, vacancies и sync_state, индексы отчётов и полнотекстовый поиск",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS employer (
+                employer_id INTEGER PRIMARY KEY,
+                employer_name TEXT,
+                employer_url TEXT
+            ) STRICT
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS vacancies (
+                vacancy_id INTEGER PRIMARY KEY,
+                hh_id INTEGER NOT NULL UNIQUE,
+                vacancy_name TEXT,
+                vacancy_url TEXT,
+                city TEXT,
+                salary INTEGER,
+                employer_id INTEGER REFERENCES employer (employer_id),
+                published_at TEXT,
+                is_closed INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            ) STRICT
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS sync_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_sync_at TEXT,
+                last_full_sync_at TEXT,
+                data_generation INTEGER NOT NULL DEFAULT 0
+            ) STRICT
+            """,
+            # Группировка по работодателю в get_companies_and_vacancies_count
+            "CREATE INDEX IF NOT EXISTS vacancies_employer_id_idx ON vacancies (employer_id) WHERE is_closed = 0",
+            # Покрывающий индекс для AVG(salary) ... GROUP BY vacancy_name: группировка без сортировки и без таблицы
+            """
+            CREATE INDEX IF NOT EXISTS vacancies_name_salary_idx ON vacancies (vacancy_name, salary)
+            WHERE is_closed = 0
+            """,
+            # Полнотекстовый индекс по названию вакансии. Индекс перестраивается целиком в конце синхронизации:
+            # перестройка 100 000 названий занимает доли секунды, а триггеры на каждую строку замедляли загрузку
+            # в несколько раз
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_fts USING fts5 (
+                vacancy_name, content = 'vacancies', content_rowid = 'vacancy_id', tokenize = 'unicode61'
+            )
+            """,
+        ],
+    ),
+]
+
+EMPLOYER_INSERT = """
+    INSERT INTO employer (employer_id, employer_name, employer_url)
+    VALUES (?, ?, ?)
+    ON CONFLICT (employer_id) DO UPDATE
+    SET employer_name = excluded.employer_name, employer_url = excluded.employer_url
+    WHERE (employer.employer_name, employer.employer_url) IS NOT (excluded.employer_name, excluded.employer_url)
+"""
+
+# Изменившиеся и ранее закрытые вакансии обновляются, неизменные строки не переписываются
+VACANCY_INSERT = """
+    INSERT INTO vacancies (hh_id, vacancy_name, vacancy_url, city, salary, employer_id, published_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (hh_id) DO UPDATE
+    SET vacancy_name = excluded.vacancy_name,
+        vacancy_url = excluded.vacancy_url,
+        city = excluded.city,
+        salary = excluded.salary,
+        employer_id = excluded.employer_id,
+        published_at = excluded.published_at,
+        is_closed = 0,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE vacancies.is_closed
+        OR (vacancies.vacancy_name, vacancies.vacancy_url, vacancies.city, vacancies.salary,
+            vacancies.employer_id, vacancies.published_at)
+        IS NOT (excluded.vacancy_name, excluded.vacancy_url, excluded.city, excluded.salary,
+            excluded.employer_id, excluded.published_at)
+"""
+
+# Кэш страниц соединения в КиБ (отрицательное значение PRAGMA cache_size): при кэше по умолчанию (2 МиБ)
+# вставка в индексы по названию и зарплате читает страницы индексов с диска
+CACHE_SIZE = -64 * 1024
+
+# Сколько строк индекса читает ANALYZE: приблизительной статистики достаточно для выбора плана
+ANALYSIS_LIMIT = 1000
+
+SEEN_INSERT = "INSERT OR IGNORE INTO seen_vacancies (hh_id) VALUES (?)"
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """
+    Открывает соединение со встроенной базой в режиме автофиксации: транзакции открываются явно (BEGIN),
+    поэтому точки сохранения не фиксируют транзакцию при освобождении.
+    Журнал WAL позволяет читать базу во время загрузки, внешние ключи проверяются.
+    """
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute(f"PRAGMA cache_size = {CACHE_SIZE}")
+    return conn
+
+
+class SQLiteDataBase(Base_SQL):
+    """
+    Встроенное хранилище вакансий в файле SQLite с тем же интерфейсом загрузки, что и DataBaseSQL.
+    Не требует сервера PostgreSQL: подходит для разовых загрузок на одной машине и для тестов.
+    Вакансии синхронизируются по идентификатору HH так же, как в DataBaseSQL, отчёты читает SQLiteDBManager.
+    """
+
+    def __init__(self, path: str = sqlite_path, **params: Any) -> None:
+        super().__init__(path, params)
+        self.database_name = path
+        self.path = path
+        self.params = params
+        self.create_database()
+        self.create_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        return connect_sqlite(self.path)
+
+    def create_database(self) -> None:
+        """Создаёт каталог файла базы данных, если его нет. Сам файл создаётся при первом подключении."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        logger.info(f"База данных SQLite: {self.path}")
+
+    def create_tables(self) -> None:
+        """
+        Создаёт и обновляет таблицы, применяя версии SQLITE_MIGRATIONS новее PRAGMA user_version.
+        Каждая версия применяется в отдельной транзакции вместе с записью номера версии.
+        """
+        conn = self._connect()
+        try:
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            for version, description, statements in SQLITE_MIGRATIONS:
+                if version <= current:
+                    continue
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                    conn.execute("COMMIT")
+                except sqlite3.Error:
+                    conn.execute("ROLLBACK")
+                    raise
+                logger.info(f"Применена миграция SQLite {version}: {description}")
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при создании таблиц SQLite: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def get_sync_state(self) -> dict[str, datetime | None]:
+        """
+        Возвращает время последней синхронизации (last_sync_at) и последней полной синхронизации
+        (last_full_sync_at). Для базы, которая ещё не синхронизировалась, оба значения равны None.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT last_sync_at, last_full_sync_at FROM sync_state").fetchone()
+        finally:
+            conn.close()
+        last_sync_at, last_full_sync_at = row if row else (None, None)
+        return {
+            "last_sync_at": datetime.fromisoformat(last_sync_at) if last_sync_at else None,
+            "last_full_sync_at": datetime.fromisoformat(last_full_sync_at) if last_full_sync_at else None,
+        }
+
+    @staticmethod
+    def _save_sync_state(conn: sqlite3.Connection, sync_started_at: datetime, full_sync: bool) -> None:
+        """Запоминает время синхронизации и увеличивает поколение данных (data_generation)."""
+        at = sync_started_at.isoformat()
+        conn.execute(
+            """
+            INSERT INTO sync_state (id, last_sync_at, last_full_sync_at, data_generation)
+            VALUES (1, :at, :full_at, 1)
+            ON CONFLICT (id) DO UPDATE
+            SET last_sync_at = excluded.last_sync_at,
+                last_full_sync_at = COALESCE(excluded.last_full_sync_at, sync_state.last_full_sync_at),
+                data_generation = sync_state.data_generation + 1
+            """,
+            {"at": at, "full_at": at if full_sync else None},
+        )
+
+    def insert_data_to_db(
+        self,
+        vacancies: Iterable[dict | VacancyRecord],
+        batch_size: int = 1000,
+        full_sync: bool = True,
+        workers: int = 1,
+    ) -> list[tuple[str, str]]:
+        """
+        Синхронизирует вакансии с базой данных с той же семантикой, что и DataBaseSQL.insert_data_to_db:
+        вакансии читаются пачками по batch_size штук, каждая пачка вставляется в отдельной транзакции
+        через INSERT ... ON CONFLICT по идентификатору HH, неизменные строки не переписываются,
+        при full_sync=True вакансии, которых нет в переданном списке, помечаются закрытыми.
+        SQLite допускает только одного пишущего, поэтому workers > 1 не ускоряет загрузку и игнорируется.
+        Возвращает список отклонённых записей в виде пар (идентификатор, причина).
+        """
+        if workers > 1:
+            logger.warning("SQLite допускает только одного пишущего: загрузка выполняется в одном процессе.")
+
+        rejects: list[tuple[str, str]] = []
+        upserted = 0
+        received = 0
+        started = time.perf_counter()
+        sync_started_at = datetime.now(timezone.utc)
+        conn = self._connect()
+        try:
+            logger.info(f"Начинаем вставку данных в базу данных {self.path}.")
+            conn.execute("CREATE TEMP TABLE seen_vacancies (hh_id INTEGER PRIMARY KEY)")
+
+            for batch in batched(vacancies, batch_size):
+                batch_rejects: list[tuple[str, str]] = []
+                employers, rows, seen = prepare_batch(batch, batch_rejects)
+                with metrics.timer("db_insert_transaction_seconds"):
+                    conn.execute("BEGIN IMMEDIATE")
+                    self._insert_rows(conn, EMPLOYER_INSERT, employers, batch_rejects)
+                    batch_upserted = self._insert_rows(conn, VACANCY_INSERT, rows, batch_rejects)
+                    conn.executemany(SEEN_INSERT, [(hh_id,) for hh_id in seen])
+                    conn.execute("COMMIT")
+
+                received += len(batch)
+                upserted += batch_upserted
+                rejects.extend(batch_rejects)
+                metrics.inc("db_insert_rows_total", len(batch))
+                metrics.inc("db_insert_upserted_total", batch_upserted)
+                metrics.inc("db_insert_rejects_total", len(batch_rejects))
+                logger.info(
+                    f"Пачка обработана: {len(batch)} вакансий, {len(employers)} уникальных работодателей, "
+                    f"добавлено или обновлено {batch_upserted}, отклонено {len(batch_rejects)}."
+                )
+
+            metrics.observe("db_sync_stage_seconds", time.perf_counter() - started, stage="insert")
+            conn.execute("BEGIN IMMEDIATE")
+            if full_sync:
+                cursor = conn.execute(
+                    """
+                    UPDATE vacancies SET is_closed = 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE is_closed = 0 AND hh_id NOT IN (SELECT hh_id FROM seen_vacancies)
+                    """
+                )
+                logger.info(f"Помечено закрытыми {cursor.rowcount} вакансий.")
+            if upserted:
+                with metrics.timer("db_sync_stage_seconds", stage="refresh_search_index"):
+                    conn.execute("INSERT INTO vacancies_fts (vacancies_fts) VALUES ('rebuild')")
+            self._save_sync_state(conn, sync_started_at, full_sync)
+            conn.execute("COMMIT")
+            # Статистика планировщика по выборке строк: без неё SQLite предпочитает чтение частичного индекса
+            # с обращением к таблице за каждой строкой вместо последовательного чтения таблицы
+            conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            conn.execute("ANALYZE")
+
+            elapsed = time.perf_counter() - started
+            metrics.observe("db_sync_stage_seconds", elapsed, stage="total")
+            metrics.set("db_insert_rows_per_second", received / elapsed if elapsed else 0)
+
+            for key, reason in rejects[:REJECTS_LOG_LIMIT]:
+                logger.warning(f"Запись {key} отклонена: {reason}")
+            if len(rejects) > REJECTS_LOG_LIMIT:
+                logger.warning(f"Отклонено ещё {len(rejects) - REJECTS_LOG_LIMIT} записей, полный список возвращён.")
+            logger.info(
+                f"Синхронизация завершена: получено {received} вакансий, добавлено или обновлено {upserted}, "
+                f"отклонено {len(rejects)} записей."
+            )
+            return rejects
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при вставке данных в базу данных SQLite: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _insert_rows(
+        conn: sqlite3.Connection, query: str, rows: list[tuple[str, tuple]], rejects: list[tuple[str, str]]
+    ) -> int:
+        """
+        Вставляет строки одним executemany и возвращает количество вставленных или обновлённых строк.
+        Если вставка падает, набор строк делится пополам так же, как в DataBaseSQL._insert_rows,
+        пока не останутся только ошибочные строки.
+        """
+        if not rows:
+            return 0
+
+        conn.execute("SAVEPOINT bulk_insert")
+        try:
+            count: int = conn.executemany(query, [row for _, row in rows]).rowcount
+        except sqlite3.Error as e:
+            conn.execute("ROLLBACK TO SAVEPOINT bulk_insert")
+            conn.execute("RELEASE SAVEPOINT bulk_insert")
+            if len(rows) == 1:
+                rejects.append((rows[0][0], str(e).strip()))
+                return 0
+            middle = len(rows) // 2
+            return SQLiteDataBase._insert_rows(conn, query, rows[:middle], rejects) + SQLiteDataBase._insert_rows(
+                conn, query, rows[middle:], rejects
+            )
+        conn.execute("RELEASE SAVEPOINT bulk_insert")
+        return count
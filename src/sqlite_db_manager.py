@@ -0,0 +1,342 @@
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from src.base_db import DBBase, cached_report, check_reports
+from src.config import sqlite_path
+from src.logger import setup_logger
+from src.metrics import metrics
+from src.query_cache import QueryCache
+
+logger = setup_logger(__name__)
+
+# Агрегаты вычисляются при запросе по частичным индексам открытых вакансий. Вакансии считаются по employer_id
+# только по индексу vacancies_employer_id_idx, с таблицей employer соединяются уже посчитанные группы,
+# а не каждая вакансия
+COMPANIES_AND_VACANCIES_COUNT_QUERY = """
+    SELECT employer.employer_name, SUM(counts.vacancy_count) AS vacancy_count
+    FROM (
+        SELECT employer_id, COUNT(*) AS vacancy_count FROM vacancies WHERE is_closed = 0 GROUP BY employer_id
+    ) AS counts
+    JOIN employer ON employer.employer_id = counts.employer_id
+    GROUP BY employer.employer_name
+"""
+
+ALL_VACANCIES_QUERY = """
+    SELECT employer.employer_name, vacancies.vacancy_name, vacancies.salary, vacancies.vacancy_url
+    FROM vacancies
+    JOIN employer ON employer.employer_id = vacancies.employer_id
+    WHERE vacancies.is_closed = 0
+"""
+
+AVG_SALARY_QUERY = """
+    SELECT vacancy_name, AVG(salary) AS avg_salary FROM vacancies
+    WHERE is_closed = 0
+    GROUP BY vacancy_name
+"""
+
+HIGHER_SALARY_QUERY = """
+    SELECT vacancy_id, vacancy_name, vacancy_url, city, salary, employer_id FROM vacancies
+    WHERE is_closed = 0 AND salary > (SELECT AVG(salary) FROM vacancies WHERE is_closed = 0)
+"""
+
+# instr ищет подстроку с учётом регистра, как LIKE '%...%' в PostgreSQL
+KEYWORD_QUERY = """
+    SELECT vacancy_id, vacancy_name, vacancy_url, city, salary, employer_id FROM vacancies
+    WHERE is_closed = 0 AND instr(vacancy_name, :keyword) > 0
+"""
+
+# Полнотекстовый поиск по индексу FTS5: результаты упорядочены по релевантности (bm25)
+SEARCH_QUERY = """
+    SELECT vacancies.vacancy_id, vacancies.vacancy_name, vacancies.vacancy_url, vacancies.city,
+        vacancies.salary, vacancies.employer_id
+    FROM vacancies_fts
+    JOIN vacancies ON vacancies.vacancy_id = vacancies_fts.rowid
+    WHERE vacancies_fts MATCH :query AND vacancies.is_closed = 0
+    ORDER BY bm25(vacancies_fts), vacancies.vacancy_id
+    LIMIT :limit
+"""
+
+VACANCY_RECORDS_QUERY = """
+    SELECT vacancies.hh_id, vacancies.vacancy_name, vacancies.vacancy_url, vacancies.city, vacancies.salary,
+        vacancies.employer_id, employer.employer_name
+    FROM vacancies
+    JOIN employer ON employer.employer_id = vacancies.employer_id
+    WHERE vacancies.is_closed = 0
+"""
+
+VACANCIES_PAGE_QUERY = """
+    SELECT vacancies.vacancy_id, employer.employer_name, vacancies.vacancy_name, vacancies.salary,
+        vacancies.vacancy_url
+    FROM vacancies
+    JOIN employer ON employer.employer_id = vacancies.employer_id
+    WHERE vacancies.is_closed = 0 AND vacancies.vacancy_id > :after
+        AND (:keyword IS NULL OR instr(vacancies.vacancy_name, :keyword) > 0)
+    ORDER BY vacancies.vacancy_id
+    LIMIT :limit
+"""
+
+# Запросы пакетных отчётов get_reports (имена — REPORT_NAMES из src.base_db)
+REPORT_QUERIES = {
+    "companies_and_vacancies_count": COMPANIES_AND_VACANCIES_COUNT_QUERY,
+    "all_vacancies": ALL_VACANCIES_QUERY,
+    "avg_salary": AVG_SALARY_QUERY,
+    "vacancies_with_higher_salary": HIGHER_SALARY_QUERY,
+    "vacancies_with_keyword": KEYWORD_QUERY,
+}
+
+
+def build_match_query(text: str) -> str:
+    """
+    Строит запрос FTS5 MATCH из пользовательской строки: каждое слово ищется как префикс ("слово"*),
+    все слова должны присутствовать в названии. Для строки без слов возвращается пустая строка.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text.lower()))
+
+
+class SQLiteDBManager(DBBase):
+    """
+    Отчёты и поиск по встроенной базе SQLite, заполненной SQLiteDataBase.
+    Предоставляет те же методы, что и DBManager, и возвращает строки в том же формате, поэтому команды
+    main.py и VacancyAnalytics работают с любым хранилищем. Запросы выполняются в процессе, без обращения
+    к серверу: отчёты GROUP BY читают частичные индексы и не требуют пересчёта агрегатов после загрузки.
+    Средняя зарплата возвращается как float, а не Decimal. Поиск search_vacancies учитывает начало слова,
+    но не словоформы и опечатки.
+
+    Запросы выполняются на одном соединении под блокировкой, потоковые iter_* методы открывают
+    собственное соединение. Результаты get_* методов кэшируются до следующей загрузки данных.
+    """
+
+    def __init__(
+        self,
+        path: str = sqlite_path,
+        cache_size: int = 128,
+        cache_ttl: float = 300.0,
+        slow_query_threshold: float | None = None,
+        **params: Any,
+    ) -> None:
+        """
+        path — файл базы данных SQLite. cache_size и cache_ttl задают кэш отчётов, как у DBManager.
+        Если задан slow_query_threshold (в секундах), для более долгих запросов сохраняется план
+        EXPLAIN QUERY PLAN.
+        """
+        super().__init__()
+        self.database_name = path
+        self.path = path
+        self.params = params
+        self.cache = QueryCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self.slow_query_threshold = slow_query_threshold
+        self.__conn: sqlite3.Connection | None = None
+        self.__lock = threading.Lock()
+        logger.info(f"Инициализация SQLiteDBManager с базой данных: {self.path}")
+
+    def connect(self) -> sqlite3.Connection:
+        """Открывает отдельное соединение только для чтения."""
+        try:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            return conn
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при подключении к базе данных {self.path}: {e}")
+            raise
+
+    def close(self) -> None:
+        """Закрывает соединение."""
+        with self.__lock:
+            if self.__conn is not None:
+                self.__conn.close()
+                self.__conn = None
+
+    def __enter__(self) -> "SQLiteDBManager":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _execute(self, load: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Выполняет load на общем соединении под блокировкой, открывая соединение при первом запросе."""
+        with self.__lock:
+            if self.__conn is None:
+                self.__conn = self.connect()
+            return load(self.__conn)
+
+    def get_data_generation(self) -> int:
+        """Возвращает текущее поколение данных, которое увеличивается после каждой загрузки."""
+        generation: int = self._execute(
+            lambda conn: conn.execute("SELECT COALESCE((SELECT data_generation FROM sync_state), 0)").fetchone()[0]
+        )
+        return generation
+
+    def _query(self, conn: sqlite3.Connection, name: str, query: str, params: Any, description: str) -> list[tuple]:
+        """Выполняет запрос на соединении conn, записывает его в метрики и возвращает все строки."""
+        logger.info(f"Запуск запроса для получения {description}.")
+        started = time.perf_counter()
+        result = conn.execute(query, params).fetchall()
+        duration = time.perf_counter() - started
+        self._record_query(name, duration, len(result))
+        if self.slow_query_threshold is not None and duration > self.slow_query_threshold:
+            self._explain(conn, name, duration, query, params)
+        logger.info(f"Запрос для получения {description} успешно выполнен.")
+        return result
+
+    def _fetchall(self, name: str, query: str, params: Any = (), description: str = "") -> list[tuple]:
+        """Выполняет запрос и возвращает все строки результата."""
+        try:
+            result: list[tuple] = self._execute(lambda conn: self._query(conn, name, query, params, description))
+            return result
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при получении {description}: {e}")
+            raise
+
+    @staticmethod
+    def _explain(conn: sqlite3.Connection, name: str, duration: float, query: str, params: Any) -> None:
+        """Получает план EXPLAIN QUERY PLAN медленного запроса и сохраняет его в метриках."""
+        try:
+            plan = "\n".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+        except sqlite3.Error as e:
+            logger.error(f"Не удалось получить план медленного запроса {name}: {e}")
+            return
+        metrics.add_slow_query(name, duration, plan)
+        logger.warning(f"Медленный запрос {name}: {duration:.3f} с\n{plan}")
+
+    @cached_report
+    def get_companies_and_vacancies_count(self) -> Any:
+        """Получает количество вакансий для каждой компании."""
+        return self._fetchall(
+            "companies_and_vacancies_count",
+            COMPANIES_AND_VACANCIES_COUNT_QUERY,
+            description="количества вакансий по компаниям",
+        )
+
+    @cached_report
+    def get_all_vacancies(self) -> Any:
+        """Получает все вакансии с информацией о работодателе, названии вакансии, зарплате и URL вакансии"""
+        return self._fetchall("all_vacancies", ALL_VACANCIES_QUERY, description="всех вакансий")
+
+    @cached_report
+    def get_avg_salary(self) -> Any:
+        """Получает среднюю зарплату по вакансиям."""
+        return self._fetchall("avg_salary", AVG_SALARY_QUERY, description="средней зарплаты")
+
+    @cached_report
+    def get_vacancies_with_higher_salary(self) -> Any:
+        """Получает вакансии с зарплатой выше средней."""
+        return self._fetchall(
+            "vacancies_with_higher_salary", HIGHER_SALARY_QUERY, description="вакансий с зарплатой выше средней"
+        )
+
+    @cached_report
+    def get_vacancies_with_keyword(self, keyword: str) -> Any:
+        """Получает вакансии, содержащие указанное ключевое слово."""
+        return self._fetchall(
+            "vacancies_with_keyword",
+            KEYWORD_QUERY,
+            {"keyword": keyword},
+            description=f"вакансий с ключевым словом '{keyword}'",
+        )
+
+    @cached_report
+    def search_vacancies(self, text: str, limit: int = 100) -> Any:
+        """
+        Ищет вакансии по словам из text в формате get_vacancies_with_keyword, упорядочивая их по релевантности.
+        Регистр не важен, слова находятся по началу слова, при нескольких словах в названии должны быть все.
+        """
+        query = build_match_query(text)
+        if not query:
+            return []
+        return self._fetchall(
+            "search_vacancies",
+            SEARCH_QUERY,
+            {"query": query, "limit": limit},
+            description=f"вакансий по запросу '{text}'",
+        )
+
+    def get_reports(self, reports: list[str], keyword: str | None = None) -> dict[str, list[tuple]]:
+        """
+        Вычисляет несколько отчётов и возвращает словарь {имя отчёта: строки} в формате DBManager.get_reports.
+        Все отчёты читаются в одной транзакции, то есть из одного снимка данных, поэтому согласованы
+        между собой даже во время загрузки.
+        """
+        check_reports(reports, keyword)
+
+        def load(conn: sqlite3.Connection) -> dict[str, list[tuple]]:
+            started = time.perf_counter()
+            conn.execute("BEGIN")
+            try:
+                result = {
+                    report: self._query(
+                        conn, report, REPORT_QUERIES[report], {"keyword": keyword}, description=f"отчёта {report}"
+                    )
+                    for report in dict.fromkeys(reports)
+                }
+            finally:
+                conn.execute("COMMIT")
+            self._record_query("batch_reports", time.perf_counter() - started, sum(map(len, result.values())))
+            return result
+
+        try:
+            reports_rows: dict[str, list[tuple]] = self._execute(load)
+            return reports_rows
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при получении отчётов {', '.join(reports)}: {e}")
+            raise
+
+    def _iter_query(self, name: str, query: str, params: Any = (), chunk_size: int = 1000) -> Iterator[tuple]:
+        """
+        Выполняет запрос на отдельном соединении и отдаёт строки по одной, читая их порциями по chunk_size.
+        Соединение закрывается после исчерпания генератора.
+        """
+        started = time.perf_counter()
+        count = 0
+        conn = self.connect()
+        try:
+            cursor = conn.execute(query, params)
+            while rows := cursor.fetchmany(chunk_size):
+                count += len(rows)
+                yield from rows
+        finally:
+            conn.close()
+        self._record_query(name, time.perf_counter() - started, count)
+
+    def iter_all_vacancies(self, chunk_size: int = 1000) -> Iterator[tuple]:
+        """Потоково отдаёт все вакансии в формате get_all_vacancies."""
+        logger.info("Запуск потокового запроса для получения всех вакансий.")
+        yield from self._iter_query("iter_all_vacancies", ALL_VACANCIES_QUERY, chunk_size=chunk_size)
+
+    def iter_vacancies_with_higher_salary(self, chunk_size: int = 1000) -> Iterator[tuple]:
+        """Потоково отдаёт вакансии с зарплатой выше средней в формате get_vacancies_with_higher_salary."""
+        logger.info("Запуск потокового запроса для получения вакансий с зарплатой выше средней.")
+        yield from self._iter_query("iter_vacancies_with_higher_salary", HIGHER_SALARY_QUERY, chunk_size=chunk_size)
+
+    def iter_vacancies_with_keyword(self, keyword: str, chunk_size: int = 1000) -> Iterator[tuple]:
+        """Потоково отдаёт вакансии с ключевым словом в формате get_vacancies_with_keyword."""
+        logger.info(f"Запуск потокового запроса для получения вакансий с ключевым словом: {keyword}.")
+        yield from self._iter_query(
+            "iter_vacancies_with_keyword", KEYWORD_QUERY, {"keyword": keyword}, chunk_size=chunk_size
+        )
+
+    def iter_vacancy_records(self, chunk_size: int = 10000) -> Iterator[tuple]:
+        """
+        Потоково отдаёт открытые вакансии вместе с работодателем в виде кортежей
+        (hh_id, vacancy_name, vacancy_url, city, salary, employer_id, employer_name).
+        """
+        logger.info("Запуск потокового запроса для выгрузки вакансий.")
+        yield from self._iter_query("iter_vacancy_records", VACANCY_RECORDS_QUERY, chunk_size=chunk_size)
+
+    def get_vacancies_page(
+        self, limit: int = 100, after: int | None = None, keyword: str | None = None
+    ) -> tuple[list[tuple], int | None]:
+        """
+        Получает страницу вакансий в формате get_all_vacancies, упорядоченных по vacancy_id.
+        Возвращает строки страницы и курсор следующей страницы (None, если страница последняя).
+        """
+        rows = self._fetchall(
+            "vacancies_page",
+            VACANCIES_PAGE_QUERY,
+            {"after": after if after is not None else 0, "keyword": keyword or None, "limit": limit},
+            description=f"страницы вакансий (limit={limit}, after={after})",
+        )
+        next_after = rows[-1][0] if len(rows) == limit else None
+        return [row[1:] for row in rows], next_after
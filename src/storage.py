@@ -0,0 +1,40 @@
+from typing import TYPE_CHECKING, Any
+
+from src.config import config, storage_config
+
+if TYPE_CHECKING:
+    from src.db_manager import DBManager
+    from src.sql_database import DataBaseSQL
+    from src.sqlite_database import SQLiteDataBase
+    from src.sqlite_db_manager import SQLiteDBManager
+
+
+def open_database(storage: dict | None = None, **kwargs: Any) -> "DataBaseSQL | SQLiteDataBase":
+    """
+    Создаёт хранилище для загрузки вакансий по секции [storage] конфигурации: DataBaseSQL
+    с параметрами подключения из секции [postgresql] или SQLiteDataBase с файлом из параметра path.
+    Модули хранилищ импортируются при вызове, поэтому выбранное хранилище не загружает модули другого:
+    общие части загрузки и отчётов находятся в src.base_sql и src.base_db, которые не импортируют драйверы.
+    """
+    storage = storage or storage_config()
+    if storage["backend"] == "sqlite":
+        from src.sqlite_database import SQLiteDataBase
+
+        return SQLiteDataBase(storage["path"], **kwargs)
+
+    from src.sql_database import DataBaseSQL
+
+    return DataBaseSQL(**config(), **kwargs)
+
+
+def open_manager(storage: dict | None = None, **kwargs: Any) -> "DBManager | SQLiteDBManager":
+    """Создаёт DBManager или SQLiteDBManager для отчётов по секции [storage] конфигурации."""
+    storage = storage or storage_config()
+    if storage["backend"] == "sqlite":
+        from src.sqlite_db_manager import SQLiteDBManager
+
+        return SQLiteDBManager(storage["path"], **kwargs)
+
+    from src.db_manager import DBManager
+
+    return DBManager(**config(), **kwargs)
@@ -0,0 +1,53 @@
+from typing import NamedTuple
+
+
+class VacancyRecord(NamedTuple):
+    """
+    Компактная запись вакансии: только поля, которые сохраняются в базу данных.
+    Ответ API HeadHunter содержит десятки вложенных полей, а запись — кортеж из девяти значений,
+    поэтому занимает в несколько раз меньше памяти и не требует разбора словарей на следующих этапах.
+    """
+
+    hh_id: int
+    name: str | None
+    url: str | None
+    city: str | None
+    salary: int | None
+    employer_id: int | None
+    employer_name: str | None
+    employer_url: str | None
+    published_at: str | None
+
+    @classmethod
+    def from_api(cls, vacancy: dict) -> "VacancyRecord":
+        """
+        Преобразует вакансию в формате API HeadHunter в запись.
+        Зарплата берётся из нижней границы, а если она не указана — из верхней. Вакансия без работодателя
+        преобразуется с employer_id=None. При некорректных данных возбуждаются KeyError, TypeError,
+        ValueError или AttributeError.
+        """
+        salary_data = vacancy.get("salary") or {}
+        salary = salary_data.get("from")
+        if salary is None:
+            salary = salary_data.get("to")
+        address = vacancy.get("address")
+        employer = vacancy.get("employer")
+        return cls(
+            int(vacancy["id"]),
+            vacancy.get("name"),
+            vacancy.get("alternate_url"),
+            address.get("city") if address else None,
+            salary,
+            int(employer["id"]) if employer else None,
+            employer.get("name") if employer else None,
+            employer.get("alternate_url") if employer else None,
+            vacancy.get("published_at"),
+        )
+
+    def vacancy_row(self) -> tuple:
+        """Строка таблицы vacancies: (hh_id, vacancy_name, vacancy_url, city, salary, employer_id, published_at)."""
+        return self.hh_id, self.name, self.url, self.city, self.salary, self.employer_id, self.published_at
+
+    def employer_row(self) -> tuple:
+        """Строка таблицы employer: (employer_id, employer_name, employer_url)."""
+        return self.employer_id, self.employer_name, self.employer_url
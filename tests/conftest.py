@@ -6,6 +6,8 @@ import pytest
 from src.config import config
 from src.db_manager import DBManager
 from src.sql_database import DataBaseSQL
+from src.sqlite_database import SQLiteDataBase
+from src.sqlite_db_manager import SQLiteDBManager
 
 
 @pytest.fixture
@@ -40,3 +42,13 @@ def dbm_instance(vacancies):
     params = config()
     dbm = DBManager("test_sql_database", **params)
     return dbm, params
+
+
+@pytest.fixture
+def sqlite_instance(vacancies, tmp_path):
+    """Фикстура для встроенной базы SQLite с загруженными вакансиями и SQLiteDBManager к ней."""
+    path = str(tmp_path / "headhunter.sqlite3")
+    db = SQLiteDataBase(path)
+    db.insert_data_to_db(vacancies)
+    with SQLiteDBManager(path) as manager:
+        yield db, manager
@@ -0,0 +1,41 @@
+import pytest
+
+from src.analytics import VacancyAnalytics
+
+
+@pytest.fixture
+def analytics(vacancies):
+    return VacancyAnalytics.from_vacancies(vacancies)
+
+
+def test_analytics_matches_db_manager(dbm_instance, analytics):
+    dbm, params = dbm_instance
+    from_db = VacancyAnalytics.from_db(dbm)
+
+    assert len(from_db) == len(analytics) == 522
+    assert sorted(from_db.get_companies_and_vacancies_count()) == sorted(dbm.get_companies_and_vacancies_count())
+    assert sorted(analytics.get_companies_and_vacancies_count()) == sorted(dbm.get_companies_and_vacancies_count())
+
+    expected_avg = {name: float(avg) for name, avg in dbm.get_avg_salary()}
+    assert {name: pytest.approx(avg) for name, avg in analytics.get_avg_salary()} == expected_avg
+
+    expected_higher = sorted(row[1:] for row in dbm.get_vacancies_with_higher_salary())
+    assert sorted(row[1:] for row in analytics.get_vacancies_with_higher_salary()) == expected_higher
+
+
+def test_analytics_salary_distribution(analytics):
+    percentiles = analytics.salary_percentiles([0, 50, 100])
+    counts, edges = analytics.salary_histogram(bins=5)
+
+    assert percentiles[0] <= percentiles[50] <= percentiles[100]
+    assert sum(counts) == 522
+    assert edges[0] == percentiles[0] and edges[-1] == percentiles[100]
+
+
+def test_analytics_without_salary():
+    analytics = VacancyAnalytics([(1, "Курьер", "https://hh.ru/vacancy/1", "Москва", None, 10, "Компания")])
+
+    assert analytics.get_avg_salary() == [("Курьер", None)]
+    assert analytics.get_mean_salary() is None
+    assert analytics.get_vacancies_with_higher_salary() == []
+    assert analytics.salary_percentiles() == {}
@@ -0,0 +1,77 @@
+import asyncio
+
+from src.async_db_manager import AsyncDBManager
+
+
+def test_async_db_manager_matches_db_manager(dbm_instance):
+    dbm, params = dbm_instance
+
+    async def run_reports():
+        async with AsyncDBManager("test_sql_database", pool_max=4, **params) as adbm:
+            return await asyncio.gather(
+                adbm.get_companies_and_vacancies_count(),
+                adbm.get_all_vacancies(),
+                adbm.get_avg_salary(),
+                adbm.get_vacancies_with_higher_salary(),
+                adbm.get_vacancies_with_keyword("Специалист"),
+            )
+
+    counts, all_vacancies, avg_salary, higher_salary, keyword = asyncio.run(run_reports())
+
+    assert counts == dbm.get_companies_and_vacancies_count()
+    assert all_vacancies == dbm.get_all_vacancies()
+    assert avg_salary == dbm.get_avg_salary()
+    assert higher_salary == dbm.get_vacancies_with_higher_salary()
+    assert keyword == dbm.get_vacancies_with_keyword("Специалист")
+
+
+def test_async_db_manager_streaming_and_pages(dbm_instance):
+    dbm, params = dbm_instance
+
+    async def collect():
+        async with AsyncDBManager("test_sql_database", **params) as adbm:
+            streamed = [row async for row in adbm.iter_all_vacancies(chunk_size=100)]
+            higher = [row async for row in adbm.iter_vacancies_with_higher_salary(chunk_size=100)]
+            keyword = [row async for row in adbm.iter_vacancies_with_keyword("Специалист", chunk_size=10)]
+            records = [row async for row in adbm.iter_vacancy_records(chunk_size=100)]
+            rows, after = await adbm.get_vacancies_page(limit=100)
+            return streamed, higher, keyword, records, rows, after
+
+    streamed, higher, keyword, records, rows, after = asyncio.run(collect())
+
+    assert streamed == dbm.get_all_vacancies()
+    assert higher == list(dbm.iter_vacancies_with_higher_salary())
+    assert keyword == list(dbm.iter_vacancies_with_keyword("Специалист"))
+    assert records == list(dbm.iter_vacancy_records())
+    assert rows == dbm.get_vacancies_page(limit=100)[0]
+    assert after is not None
+
+
+def test_async_db_manager_get_reports(dbm_instance):
+    dbm, params = dbm_instance
+
+    async def run_reports():
+        async with AsyncDBManager("test_sql_database", **params) as adbm:
+            return await adbm.get_reports(["avg_salary", "vacancies_with_higher_salary"])
+
+    reports = asyncio.run(run_reports())
+
+    assert reports == dbm.get_reports(["avg_salary", "vacancies_with_higher_salary"])
+
+
+def test_async_db_manager_search_vacancies(dbm_instance):
+    dbm, params = dbm_instance
+
+    async def search():
+        async with AsyncDBManager("test_sql_database", **params) as adbm:
+            return await asyncio.gather(
+                adbm.search_vacancies("специалист тендер"),
+                adbm.search_vacancies("Специолист"),
+                adbm.search_vacancies("и"),
+            )
+
+    exact, fuzzy, stop_words = asyncio.run(search())
+
+    assert exact == dbm.search_vacancies("специалист тендер")
+    assert fuzzy == dbm.search_vacancies("Специолист")
+    assert stop_words == []
@@ -0,0 +1,42 @@
+from src.crawl_checkpoint import CrawlCheckpoint
+
+URL = "https://api.hh.ru/vacancies"
+
+
+def test_crawl_checkpoint_resumes_same_query(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path))
+    checkpoint.start(URL, {"page": 0, "date_from": None})
+    checkpoint.save(0, {"items": [1], "pages": 3})
+    checkpoint.save(2, {"items": [3], "pages": 3})
+
+    resumed = CrawlCheckpoint(str(tmp_path))
+    resumed.start(URL, {"page": 1, "date_from": None})
+
+    assert resumed.get(0) == {"items": [1], "pages": 3}
+    assert resumed.get(1) is None
+    assert resumed.cursor == 1
+
+
+def test_crawl_checkpoint_resets_other_query_and_expired(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path))
+    checkpoint.start(URL, {"page": 0, "date_from": None})
+    checkpoint.save(0, {"items": [1]})
+
+    CrawlCheckpoint(str(tmp_path)).start(URL, {"page": 0, "date_from": "2025-01-14"})
+    expired = CrawlCheckpoint(str(tmp_path), ttl=0)
+    expired.start(URL, {"page": 0, "date_from": "2025-01-14"})
+
+    assert expired.get(0) is None
+    assert not (tmp_path / "page_0.json").exists()
+
+
+def test_crawl_checkpoint_keeps_shard_plan(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path))
+    checkpoint.start(URL, {"page": 0, "employer_id": ["1", "2"]})
+    assert checkpoint.plan is None
+    checkpoint.save_plan([{"employer_id": ["1"]}, {"employer_id": ["2"]}])
+
+    resumed = CrawlCheckpoint(str(tmp_path))
+    resumed.start(URL, {"page": 0, "employer_id": ["1", "2"]})
+
+    assert resumed.plan == [{"employer_id": ["1"]}, {"employer_id": ["2"]}]
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+
+from src.crawl_planner import CrawlPlanner
+
+NOW = datetime.now(timezone.utc)
+
+
+def make_fetch(published):
+    """Возвращает fetch, который считает found по словарю {работодатель: [даты публикации]}."""
+    calls = []
+
+    def fetch(shard):
+        calls.append(shard)
+        date_from = datetime.fromisoformat(shard["date_from"]) if shard.get("date_from") else None
+        date_to = datetime.fromisoformat(shard["date_to"]) if shard.get("date_to") else None
+        found = sum(
+            1
+            for employer in shard["employer_id"]
+            for date in published[employer]
+            if (date_from is None or date >= date_from) and (date_to is None or date <= date_to)
+        )
+        return {"found": found, "items": []}
+
+    return fetch, calls
+
+
+def test_crawl_planner_keeps_small_query():
+    fetch, calls = make_fetch({"1": [NOW] * 10, "2": [NOW] * 10})
+
+    plan = CrawlPlanner(fetch, max_results=100).plan({"employer_id": ["1", "2"]})
+
+    assert [shard for shard, _ in plan] == [{"employer_id": ["1", "2"]}]
+    assert len(calls) == 1
+
+
+def test_crawl_planner_splits_by_employer_and_date():
+    hours = [NOW - timedelta(hours=i) for i in range(300)]
+    fetch, calls = make_fetch({"1": [NOW] * 50, "2": [NOW] * 60, "3": hours})
+
+    plan = CrawlPlanner(fetch, max_results=100).plan({"employer_id": ["1", "2", "3"]})
+
+    assert all(data["found"] <= 100 for _, data in plan)
+    assert sum(data["found"] for shard, data in plan if shard["employer_id"] == ["3"]) >= 300
+    assert {tuple(shard["employer_id"]) for shard, _ in plan} == {("1",), ("2",), ("3",)}
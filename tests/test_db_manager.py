@@ -1,5 +1,12 @@
 from decimal import Decimal
 
+import pytest
+
+from src.config import config
+from src.db_manager import DBManager
+from src.metrics import metrics
+from src.sql_database import DataBaseSQL
+
 
 def test_db_manager_get_all_vacancies(dbm_instance):
     dbm, params = dbm_instance
@@ -46,3 +53,121 @@ def test_db_manager_get_vacancies_with_keyword(dbm_instance):
     assert vacancy[1][1] == "Специалист по взысканию и розыску автомобилей"
     assert vacancy[4][1] == "Специалист по лабораторным исследованиям"
     assert vacancy[10][1] == "Специалист по работе с клиентами"
+
+
+def test_db_manager_iter_queries_match_fetchall(dbm_instance):
+    dbm, params = dbm_instance
+    assert list(dbm.iter_all_vacancies(chunk_size=50)) == dbm.get_all_vacancies()
+    assert list(dbm.iter_vacancies_with_higher_salary(chunk_size=50)) == dbm.get_vacancies_with_higher_salary()
+    assert list(dbm.iter_vacancies_with_keyword("Специалист", chunk_size=7)) == dbm.get_vacancies_with_keyword(
+        "Специалист"
+    )
+
+
+def test_db_manager_get_vacancies_page(dbm_instance):
+    dbm, params = dbm_instance
+    pages = []
+    rows, after = dbm.get_vacancies_page(limit=100)
+    pages.append(rows)
+    while after is not None:
+        rows, after = dbm.get_vacancies_page(limit=100, after=after)
+        pages.append(rows)
+
+    assert [len(page) for page in pages] == [100, 100, 100, 100, 100, 22]
+    assert sorted(row for page in pages for row in page) == sorted(dbm.get_all_vacancies())
+
+
+def test_db_manager_get_vacancies_page_with_keyword(dbm_instance):
+    dbm, params = dbm_instance
+    rows, after = dbm.get_vacancies_page(limit=10, keyword="Специалист")
+    assert len(rows) == 10
+    assert rows[0][1] == "Специалист по тендерам"
+    rows, after = dbm.get_vacancies_page(limit=100, after=after, keyword="Специалист")
+    assert len(rows) == 45
+    assert after is None
+
+
+def test_db_manager_cache_invalidated_by_load(dbm_instance, vacancies):
+    dbm, params = dbm_instance
+    first = dbm.get_avg_salary()
+    assert dbm.get_avg_salary() == first
+    assert dbm.cache.hits == 1
+
+    generation = dbm.get_data_generation()
+    DataBaseSQL("test_sql_database", **params).insert_data_to_db(vacancies)
+
+    assert dbm.get_data_generation() == generation + 1
+    assert dbm.get_avg_salary() == first
+    assert dbm.cache.hits == 1
+
+
+def test_db_manager_slow_query_explain():
+    params = config()
+    metrics.reset()
+    with DBManager("test_sql_database", cache_size=0, slow_query_threshold=0, **params) as dbm:
+        dbm.get_vacancies_with_keyword("Специалист")
+
+    data = metrics.to_dict()
+    assert data["counters"]["db_query_rows_total"] == [{"labels": {"query": "vacancies_with_keyword"}, "value": 55}]
+    assert data["slow_queries"][0]["query"] == "vacancies_with_keyword"
+    assert "actual time" in data["slow_queries"][0]["plan"]
+
+
+def test_db_manager_slow_fuzzy_search_explain():
+    params = config()
+    metrics.reset()
+    with DBManager("test_sql_database", cache_size=0, slow_query_threshold=0, **params) as dbm:
+        result = dbm.search_vacancies("Специолист")
+
+    assert result[0][1] == "Специалист по тендерам"
+    plans = {entry["query"]: entry["plan"] for entry in metrics.to_dict()["slow_queries"]}
+    assert "actual time" in plans["fuzzy_search_vacancies"]
+
+
+def test_db_manager_get_reports(dbm_instance):
+    dbm, params = dbm_instance
+    reports = dbm.get_reports(
+        [
+            "companies_and_vacancies_count",
+            "all_vacancies",
+            "avg_salary",
+            "vacancies_with_higher_salary",
+            "vacancies_with_keyword",
+        ],
+        keyword="Специалист",
+    )
+
+    assert sorted(reports["companies_and_vacancies_count"]) == sorted(dbm.get_companies_and_vacancies_count())
+    assert sorted(reports["all_vacancies"]) == sorted(dbm.get_all_vacancies())
+    assert sorted(reports["avg_salary"]) == sorted(dbm.get_avg_salary())
+    assert sorted(reports["vacancies_with_higher_salary"]) == sorted(dbm.get_vacancies_with_higher_salary())
+    assert sorted(reports["vacancies_with_keyword"]) == sorted(dbm.get_vacancies_with_keyword("Специалист"))
+    single = dbm.get_reports(["avg_salary"])
+    assert single.keys() == {"avg_salary"}
+    # Повторный запрос до следующей загрузки отвечает из кэша, изменение результата не портит кэш
+    hits = dbm.cache.hits
+    single["avg_salary"].clear()
+    assert sorted(dbm.get_reports(["avg_salary", "avg_salary"])["avg_salary"]) == sorted(dbm.get_avg_salary())
+    assert dbm.cache.hits == hits + 2
+
+
+def test_db_manager_get_reports_errors(dbm_instance):
+    dbm, params = dbm_instance
+    with pytest.raises(ValueError):
+        dbm.get_reports(["unknown_report"])
+    with pytest.raises(ValueError):
+        dbm.get_reports(["vacancies_with_keyword"])
+
+
+def test_db_manager_search_vacancies(dbm_instance):
+    dbm, params = dbm_instance
+    # Регистр и форма слова не важны, слово находится и по началу
+    assert len(dbm.search_vacancies("специалисты")) == len(dbm.search_vacancies("Спец")) == 76
+    assert [row[1] for row in dbm.search_vacancies("специалист тендер")] == ["Специалист по тендерам"]
+    assert len(dbm.search_vacancies("Сборщик", limit=10)) == 10
+    # Запрос с опечаткой обрабатывается нечётким поиском по триграммам
+    assert dbm.search_vacancies("Специолист")[0][1] == "Специалист по тендерам"
+    assert dbm.search_vacancies("!!!") == []
+    # Запрос из одних стоп-слов не уходит в нечёткий поиск
+    assert dbm.search_vacancies("и") == []
+    assert dbm.search_vacancies("по и") == []
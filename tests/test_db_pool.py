@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+from psycopg2.pool import PoolError
+
+from src.db_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(dbm_instance):
+    dbm, params = dbm_instance
+    with ConnectionPool(1, 2, timeout=0.5, dbname="test_sql_database", **params) as pool:
+        yield pool
+
+
+def test_connection_pool_reuses_connections(pool):
+    with pool.connection() as conn:
+        first = conn
+    with pool.connection() as conn:
+        assert conn is first
+
+
+def test_connection_pool_waits_for_free_connection(pool):
+    conn = pool.getconn()
+    other = pool.getconn()
+    with pytest.raises(PoolError):
+        pool.getconn()
+
+    timer = threading.Timer(0.1, pool.putconn, args=(other,))
+    timer.start()
+    assert pool.getconn() is other
+    timer.join()
+    pool.putconn(conn)
+    pool.putconn(other)
+
+
+def test_connection_pool_replaces_broken_connection(pool):
+    with pool.connection() as conn:
+        broken = conn
+    broken.close()
+
+    with pool.connection() as conn:
+        assert conn is not broken
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+            assert cur.fetchone() == (1,)
+
+
+def test_connection_pool_rolls_back_on_error(pool):
+    with pytest.raises(ZeroDivisionError):
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("CREATE TEMP TABLE pool_test (id int)")
+            1 / 0
+
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('pg_temp.pool_test')")
+            assert cur.fetchone() == (None,)
+
+
+def test_db_manager_close(dbm_instance):
+    dbm, params = dbm_instance
+    with dbm:
+        assert dbm.get_companies_and_vacancies_count()
+        pool = dbm.pool
+    assert pool.closed
@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+
+from src.config import config
+from src.enrichment import VacancyEnricher
+from src.hh_api import HeadHunterAPI
+from src.sql_database import DataBaseSQL
+
+
+def details_for(url, headers, params):
+    vacancy_id = url.rsplit("/", 1)[1]
+    if vacancy_id.endswith("0"):
+        return MagicMock(status_code=404)
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        "id": vacancy_id,
+        "description": "<p>Описание</p>",
+        "key_skills": [{"name": "SQL"}, {"name": "Python"}],
+        "experience": {"id": "between1And3", "name": "От 1 года до 3 лет"},
+    }
+    return response
+
+
+@patch("requests.Session.get")
+def test_enricher_fetches_only_new_and_changed(mock_request, vacancies):
+    params = config()
+    db = DataBaseSQL("test_enrichment", **params)
+    db.insert_data_to_db(vacancies[:20])
+    conn = psycopg2.connect(dbname="test_enrichment", **params)
+    with conn.cursor() as cursor:
+        cursor.execute("TRUNCATE vacancy_details")
+    conn.commit()
+    conn.close()
+    mock_request.side_effect = details_for
+    enricher = VacancyEnricher("test_enrichment", api=HeadHunterAPI(preload=False), max_workers=4, **params)
+
+    stats = enricher.enrich()
+    missing = sum(1 for vacancy in vacancies[:20] if vacancy["id"].endswith("0"))
+    assert stats["checked"] == 20 and stats["missing"] == missing
+    assert stats["updated"] + stats["unchanged"] == 20 - missing
+
+    mock_request.reset_mock()
+    changed = next(vacancy for vacancy in vacancies[:20] if not vacancy["id"].endswith("0"))
+    others = [vacancy for vacancy in vacancies[:20] if vacancy is not changed]
+    db.insert_data_to_db([dict(changed, name="Новое название"), *others], full_sync=False)
+    stats = enricher.enrich()
+
+    # Недоступные вакансии отмечены проверенными и повторно не запрашиваются
+    requested = [call.args[0].rsplit("/", 1)[1] for call in mock_request.call_args_list]
+    assert requested == [changed["id"]]
+    assert stats["unchanged"] == 1 and stats["updated"] == 0 and stats["missing"] == 0
+
+    conn = psycopg2.connect(dbname="test_enrichment", **params)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT key_skills, experience FROM vacancy_details WHERE hh_id = %s", (changed["id"],))
+        assert cursor.fetchone() == (["SQL", "Python"], "От 1 года до 3 лет")
+        cursor.execute("SELECT count(*) FROM vacancy_details WHERE description IS NULL")
+        assert cursor.fetchone() == (missing,)
+        # Описание, проверенное давно, запрашивается снова, хотя сама вакансия не менялась
+        cursor.execute(
+            "UPDATE vacancy_details SET fetched_at = now() - interval '8 days' WHERE hh_id = %s", (changed["id"],)
+        )
+    conn.commit()
+    conn.close()
+
+    mock_request.reset_mock()
+    stats = enricher.enrich()
+    requested = [call.args[0].rsplit("/", 1)[1] for call in mock_request.call_args_list]
+    assert requested == [changed["id"]]
+    assert stats["unchanged"] == 1
+
+    mock_request.reset_mock()
+    enricher.enrich()
+    assert mock_request.call_count == 0
@@ -0,0 +1,38 @@
+from benchmarks.bench_db import check_baseline, compare, percentile
+from benchmarks.generator import generate_vacancies
+from src.hh_api import HeadHunterAPI
+
+
+def test_generate_vacancies(vacancies):
+    generated = list(generate_vacancies(1000, employers=50, templates=vacancies))
+
+    assert len(generated) == 1000
+    assert len({vacancy["id"] for vacancy in generated}) == 1000
+    assert len({vacancy["employer"]["id"] for vacancy in generated}) <= 50
+    assert all(HeadHunterAPI._is_valid(vacancy) for vacancy in generated)
+    # При одинаковом seed генерируется одна и та же последовательность
+    assert list(generate_vacancies(1000, employers=50, templates=vacancies)) == generated
+
+
+def test_compare_with_baseline():
+    baseline = {"10000": {"insert_rows_per_s": 1000, "queries": {"get_avg_salary": {"p50": 0.01, "p99": 0.02}}}}
+    results = {"10000": {"insert_rows_per_s": 950, "queries": {"get_avg_salary": {"p50": 0.01, "p99": 0.05}}}}
+
+    regressions = compare(results, baseline, tolerance=0.2)
+
+    assert len(regressions) == 1
+    assert "get_avg_salary p99" in regressions[0]
+    assert percentile([5, 1, 4, 2, 3], 50) == 3
+    # Размер без базового замера не проходит проверку молча
+    assert compare({"20000": results["10000"]}, baseline, tolerance=0.2) == [
+        "20000: размера нет в базовом замере, сохраните его с --save-baseline"
+    ]
+
+
+def test_check_baseline_requires_baseline_file(tmp_path):
+    results = {"10000": {"insert_rows_per_s": 1000, "queries": {}}}
+
+    regressions = check_baseline(results, str(tmp_path / "baseline.json"), tolerance=0.2)
+
+    assert len(regressions) == 1
+    assert "не найден" in regressions[0]
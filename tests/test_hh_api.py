@@ -1,12 +1,16 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
 
+from src.crawl_checkpoint import CrawlCheckpoint
 from src.hh_api import HeadHunterAPI
+from src.response_cache import ResponseCache
+from src.snapshot import SnapshotReader, SnapshotWriter
+from src.vacancy_record import VacancyRecord
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_http_error_hh_api(mock_request):
     mock_request.return_value.status_code = 400
 
@@ -15,7 +19,7 @@ def test_http_error_hh_api(mock_request):
         hh._load_vacancies()
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_hh_api(mock_request, vacancy):
     mock_request.return_value.status_code = 200
     mock_request.return_value.json.return_value = {"items": vacancy}
@@ -28,3 +32,264 @@ def test_hh_api(mock_request, vacancy):
     for vacancy in hh.vacancies:
         assert vacancy["salary"] is not None
         assert vacancy["address"] is not None
+
+
+@patch("requests.Session.get")
+def test_hh_api_fetches_only_existing_pages(mock_request, vacancy):
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.json.return_value = {"items": vacancy, "pages": 3}
+
+    hh = HeadHunterAPI(max_workers=2)
+
+    assert mock_request.call_count == 3
+    requested_pages = sorted(call.kwargs["params"]["page"] for call in mock_request.call_args_list)
+    assert requested_pages == [0, 1, 2]
+    assert len(hh.vacancies) == 6
+
+
+@patch("requests.Session.get")
+def test_hh_api_empty_result_requests_one_page(mock_request):
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.json.return_value = {"items": [], "found": 0, "pages": 0}
+
+    assert list(HeadHunterAPI(preload=False, date_from="2024-01-01T00:00:00").iter_vacancies()) == []
+    assert mock_request.call_count == 1
+
+
+@patch("requests.Session.get")
+def test_hh_api_keeps_page_order(mock_request):
+    def response_for(url, headers, params):
+        response = MagicMock(status_code=200)
+        item = {"id": str(params["page"]), "salary": {"from": 1}, "address": {"city": "Москва"}}
+        response.json.return_value = {"items": [item], "pages": 5}
+        return response
+
+    mock_request.side_effect = response_for
+
+    hh = HeadHunterAPI(max_workers=4)
+
+    assert [vacancy["id"] for vacancy in hh.vacancies] == ["0", "1", "2", "3", "4"]
+
+
+@patch("requests.Session.get")
+def test_hh_api_uses_cache(mock_request, vacancy, tmp_path):
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.headers = {"ETag": '"v1"'}
+    mock_request.return_value.json.return_value = {"items": vacancy, "pages": 2}
+    cache = ResponseCache(str(tmp_path), ttl=60)
+
+    HeadHunterAPI(cache=cache)
+    hh = HeadHunterAPI(cache=cache)
+
+    assert mock_request.call_count == 2
+    assert len(hh.vacancies) == 4
+
+
+@patch("requests.Session.get")
+def test_hh_api_revalidates_stale_cache(mock_request, vacancy, tmp_path):
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.headers = {"ETag": '"v1"'}
+    mock_request.return_value.json.return_value = {"items": vacancy, "pages": 1}
+    cache = ResponseCache(str(tmp_path), ttl=0)
+    HeadHunterAPI(cache=cache)
+
+    mock_request.return_value.status_code = 304
+    hh = HeadHunterAPI(cache=cache)
+
+    assert mock_request.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert len(hh.vacancies) == 2
+
+
+@patch("requests.Session.get")
+def test_hh_api_iter_vacancies(mock_request, vacancy):
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.json.return_value = {"items": vacancy, "pages": 3}
+
+    hh = HeadHunterAPI(preload=False)
+    assert mock_request.call_count == 0
+
+    vacancies = list(hh.iter_vacancies())
+    assert mock_request.call_count == 3
+    assert len(vacancies) == 6
+    assert hh.vacancies == []
+
+
+@patch("requests.Session.get")
+def test_hh_api_date_from(mock_request, vacancy):
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.json.return_value = {"items": vacancy, "pages": 1}
+
+    HeadHunterAPI(date_from="2025-01-14T09:52:18+03:00")
+
+    assert mock_request.call_args.kwargs["params"]["date_from"] == "2025-01-14T09:52:18+03:00"
+
+
+@patch("requests.Session.get")
+def test_hh_api_records_snapshot(mock_request, vacancy, tmp_path):
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.json.return_value = {"items": vacancy, "pages": 3}
+    path = str(tmp_path / "crawl.snap")
+
+    with SnapshotWriter(path) as snapshot:
+        hh = HeadHunterAPI(preload=False, snapshot=snapshot)
+        streamed = list(hh.iter_vacancies())
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 3
+        assert list(reader.iter_vacancies()) == streamed
+
+
+@patch("time.sleep")
+@patch("requests.Session.get")
+def test_hh_api_retries_transient_errors(mock_request, mock_sleep, vacancy):
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "2"})
+    unavailable = MagicMock(status_code=503, headers={})
+    ok = MagicMock(status_code=200)
+    ok.json.return_value = {"items": vacancy, "pages": 1}
+    mock_request.side_effect = [throttled, requests.ConnectionError(), unavailable, ok]
+
+    hh = HeadHunterAPI(retries=3, backoff=1.0)
+
+    assert len(hh.vacancies) == 2
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert delays[0] == 2.0
+    assert 1.0 <= delays[1] <= 2.0 and 2.0 <= delays[2] <= 4.0
+
+
+@patch("time.sleep")
+@patch("requests.Session.get")
+def test_hh_api_gives_up_after_retries(mock_request, mock_sleep):
+    mock_request.return_value = MagicMock(status_code=502, headers={})
+
+    with pytest.raises(requests.HTTPError):
+        HeadHunterAPI(retries=2, backoff=0)
+
+    assert mock_request.call_count == 3
+
+
+@patch("requests.Session.get")
+def test_hh_api_resumes_from_checkpoint(mock_request, tmp_path):
+    failed = []
+
+    def response_for(url, headers, params):
+        if params["page"] == 3 and not failed:
+            failed.append(params["page"])
+            return MagicMock(status_code=400)
+        response = MagicMock(status_code=200)
+        item = {"id": str(params["page"]), "salary": {"from": 1}, "address": {"city": "Москва"}}
+        response.json.return_value = {"items": [item], "pages": 5}
+        return response
+
+    mock_request.side_effect = response_for
+    checkpoint = CrawlCheckpoint(str(tmp_path))
+
+    with pytest.raises(requests.HTTPError):
+        list(HeadHunterAPI(max_workers=1, preload=False, checkpoint=checkpoint).iter_vacancies())
+    assert mock_request.call_count == 4
+
+    vacancies = list(HeadHunterAPI(max_workers=1, preload=False, checkpoint=checkpoint).iter_vacancies())
+
+    assert [vacancy["id"] for vacancy in vacancies] == ["0", "1", "2", "3", "4"]
+    assert sorted(call.kwargs["params"]["page"] for call in mock_request.call_args_list[4:]) == [3, 4]
+    assert not (tmp_path / "state.json").exists()
+
+
+@patch("requests.Session.get")
+def test_hh_api_sharded_crawl(mock_request):
+    def response_for(url, headers, params):
+        response = MagicMock(status_code=200)
+        shard = params["employer_id"][0]
+        items = [{"id": f"{shard}-{params['page']}"}, {"id": "shared"}]
+        for item in items:
+            item.update(salary={"from": 1}, address={"city": "Москва"})
+        response.json.return_value = {"items": items, "found": 300 * len(params["employer_id"]), "pages": 2}
+        return response
+
+    mock_request.side_effect = response_for
+
+    vacancies = list(HeadHunterAPI(preload=False, sharded=True).iter_vacancies())
+
+    assert mock_request.call_count == 5
+    assert sorted(vacancy["id"] for vacancy in vacancies) == [
+        "1942330-0",
+        "1942330-1",
+        "2848663-0",
+        "2848663-1",
+        "shared",
+    ]
+
+
+@patch("requests.Session.get")
+def test_hh_api_sharded_crawl_skips_empty_shards(mock_request):
+    def response_for(url, headers, params):
+        response = MagicMock(status_code=200)
+        employers = params["employer_id"]
+        # Вторая половина работодателей после деления ничего не находит
+        if employers[0] == "2848663":
+            response.json.return_value = {"items": [], "found": 0, "pages": 0}
+            return response
+        item = {"id": f"{employers[0]}-{params['page']}", "salary": {"from": 1}, "address": {"city": "Москва"}}
+        response.json.return_value = {"items": [item], "found": 300 * len(employers), "pages": 2}
+        return response
+
+    mock_request.side_effect = response_for
+
+    vacancies = list(HeadHunterAPI(preload=False, sharded=True).iter_vacancies())
+
+    # Запрос без деления, первые страницы двух шардов и вторая страница непустого шарда
+    assert mock_request.call_count == 4
+    assert [vacancy["id"] for vacancy in vacancies] == ["1942330-0", "1942330-1"]
+
+
+@patch("requests.Session.get")
+def test_hh_api_sharded_crawl_resumes_from_checkpoint(mock_request, tmp_path):
+    failed = []
+
+    def response_for(url, headers, params):
+        employers = params["employer_id"]
+        if employers[0] == "1942330" and len(employers) == 5 and params["page"] == 3 and not failed:
+            failed.append(params["page"])
+            return MagicMock(status_code=400)
+        response = MagicMock(status_code=200)
+        item = {"id": f"{employers[0]}-{params['page']}", "salary": {"from": 1}, "address": {"city": "Москва"}}
+        response.json.return_value = {"items": [item], "found": 300 * len(employers), "pages": 5}
+        return response
+
+    mock_request.side_effect = response_for
+    checkpoint = CrawlCheckpoint(str(tmp_path))
+
+    with pytest.raises(requests.HTTPError):
+        list(HeadHunterAPI(max_workers=1, preload=False, checkpoint=checkpoint, sharded=True).iter_vacancies())
+    first_run = mock_request.call_count
+
+    vacancies = list(HeadHunterAPI(max_workers=1, preload=False, checkpoint=checkpoint, sharded=True).iter_vacancies())
+
+    # Повторно запрашиваются только страницы, не сохранённые до сбоя, без повторного планирования
+    resumed = [
+        (call.kwargs["params"]["employer_id"][0], call.kwargs["params"]["page"])
+        for call in mock_request.call_args_list[first_run:]
+    ]
+    assert sorted(resumed) == [
+        ("1942330", 3),
+        ("1942330", 4),
+        ("2848663", 1),
+        ("2848663", 2),
+        ("2848663", 3),
+        ("2848663", 4),
+    ]
+    assert len(vacancies) == 10
+    assert not (tmp_path / "state.json").exists()
+
+
+@patch("requests.Session.get")
+def test_hh_api_iter_records(mock_request, vacancies):
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.json.return_value = {
+        "items": [*vacancies[:3], {"id": "x", "salary": {}, "address": {}}],
+        "pages": 1,
+    }
+
+    records = list(HeadHunterAPI(preload=False).iter_records())
+
+    assert [record.hh_id for record in records] == [int(vacancy["id"]) for vacancy in vacancies[:3]]
+    assert all(isinstance(record, VacancyRecord) for record in records)
@@ -0,0 +1,23 @@
+import os
+
+from src.logger import LOGS_DIR, load_levels, setup_logger, shutdown_logging
+
+
+def test_setup_logger_writes_module_file():
+    logger = setup_logger("test_logger")
+    logger.info("Проверка записи через очередь")
+    shutdown_logging()
+
+    with open(os.path.join(LOGS_DIR, "test_logger.log"), encoding="utf-8") as f:
+        assert "test_logger INFO: Проверка записи через очередь" in f.read()
+    os.remove(os.path.join(LOGS_DIR, "test_logger.log"))
+
+
+def test_load_levels(tmp_path):
+    config_path = tmp_path / "database.ini"
+    config_path.write_text("[logging]\nconsole_level = warning\nsrc.sql_database = ERROR\n", encoding="utf-8")
+
+    levels = load_levels(str(config_path))
+
+    assert levels == {"level": "DEBUG", "console_level": "WARNING", "src.sql_database": "ERROR"}
+    assert load_levels(str(tmp_path / "missing.ini")) == {"level": "DEBUG", "console_level": "INFO"}
@@ -0,0 +1,53 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from main import REPORTS, build_parser, collect_reports
+
+
+def test_main_parser():
+    parser = build_parser()
+
+    args = parser.parse_args(["sync", "--workers", "4", "--replay", "crawl.snap"])
+    assert (args.workers, args.replay, args.full) == (4, "crawl.snap", False)
+    assert parser.parse_args(["report", "avg_salary"]).name == "avg_salary"
+    assert parser.parse_args(["report", "all"]).use_async is False
+    assert parser.parse_args(["report", "all", "--async"]).use_async is True
+    assert parser.parse_args(["search", "Менеджер"]).limit == 100
+    with pytest.raises(SystemExit):
+        parser.parse_args(["sync", "--snapshot", "a.snap", "--replay", "b.snap"])
+
+
+def test_main_read_only_commands_do_not_import_loaders():
+    # Отчёты и поиск не должны импортировать API HeadHunter и загрузку в базу данных
+    code = (
+        "import sys, main; main.build_parser().parse_args(['report', 'all']); "
+        "import src.storage, src.db_manager, src.sqlite_db_manager; "
+        "print(sorted(name for name in ('src.hh_api', 'src.sql_database', 'requests') if name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_main_collect_reports_async(dbm_instance):
+    dbm, params = dbm_instance
+    # Асинхронный путь команды report выполняет отчёты одновременно и совпадает с пакетными отчётами DBManager
+    reports = asyncio.run(collect_reports(list(REPORTS), {"database_name": "test_sql_database", **params}))
+
+    expected = dbm.get_reports(list(REPORTS.values()))
+    assert {name: sorted(rows) for name, rows in reports.items()} == {
+        name: sorted(expected[report]) for name, report in REPORTS.items()
+    }
+
+
+def test_main_sqlite_backend_does_not_import_postgresql():
+    # Хранилище SQLite не загружает модули и драйверы PostgreSQL
+    code = (
+        "import sys, src.storage, src.sqlite_database, src.sqlite_db_manager; "
+        "print(sorted(name for name in ('src.sql_database', 'src.db_manager', 'psycopg2', 'psycopg') "
+        "if name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
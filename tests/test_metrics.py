@@ -0,0 +1,35 @@
+import json
+
+from src.metrics import Metrics
+
+
+def test_metrics_prometheus():
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.inc("db_queries_total", query="avg_salary")
+    registry.inc("db_queries_total", query="avg_salary")
+    registry.set("db_insert_rows_per_second", 500)
+    registry.observe("db_query_seconds", 0.05, query="avg_salary")
+    registry.observe("db_query_seconds", 0.5, query="avg_salary")
+
+    text = registry.to_prometheus()
+
+    assert "# TYPE db_queries_total counter" in text
+    assert 'db_queries_total{query="avg_salary"} 2' in text
+    assert "db_insert_rows_per_second 500" in text
+    assert 'db_query_seconds_bucket{query="avg_salary",le="0.1"} 1' in text
+    assert 'db_query_seconds_bucket{query="avg_salary",le="1.0"} 2' in text
+    assert 'db_query_seconds_bucket{query="avg_salary",le="+Inf"} 2' in text
+    assert 'db_query_seconds_count{query="avg_salary"} 2' in text
+
+
+def test_metrics_json():
+    registry = Metrics()
+    with registry.timer("db_sync_stage_seconds", stage="insert"):
+        pass
+    registry.add_slow_query("avg_salary", 2.0, "Seq Scan on vacancies")
+
+    data = json.loads(registry.to_json())
+
+    assert data["histograms"]["db_sync_stage_seconds"][0]["labels"] == {"stage": "insert"}
+    assert data["histograms"]["db_sync_stage_seconds"][0]["count"] == 1
+    assert data["slow_queries"] == [{"query": "avg_salary", "duration": 2.0, "plan": "Seq Scan on vacancies"}]
@@ -0,0 +1,39 @@
+import psycopg2
+
+from src.config import config
+from src.migrations import MIGRATIONS, apply_migrations, get_schema_version
+from src.sql_database import DataBaseSQL
+
+
+def test_migrations_applied_once(db_instance):
+    db, params = db_instance
+    conn = psycopg2.connect(dbname="test_sql_database", **params)
+    try:
+        assert get_schema_version(conn) == MIGRATIONS[-1][0]
+        assert apply_migrations(conn) == []
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'vacancies'")
+            indexes = {row[0] for row in cur.fetchall()}
+        assert {"vacancies_employer_id_idx", "vacancies_salary_idx", "vacancies_name_trgm_idx"} <= indexes
+    finally:
+        conn.close()
+
+
+def test_migrations_apply_new_version():
+    params = config()
+    DataBaseSQL("test_migrations", **params)
+    conn = psycopg2.connect(dbname="test_migrations", **params)
+    try:
+        version = MIGRATIONS[-1][0] + 1
+        migrations = [*MIGRATIONS, (version, "Тестовая миграция", ["CREATE TABLE migration_test (id int)"])]
+
+        assert apply_migrations(conn, migrations) == [version]
+        assert get_schema_version(conn) == version
+
+        with conn.cursor() as cur:
+            cur.execute("DROP TABLE migration_test")
+            cur.execute("DELETE FROM schema_migrations WHERE version = %s", (version,))
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,32 @@
+from src.query_cache import QueryCache
+
+
+def test_query_cache_generation():
+    cache = QueryCache()
+    cache.set(("get_all_vacancies",), 1, [1, 2, 3])
+
+    assert cache.get(("get_all_vacancies",), 1) == (True, [1, 2, 3])
+    assert cache.get(("get_all_vacancies",), 2) == (False, None)
+    # Запись прежнего поколения удаляется при первом промахе
+    assert cache.get(("get_all_vacancies",), 1) == (False, None)
+
+
+def test_query_cache_ttl():
+    cache = QueryCache(ttl=0)
+    cache.set("key", 1, "value")
+
+    assert cache.get("key", 1) == (False, None)
+
+
+def test_query_cache_lru():
+    cache = QueryCache(maxsize=2)
+    cache.set("a", 1, "a")
+    cache.set("b", 1, "b")
+    cache.get("a", 1)
+    cache.set("c", 1, "c")
+
+    assert len(cache) == 2
+    assert cache.get("a", 1) == (True, "a")
+    assert cache.get("b", 1) == (False, None)
+    assert cache.hits == 2
+    assert cache.misses == 1
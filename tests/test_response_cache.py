@@ -0,0 +1,40 @@
+import os
+import time
+
+from src.response_cache import ResponseCache
+
+URL = "https://api.hh.ru/vacancies"
+
+
+def test_response_cache_set_and_get(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    cache.set(URL, {"page": 0}, {"items": [1, 2]}, etag='"abc"')
+
+    entry = cache.get(URL, {"page": 0})
+    assert entry["body"] == {"items": [1, 2]}
+    assert entry["etag"] == '"abc"'
+    assert cache.is_fresh(entry)
+    assert cache.get(URL, {"page": 1}) is None
+
+
+def test_response_cache_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=0)
+    cache.set(URL, {"page": 0}, {"items": []})
+
+    assert not cache.is_fresh(cache.get(URL, {"page": 0}))
+
+
+def test_response_cache_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    cache.set(URL, {"page": 0}, {"items": []})
+    cache.set(URL, {"page": 1}, {"items": []})
+    # Делаем первую запись старой, затем обращаемся к ней, чтобы она стала самой свежей
+    old = time.time() - 100
+    for entry in os.scandir(tmp_path):
+        os.utime(entry.path, (old, old))
+    cache.get(URL, {"page": 0})
+    cache.set(URL, {"page": 2}, {"items": []})
+
+    assert cache.get(URL, {"page": 0}) is not None
+    assert cache.get(URL, {"page": 1}) is None
+    assert cache.get(URL, {"page": 2}) is not None
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from src.snapshot import INGEST_FIELDS, SnapshotReader, SnapshotWriter
+
+
+def test_snapshot_roundtrip(tmp_path, vacancies):
+    path = str(tmp_path / "crawl.snap")
+    with SnapshotWriter(path) as writer:
+        writer.write_vacancies(vacancies, page_size=100)
+
+    with SnapshotReader(path) as reader:
+        assert len(reader) == 6
+        assert reader.count == 522
+        assert reader.read_page(5) == vacancies[500:]
+        assert list(reader.iter_vacancies(valid_only=False)) == vacancies
+        assert all(vacancy["salary"] and vacancy["address"] for vacancy in reader.iter_vacancies())
+
+
+def test_snapshot_aborted_write(tmp_path, vacancies):
+    path = str(tmp_path / "crawl.snap")
+    with pytest.raises(RuntimeError):
+        with SnapshotWriter(path) as writer:
+            writer.write_page(vacancies[:10])
+            raise RuntimeError("обрыв загрузки")
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_snapshot_invalid_file(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("[]", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        SnapshotReader(str(path))
+
+
+def test_snapshot_ingest_fields(tmp_path, vacancies):
+    path = str(tmp_path / "crawl.snap")
+    with SnapshotWriter(path, fields=INGEST_FIELDS) as writer:
+        writer.write_vacancies(vacancies)
+
+    with SnapshotReader(path) as reader:
+        vacancy = next(reader.iter_vacancies())
+    assert set(vacancy) == set(INGEST_FIELDS)
+    assert vacancy["employer"] == vacancies[0]["employer"]
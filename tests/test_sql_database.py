@@ -1,7 +1,9 @@
 import psycopg2
 import pytest
 
+from src.config import config
 from src.sql_database import DataBaseSQL
+from src.vacancy_record import VacancyRecord
 
 
 def test_sql_database_insert_data_to_db(db_instance, vacancies):
@@ -25,3 +27,105 @@ def test_sql_database_error_connection(db_instance, vacancies):
             password="12345",
             host=params.get("host", "localhost"),
         )
+
+
+def test_sql_database_insert_data_from_iterator(db_instance, vacancies):
+    db, params = db_instance
+    db = DataBaseSQL("test_sql_database", **params)
+    db.insert_data_to_db(iter(vacancies), batch_size=100)
+
+    with psycopg2.connect(dbname="test_sql_database", **params) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM vacancies WHERE NOT is_closed")
+            assert cursor.fetchone()[0] == len(vacancies)
+
+
+def test_sql_database_insert_data_reports_rejects(vacancies):
+    params = config()
+    db = DataBaseSQL("test_sql_sync", **params)
+    db.insert_data_to_db(vacancies)
+    broken = [dict(vacancy) for vacancy in vacancies[:10]]
+    broken[2]["employer"] = None
+    broken[5]["salary"] = {"from": 10**12, "to": None}
+
+    rejects = db.insert_data_to_db(broken, batch_size=4, full_sync=False)
+
+    assert [key for key, reason in rejects] == [f"вакансия {broken[2]['id']}", f"вакансия {broken[5]['id']}"]
+    conn = psycopg2.connect(dbname="test_sql_sync", **params)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT vacancy_name FROM vacancies WHERE hh_id = %s", (broken[5]["id"],))
+        assert cursor.fetchone()[0] == vacancies[5]["name"]
+    conn.close()
+
+
+def test_sql_database_full_sync_closes_missing(vacancies):
+    params = config()
+    db = DataBaseSQL("test_sql_sync", **params)
+    changed = dict(vacancies[0], name="Ведущий специалист по тендерам")
+
+    db.insert_data_to_db([changed, *vacancies[1:10]])
+
+    conn = psycopg2.connect(dbname="test_sql_sync", **params)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM vacancies WHERE NOT is_closed")
+        assert cursor.fetchone()[0] == 10
+        cursor.execute("SELECT vacancy_name FROM vacancies WHERE hh_id = %s", (vacancies[0]["id"],))
+        assert cursor.fetchone()[0] == "Ведущий специалист по тендерам"
+        cursor.execute("SELECT vacancy_count FROM salary_stats")
+        assert cursor.fetchone()[0] == 10
+    conn.close()
+    assert db.get_sync_state()["last_full_sync_at"] is not None
+
+    db.insert_data_to_db(vacancies)
+    conn = psycopg2.connect(dbname="test_sql_sync", **params)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM vacancies WHERE NOT is_closed")
+        assert cursor.fetchone()[0] == len(vacancies)
+    conn.close()
+
+
+def test_sql_database_parallel_insert(vacancies):
+    params = config()
+    db = DataBaseSQL("test_sql_parallel", **params)
+    broken = [dict(vacancy) for vacancy in vacancies]
+    broken[3]["salary"] = {"from": 10**12, "to": None}
+
+    rejects = db.insert_data_to_db(broken, batch_size=50, workers=3)
+
+    assert [key for key, reason in rejects] == [f"вакансия {broken[3]['id']}"]
+    conn = psycopg2.connect(dbname="test_sql_parallel", **params)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM vacancies WHERE NOT is_closed")
+        assert cursor.fetchone()[0] == len(vacancies) - 1
+        cursor.execute("SELECT vacancy_count FROM salary_stats")
+        assert cursor.fetchone()[0] == len(vacancies) - 1
+    conn.close()
+
+
+def test_sql_database_insert_records(db_instance, vacancies):
+    db, params = db_instance
+    db = DataBaseSQL("test_sql_database", **params)
+    records = [VacancyRecord.from_api(vacancy) for vacancy in vacancies]
+
+    assert db.insert_data_to_db(records, batch_size=100) == []
+
+    with psycopg2.connect(dbname="test_sql_database", **params) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM vacancies WHERE NOT is_closed")
+            assert cursor.fetchone()[0] == len(vacancies)
+
+
+def test_sql_database_copy_special_characters(vacancies):
+    params = config()
+    db = DataBaseSQL("test_sql_sync", **params)
+    # Табуляция, переводы строк и обратная косая черта экранируются при загрузке через COPY, NULL сохраняется
+    name = "Инженер\tC\\C++\r\nпо тестированию \\N"
+    vacancy = dict(vacancies[0], name=name, salary=None, address=None)
+
+    assert db.insert_data_to_db([vacancy], full_sync=False) == []
+
+    conn = psycopg2.connect(dbname="test_sql_sync", **params)
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT vacancy_name, city, salary FROM vacancies WHERE hh_id = %s", (vacancy["id"],))
+        assert cursor.fetchone() == (name, None, None)
+    conn.close()
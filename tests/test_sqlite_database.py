@@ -0,0 +1,91 @@
+import pytest
+
+from src.config import storage_config
+from src.sqlite_database import SQLiteDataBase
+from src.sqlite_db_manager import SQLiteDBManager
+from src.storage import open_database, open_manager
+
+
+def test_sqlite_database_reports(sqlite_instance):
+    db, manager = sqlite_instance
+    assert len(manager.get_all_vacancies()) == 522
+    assert ("ВкусВилл", 93) in manager.get_companies_and_vacancies_count()
+    assert len(manager.get_companies_and_vacancies_count()) == 10
+    assert len(manager.get_avg_salary()) == 366
+    assert len(manager.get_vacancies_with_higher_salary()) == 207
+    assert len(manager.get_vacancies_with_keyword("Специалист")) == 55
+    assert list(manager.iter_all_vacancies(chunk_size=50)) == manager.get_all_vacancies()
+    assert len(list(manager.iter_vacancy_records())) == 522
+
+    reports = manager.get_reports(
+        ["companies_and_vacancies_count", "avg_salary", "vacancies_with_keyword"], keyword="Специалист"
+    )
+    assert reports["companies_and_vacancies_count"] == manager.get_companies_and_vacancies_count()
+    assert reports["avg_salary"] == manager.get_avg_salary()
+    assert reports["vacancies_with_keyword"] == manager.get_vacancies_with_keyword("Специалист")
+    with pytest.raises(ValueError):
+        manager.get_reports(["vacancies_with_keyword"])
+
+    pages = []
+    rows, after = manager.get_vacancies_page(limit=100)
+    pages.append(rows)
+    while after is not None:
+        rows, after = manager.get_vacancies_page(limit=100, after=after)
+        pages.append(rows)
+    assert [len(page) for page in pages] == [100, 100, 100, 100, 100, 22]
+
+    found = manager.search_vacancies("специалист ТЕНДЕР")
+    assert [vacancy[1] for vacancy in found] == ["Специалист по тендерам"]
+
+
+def test_sqlite_database_matches_postgresql(sqlite_instance, db_instance, dbm_instance):
+    # Встроенное хранилище возвращает те же отчёты, что и PostgreSQL (идентификаторы строк у баз свои)
+    _, manager = sqlite_instance
+    dbm, _ = dbm_instance
+    assert sorted(manager.get_companies_and_vacancies_count()) == sorted(dbm.get_companies_and_vacancies_count())
+    assert sorted(manager.get_all_vacancies()) == sorted(dbm.get_all_vacancies())
+    assert sorted((name, round(avg, 2)) for name, avg in manager.get_avg_salary()) == sorted(
+        (name, round(float(avg), 2)) for name, avg in dbm.get_avg_salary()
+    )
+    assert sorted(row[1:] for row in manager.get_vacancies_with_higher_salary()) == sorted(
+        row[1:] for row in dbm.get_vacancies_with_higher_salary()
+    )
+
+
+def test_sqlite_database_sync(sqlite_instance, vacancies):
+    db, manager = sqlite_instance
+    generation = manager.get_data_generation()
+    assert db.get_sync_state()["last_full_sync_at"] is not None
+    assert len(manager.get_all_vacancies()) == 522
+
+    # Неполная синхронизация не закрывает вакансии, повторная загрузка не переписывает неизменные строки
+    assert db.insert_data_to_db(vacancies[:100], full_sync=False) == []
+    assert len(manager.get_all_vacancies()) == 522
+
+    # Полная синхронизация закрывает исчезнувшие вакансии, кэш отчётов сбрасывается по поколению данных
+    db.insert_data_to_db(vacancies[:100])
+    assert len(manager.get_all_vacancies()) == 100
+    assert manager.get_data_generation() == generation + 2
+    closed = vacancies[200]
+    assert closed["alternate_url"] not in [vacancy[2] for vacancy in manager.search_vacancies(closed["name"])]
+
+    changed = {**vacancies[0], "name": "Переименованная вакансия"}
+    db.insert_data_to_db([changed, *vacancies[1:100]])
+    assert [vacancy[1] for vacancy in manager.search_vacancies("переименованная")] == ["Переименованная вакансия"]
+
+
+def test_storage_selects_backend_by_config(tmp_path):
+    config_path = tmp_path / "database.ini"
+    database_path = str(tmp_path / "vacancies.sqlite3")
+    config_path.write_text(f"[storage]\nbackend=sqlite\npath={database_path}\n", encoding="utf-8")
+
+    storage = storage_config(str(config_path))
+    assert isinstance(open_database(storage), SQLiteDataBase)
+    with open_manager(storage, cache_size=0) as manager:
+        assert isinstance(manager, SQLiteDBManager)
+        assert manager.get_all_vacancies() == []
+
+    assert storage_config(str(tmp_path / "missing.ini"))["backend"] == "postgresql"
+    config_path.write_text("[storage]\nbackend=oracle\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        storage_config(str(config_path))
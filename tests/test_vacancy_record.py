@@ -0,0 +1,26 @@
+import pytest
+
+from src.vacancy_record import VacancyRecord
+
+
+def test_vacancy_record_from_api(vacancies):
+    vacancy = dict(vacancies[0], salary={"from": None, "to": 50000}, address=None)
+
+    record = VacancyRecord.from_api(vacancy)
+
+    assert record.hh_id == int(vacancy["id"])
+    assert record.salary == 50000 and record.city is None
+    assert record.employer_row() == (
+        int(vacancy["employer"]["id"]),
+        vacancy["employer"]["name"],
+        vacancy["employer"]["alternate_url"],
+    )
+    assert record.vacancy_row()[-1] == vacancy["published_at"]
+    assert VacancyRecord.from_api(dict(vacancy, employer=None)).employer_id is None
+
+
+def test_vacancy_record_malformed():
+    with pytest.raises(ValueError):
+        VacancyRecord.from_api({"id": "abc"})
+    with pytest.raises(KeyError):
+        VacancyRecord.from_api({"name": "Без идентификатора"})